@@ -1,19 +1,20 @@
 #analysis.py
 import streamlit as st
-from nlp_utils import extract_basic_info
-from faiss_engine import find_top_matches
 from nlp_utils import generate_red_flags_html
+from report_cache import get_report
 
 
-def show_analysis(resume_text, jd_text_list=None):
+def show_analysis(resume_text, jd_text_list=None, report=None):
     st.markdown("<h2 class='section-title'>🔭 Cosmic Resume Analysis</h2>", unsafe_allow_html=True)
 
-    # Extract info from resume
-    info = extract_basic_info(resume_text)
-
     # Ensure jd_text_list is a list, default empty
     jd_list = jd_text_list if jd_text_list else []
-    jd_titles = find_top_matches(resume_text, jd_list) if jd_list else []
+    if report is None:
+        report = get_report(resume_text, jd_list)
+
+    # Extracted resume info comes from the report's profile stage, the first one ready
+    info = report["info"]
+    jd_titles = report.get("top_matches", [])
 
     # 1️⃣ Key Strengths
     skills = ", ".join(info.get("skills", []))
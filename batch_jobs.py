@@ -0,0 +1,372 @@
+# batch_jobs.py
+# Multi-resume screening jobs in a SQLite-backed queue. A job stores its JD list and every
+# uploaded PDF; background workers claim one candidate at a time, run extraction, embedding
+# and scoring, and checkpoint the finished record in the same transaction that marks it
+# done. Claims carry a lease and the claiming process id, so candidates held by a crashed or
+# redeployed process go back to the queue and the job resumes where it stopped. A job created
+# with cascade=True first runs the cascade's requirement and dense stages per candidate;
+# candidates that stop there get a short screened-out record instead of full scoring, and
+# are not added to the candidate index. Each finished candidate keeps its stage counts and
+# timings, and job_cascade_report sums them into the job's totals and the compute saved.
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+DB_PATH = os.environ.get("BATCH_JOBS_DB", "batch_jobs.db")
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 1))
+MAX_BATCH_FILES = int(os.environ.get("MAX_BATCH_FILES", 500))
+# A claim older than this is assumed abandoned even if its owner looks alive
+LEASE_SECONDS = int(os.environ.get("BATCH_LEASE_SECONDS", 600))
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+# Pause after an unexpected error, e.g. "database is locked" while another process writes
+ERROR_BACKOFF = 5.0
+
+WORKER_HOST = socket.gethostname()
+
+_workers = []
+_workers_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            jd_list TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS candidates (
+            job_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            pdf BLOB,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            claimed_by TEXT,
+            claimed_at REAL,
+            record TEXT,
+            error TEXT,
+            finished_at TEXT,
+            PRIMARY KEY (job_id, position)
+        );
+        CREATE INDEX IF NOT EXISTS candidates_status ON candidates (status, job_id, position);
+    """)
+    if "cascade" not in [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]:
+        conn.execute("ALTER TABLE jobs ADD COLUMN cascade INTEGER NOT NULL DEFAULT 0")
+    if "stages" not in [row[1] for row in conn.execute("PRAGMA table_info(candidates)")]:
+        conn.execute("ALTER TABLE candidates ADD COLUMN stages TEXT")
+    return conn
+
+
+def create_job(files, jd_list, cascade=False):
+    """
+    ``files`` is a list of (name, pdf_bytes). Everything a worker needs is stored in the
+    database, so the job survives the upload session and the process that created it.
+    With ``cascade`` only candidates passing the cascade's cheap stages are fully scored.
+    """
+    from limits import MAX_UPLOAD_BYTES, ResourceLimitError
+
+    if not files:
+        raise ValueError("A batch job needs at least one resume.")
+    if len(files) > MAX_BATCH_FILES:
+        raise ResourceLimitError(f"At most {MAX_BATCH_FILES} resumes can be screened in one batch.")
+    oversized = [name for name, data in files if len(data) > MAX_UPLOAD_BYTES]
+    if oversized:
+        raise ResourceLimitError(
+            f"{', '.join(oversized)} exceed the {MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit."
+        )
+
+    job_id = uuid.uuid4().hex[:12]
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT INTO jobs (job_id, jd_list, created_at, cascade) VALUES (?, ?, ?, ?)",
+            (job_id, json.dumps(list(jd_list)), datetime.now().isoformat(timespec="seconds"), int(cascade)),
+        )
+        conn.executemany(
+            "INSERT INTO candidates (job_id, position, name, pdf) VALUES (?, ?, ?, ?)",
+            [(job_id, i, name, sqlite3.Binary(data)) for i, (name, data) in enumerate(files)],
+        )
+    return job_id
+
+
+def _worker_id(index=0):
+    return f"{WORKER_HOST}:{os.getpid()}:{index}"
+
+
+def _owner_alive(claimed_by):
+    host, _, pid = (claimed_by or "").rsplit(":", 1)[0].rpartition(":")
+    if host != WORKER_HOST:
+        return True  # can't tell for other machines; the lease covers them
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def recover_abandoned():
+    """
+    Returns candidates claimed by dead processes, or with expired leases, to the queue. A
+    candidate that has used up MAX_ATTEMPTS fails instead, so a PDF that keeps killing its
+    worker cannot hold up the job or take down one worker after another.
+    """
+    with closing(_connect()) as conn, conn:
+        running = conn.execute(
+            "SELECT job_id, position, claimed_by, claimed_at FROM candidates WHERE status = 'running'"
+        ).fetchall()
+        abandoned = []
+        for job_id, position, claimed_by, claimed_at in running:
+            if claimed_at < time.time() - LEASE_SECONDS:
+                abandoned.append((MAX_ATTEMPTS, "Processing ran past its lease", job_id, position))
+            elif not _owner_alive(claimed_by):
+                abandoned.append((MAX_ATTEMPTS, "Worker died while processing", job_id, position))
+        conn.executemany(
+            "UPDATE candidates SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "claimed_by = NULL, claimed_at = NULL, error = ? WHERE job_id = ? AND position = ? AND status = 'running'",
+            abandoned,
+        )
+    return len(abandoned)
+
+
+def _claim(conn, worker_id):
+    # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same row
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT c.job_id, c.position, c.name, c.pdf, j.jd_list, j.cascade FROM candidates c "
+            "JOIN jobs j ON j.job_id = c.job_id WHERE c.status = 'queued' "
+            "ORDER BY j.created_at, c.job_id, c.position LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE candidates SET status = 'running', attempts = attempts + 1, claimed_by = ?, claimed_at = ? "
+                "WHERE job_id = ? AND position = ?",
+                (worker_id, time.time(), row[0], row[1]),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+_SCREENED_OUT_TAGS = {
+    "requirements": "Screened out: misses every JD's requirements",
+    "dense": "Screened out: low semantic match",
+}
+
+
+def process_candidate(name, pdf_bytes, jd_list, cascade=False):
+    """
+    The single-upload path, without rendering: extract, index, embed and score. Returns
+    (record, stages); ``stages`` holds the cascade's per-stage counts and timings, or None.
+    """
+    from candidate_index import add_candidate
+    from limits import read_pdf_text
+    from results_writer import build_candidate_record
+
+    resume_text, _ = read_pdf_text(pdf_bytes)
+    if not resume_text.strip():
+        raise ValueError("No text could be extracted from the PDF.")
+    stages = embedding = None
+    if cascade:
+        from cascade import screen_candidate
+
+        stage, details = screen_candidate(resume_text, jd_list)
+        stages = details["stages"]
+        if stage != "full":
+            stages.append({"stage": "full", "in": 0, "out": 0, "seconds": 0.0})
+            return {
+                "candidate": name,
+                "resume_hash": hashlib.sha256(resume_text.encode("utf-8")).hexdigest(),
+                "years_experience": int(details["years"]),
+                "final_tag": _SCREENED_OUT_TAGS[stage],
+                "cascade_stage": stage,
+            }, stages
+        # Encoded for the dense stage already; the record and the index reuse it
+        embedding = details["embedding"]
+    start = time.perf_counter()
+    record = build_candidate_record(resume_text, jd_list, name=name, embedding=embedding)
+    if cascade:
+        record["cascade_stage"] = "full"
+        stages.append({"stage": "full", "in": 1, "out": 1, "seconds": time.perf_counter() - start})
+    add_candidate(resume_text, name=name, score=record["screening_score"], embedding=embedding)
+    return record, stages
+
+
+def run_next(worker_id=None):
+    """Claims and processes one queued candidate. Returns False when the queue is empty."""
+    worker_id = worker_id or _worker_id()
+    with closing(_connect()) as conn:
+        conn.isolation_level = None  # _claim manages its own transaction
+        row = _claim(conn, worker_id)
+    if row is None:
+        return False
+
+    job_id, position, name, pdf_bytes, jd_list, cascade = row
+    try:
+        record, stages = process_candidate(name, bytes(pdf_bytes), json.loads(jd_list), cascade=bool(cascade))
+    except Exception as e:
+        with closing(_connect()) as conn, conn:
+            # Retry until MAX_ATTEMPTS, then keep the error for the results table
+            conn.execute(
+                "UPDATE candidates SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "claimed_by = NULL, claimed_at = NULL, error = ? WHERE job_id = ? AND position = ? AND claimed_by = ?",
+                (MAX_ATTEMPTS, str(e), job_id, position, worker_id),
+            )
+        return True
+
+    with closing(_connect()) as conn, conn:
+        # The checkpoint: the record is stored and the PDF dropped in one transaction. A
+        # claim lost to lease expiry does not overwrite the newer owner's work.
+        conn.execute(
+            "UPDATE candidates SET status = 'done', record = ?, stages = ?, pdf = NULL, error = NULL, finished_at = ? "
+            "WHERE job_id = ? AND position = ? AND claimed_by = ?",
+            (json.dumps(record), json.dumps(stages) if stages else None, datetime.now().isoformat(timespec="seconds"),
+             job_id, position, worker_id),
+        )
+    return True
+
+
+def _worker_loop(worker_id, stop):
+    from limits import ServerBusyError, work_slot
+    from thread_budget import configure_thread
+
+    configure_thread()
+    while not stop.is_set():
+        try:
+            # Batch work shares the interactive sessions' slots instead of adding to them
+            with work_slot():
+                worked = run_next(worker_id)
+            if not worked:
+                recover_abandoned()
+                stop.wait(POLL_INTERVAL)
+        except ServerBusyError:
+            stop.wait(POLL_INTERVAL)
+        except Exception:
+            # A candidate whose checkpoint failed stays claimed until its lease expires
+            logger.exception("Batch worker %s failed; retrying in %ss", worker_id, ERROR_BACKOFF)
+            stop.wait(ERROR_BACKOFF)
+
+
+def ensure_workers(count=BATCH_WORKERS):
+    """
+    Starts this process's background workers once, after re-queuing abandoned candidates.
+    Later calls replace any worker thread that has died.
+    """
+    with _workers_lock:
+        if not _workers:
+            recover_abandoned()
+            _workers.extend([None] * count)
+        for i, worker in enumerate(_workers):
+            if worker is not None and (worker[0].is_alive() or worker[1].is_set()):
+                continue
+            if worker is not None:
+                logger.warning("Batch worker %s died; restarting it", _worker_id(i))
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=_worker_loop, args=(_worker_id(i), stop),
+                name=f"batch-worker-{i}", daemon=True,
+            )
+            thread.start()
+            _workers[i] = (thread, stop)
+        return len(_workers)
+
+
+def job_progress(job_id):
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT status, COUNT(*) FROM candidates WHERE job_id = ? GROUP BY status", (job_id,)
+        ).fetchall()
+    progress = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    progress.update(dict(rows))
+    progress["total"] = sum(progress.values())
+    return progress
+
+
+def job_records(job_id):
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT record FROM candidates WHERE job_id = ? AND status = 'done' ORDER BY position", (job_id,)
+        ).fetchall()
+    return [json.loads(row[0]) for row in rows]
+
+
+def job_results(job_id):
+    """Finished candidates ranked by screening score, best first; screened-out ones last."""
+    columns = ["candidate", "screening_score", "experience_score", "culture_fit", "academic_score",
+               "best_jd_title", "years_experience", "semantic_score", "final_tag", "cascade_stage"]
+    records = job_records(job_id)
+    if not records:
+        return pd.DataFrame(columns=columns[:-1])
+    results = pd.DataFrame(records).reindex(columns=columns)
+    if results["cascade_stage"].isna().all():
+        results = results.drop(columns="cascade_stage")
+    return results.sort_values("screening_score", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def job_cascade_report(job_id):
+    """
+    Stage counts and timings summed over a cascade job's finished candidates, with the
+    compute the cascade saved (cascade.stage_report); None for jobs without the cascade.
+    """
+    from cascade import stage_report
+
+    with closing(_connect()) as conn:
+        rows = conn.execute(
+            "SELECT stages FROM candidates WHERE job_id = ? AND status = 'done' AND stages IS NOT NULL", (job_id,)
+        ).fetchall()
+    if not rows:
+        return None
+    totals = {}
+    for (stages,) in rows:
+        for stage in json.loads(stages):
+            total = totals.setdefault(stage["stage"], {"stage": stage["stage"], "in": 0, "out": 0, "seconds": 0.0})
+            total["in"] += stage["in"]
+            total["out"] += stage["out"]
+            total["seconds"] += stage["seconds"]
+    return stage_report([totals[name] for name in ("requirements", "dense", "full")])
+
+
+def job_failures(job_id):
+    with closing(_connect()) as conn:
+        return conn.execute(
+            "SELECT name, error FROM candidates WHERE job_id = ? AND status = 'failed' ORDER BY position", (job_id,)
+        ).fetchall()
+
+
+def export_job(job_id, path, format="parquet"):
+    from results_writer import ResultsWriter
+
+    with ResultsWriter(path, format=format) as writer:
+        for record in job_records(job_id):
+            writer.write(record)
+    return writer.rows_written
+
+
+if __name__ == "__main__":
+    # A standalone worker process, e.g. to keep draining the queue while the app redeploys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run batch screening workers")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    args = parser.parse_args()
+    ensure_workers(args.workers)
+    for thread, _ in _workers:
+        thread.join()
@@ -0,0 +1,94 @@
+# batch_screening.py
+# Live view of a batch screening job: progress, the cascade's stage counts for jobs run with
+# it, a ranked table of finished candidates and failures. While the job runs, a fragment
+# polls the queue and redraws itself without rerunning the whole page; once every candidate
+# is settled the page reruns once to show the final table and the download.
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+
+from batch_jobs import export_job, job_cascade_report, job_failures, job_progress, job_results
+
+REFRESH_SECONDS = 2
+
+
+def _render_job(job_id, progress):
+    total = progress["total"]
+    settled = progress["done"] + progress["failed"]
+    st.progress(settled / total if total else 1.0, text=f"{settled} of {total} resumes screened")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("✅ Done", progress["done"])
+    col2.metric("⚙️ Running", progress["running"])
+    col3.metric("🕒 Queued", progress["queued"])
+    col4.metric("❌ Failed", progress["failed"])
+
+    cascade = job_cascade_report(job_id)
+    if cascade:
+        _render_cascade(cascade)
+
+    results = job_results(job_id)
+    if not results.empty:
+        st.dataframe(
+            results.assign(rank=results.index + 1)[
+                ["rank", "candidate", "screening_score", "experience_score", "culture_fit", "academic_score",
+                 "best_jd_title", "years_experience", "final_tag"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "screening_score": st.column_config.ProgressColumn("Overall", format="%.2f", min_value=0.0, max_value=1.0),
+                "experience_score": st.column_config.ProgressColumn("Experience", format="%.2f", min_value=0.0, max_value=1.0),
+                "culture_fit": st.column_config.ProgressColumn("Culture Fit", format="%.2f", min_value=0.0, max_value=1.0),
+                "academic_score": st.column_config.ProgressColumn("Academic", format="%.2f", min_value=0.0, max_value=1.0),
+            },
+        )
+
+    failures = job_failures(job_id)
+    if failures:
+        with st.expander(f"❌ {len(failures)} resume(s) could not be screened"):
+            for name, error in failures:
+                st.markdown(f"- **{name}**: {error}")
+
+
+def _render_cascade(report):
+    with st.expander("🔻 Cascade stages", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Encodes saved", report["encodes_saved"])
+        col2.metric("Full scores saved", report["full_scores_saved"])
+        col3.metric("Est. time saved", f"{report['estimated_seconds_saved']:.2f}s")
+        stages = pd.DataFrame(report["stages"]).rename(
+            columns={"stage": "Stage", "in": "In", "out": "Out", "seconds": "Seconds"}
+        )
+        st.dataframe(stages, hide_index=True, use_container_width=True)
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def _live_job(job_id):
+    progress = job_progress(job_id)
+    _render_job(job_id, progress)
+    if progress["queued"] == 0 and progress["running"] == 0:
+        st.rerun()
+
+
+def show_batch_job(job_id):
+    st.markdown(f"<h2 class='section-title'>📂 Batch Screening · Job {job_id}</h2>", unsafe_allow_html=True)
+
+    progress = job_progress(job_id)
+    if not progress["total"]:
+        st.error("❌ Batch job not found.")
+        return
+    if progress["queued"] or progress["running"]:
+        _live_job(job_id)
+        return
+
+    _render_job(job_id, progress)
+    if progress["done"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"batch_{job_id}.parquet")
+            export_job(job_id, path)
+            with open(path, "rb") as f:
+                data = f.read()
+        st.download_button("⬇️ Download results (Parquet)", data, file_name=f"batch_{job_id}.parquet")
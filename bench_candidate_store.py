@@ -0,0 +1,77 @@
+# bench_candidate_store.py
+# Boolean skill and range queries over the columnar candidate store vs re-running
+# extract_basic_info on every stored resume. Features are extracted for a sample of
+# synthetic resumes and repeated up to --candidates rows.
+# Usage: python bench_candidate_store.py --candidates 1000000 --unique 20000
+import argparse
+import random
+import tempfile
+import time
+
+from candidate_store import CandidateStore, extract_features
+from nlp_utils import extract_basic_info
+from synthetic_data import make_resume
+
+QUERIES = [
+    "python AND aws",
+    "python AND aws AND NOT only-diploma AND 3+ years",
+    '("machine learning" OR "deep learning") AND grade >= 80',
+    "docker AND kubernetes AND years >= 5 AND years < 8",
+    "NOT bachelor",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar candidate store query benchmark")
+    parser.add_argument("--candidates", type=int, default=1000000)
+    parser.add_argument("--unique", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    resumes = [make_resume(rng, project_lines=rng.randint(2, 20)) for _ in range(args.unique)]
+
+    sample = resumes[:1000]
+    start = time.perf_counter()
+    matches = 0
+    for resume in sample:
+        skills = extract_basic_info(resume)["skills"]
+        matches += "python" in skills and "aws" in skills
+    rescan_s = (time.perf_counter() - start) / len(sample) * args.candidates
+
+    start = time.perf_counter()
+    features = extract_features(resumes)
+    extract_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = CandidateStore(directory)
+        start = time.perf_counter()
+        chunk = 100000
+        for offset in range(0, args.candidates, chunk):
+            ids = range(offset + 1, min(offset + chunk, args.candidates) + 1)
+            store.append_features(list(ids), [features[(i - 1) % len(features)] for i in ids])
+        append_s = time.perf_counter() - start
+
+        print(f"{args.candidates} candidates ({args.unique} unique resumes)")
+        print(f"extract_features: {extract_s / args.unique * 1e3:.3f} ms/resume")
+        print(f"append:           {append_s:.2f}s")
+        used, plain = store.bitmap_bytes()
+        print(f"term bitmaps:     {used / 1e6:.1f} MB (plain bitsets: {plain / 1e6:.1f} MB)")
+        print(f"rescan baseline:  ~{rescan_s:.0f}s per query (extract_basic_info on every resume)")
+        store.query(QUERIES[1])  # builds the sorted numeric views once
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                ids = store.query(query)
+            elapsed = (time.perf_counter() - start) / args.repeat
+            print(f"  {elapsed * 1e3:7.2f} ms  {len(ids):>8} hits  {query}")
+
+        new_ids = list(range(args.candidates + 1, args.candidates + 1001))
+        start = time.perf_counter()
+        store.append_features(new_ids, features[:1000])
+        store.query(QUERIES[1])
+        print(f"append 1000 + re-query: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# bench_extraction.py
+# Per-document parse time of the previous ad-hoc regex parsers vs. the precompiled rule engine.
+# The legacy functions below are verbatim copies of the pre-engine code, kept for comparison.
+# Usage: python bench_extraction.py --docs 500
+import argparse
+import random
+import re
+import time
+
+from extraction_rules import match_job_title, parse_document
+
+
+def legacy_split_sections(text):
+    sections = {}
+    current_section = "General"
+    sections[current_section] = []
+
+    for line in text.splitlines():
+        line_clean = line.strip()
+
+        if re.search(r'education|educational background|academic profile|academics|scholastic|education & certifications', line_clean, re.I):
+            current_section = "Education"
+        elif re.search(r'project', line_clean, re.I):
+            current_section = "Projects"
+        elif re.search(r'training|certification', line_clean, re.I):
+            current_section = "Training"
+        elif re.search(r'extra[- ]?curricular|activities', line_clean, re.I):
+            current_section = "Activities"
+
+        if current_section not in sections:
+            sections[current_section] = []
+
+        if line_clean:
+            sections[current_section].append(line_clean)
+
+    return sections
+
+
+def legacy_grades(text):
+    grades_only = []
+    for line in text.splitlines():
+        line_clean = line.strip()
+        if re.search(r"\b(CGPA|GPA|Percentage|Grade)\b", line_clean, re.I):
+            grade_match = re.search(
+                r"(CGPA|GPA|Percentage|Grade)\s*[:;/\\\-]?\s*([0-9]{1,2}(\.[0-9]{1,2})?%?)",
+                line_clean, re.I
+            )
+            if grade_match:
+                grades_only.append(f"{grade_match.group(1)}: {grade_match.group(2)}")
+    return grades_only
+
+
+def legacy_estimate_experience(text):
+    matches = re.findall(r'(\d+)\+?\s+(?:years|yrs)\s+(?:of )?experience', text.lower())
+    return max((int(match) for match in matches), default=0)
+
+
+def legacy_screening_years(resume_text):
+    text = resume_text.lower()
+    matches = re.findall(r'(\d+)\+?\s*(?:years|yrs)\s+(?:of\s+)?experience', text)
+    academic_phrases = re.findall(r'\d+(st|nd|rd|th)?\s+year\s+(student|b\.?tech|m\.?tech|undergraduate)', text)
+    if academic_phrases:
+        return 0
+    if matches:
+        years = [int(y) for y in matches if int(y) <= 50]
+        return max(years) if years else 0
+    return 0
+
+
+def legacy_jd_min_experience(jd_text):
+    exp_match = re.search(r'(\d+)\+?\s+years? of experience', jd_text.lower())
+    return int(exp_match.group(1)) if exp_match else 0
+
+
+def legacy_job_title(jd_text):
+    match = re.search(r'(?i)(we are hiring for|looking for|position:|role:)\s+([\w\s\-\/]+)', jd_text)
+    return match.group(2).strip() if match else None
+
+
+def legacy_parse(text):
+    return {
+        "sections": legacy_split_sections(text),
+        "grades": legacy_grades(text),
+        "years_experience": legacy_estimate_experience(text),
+        "screening_years": legacy_screening_years(text),
+        "min_experience": legacy_jd_min_experience(text),
+        "title": legacy_job_title(text),
+    }
+
+
+def engine_parse(text):
+    fields = parse_document(text)
+    fields["title"] = match_job_title(text)
+    return fields
+
+
+LINES = [
+    "John Doe - Software Engineer", "EDUCATION", "B.Tech in Computer Science, XYZ University 2016-2020",
+    "CGPA: 8.7", "Percentage - 91.5%", "Class XII, CBSE, Grade: 9", "PROJECTS",
+    "Built a recommendation system in Python", "Position: Backend Developer with Django",
+    "TRAINING & CERTIFICATIONS", "AWS Certified Solutions Architect", "Extra-curricular Activities",
+    "Led the university coding club", "5+ years of experience with distributed systems",
+    "3 yrs experience in data engineering", "2nd year B.Tech student", "Skills: python, sql, docker, aws",
+    "Looking for a Machine Learning Engineer", "Worked 4 years of  experience at Acme", "", "   ",
+    "Upgrade 9 services, GPA: 8.5", "Upgraded 3 legacy systems", "GPA8.5 (Percentage 85%)",
+]
+
+
+def make_document(rng, lines):
+    return "\n".join(rng.choice(LINES) for _ in range(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy regex parsers vs. precompiled extraction rule engine")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = [make_document(rng, args.lines) for _ in range(args.docs)]
+
+    mismatches = sum(1 for doc in docs if legacy_parse(doc) != engine_parse(doc))
+
+    timings = {}
+    for name, parse in (("legacy", legacy_parse), ("engine", engine_parse)):
+        start = time.perf_counter()
+        for doc in docs:
+            parse(doc)
+        timings[name] = (time.perf_counter() - start) / len(docs) * 1e6
+
+    print(f"documents: {args.docs} x {args.lines} lines, output mismatches: {mismatches}")
+    print(f"legacy: {timings['legacy']:.1f} us/doc")
+    print(f"engine: {timings['engine']:.1f} us/doc ({timings['legacy'] / timings['engine']:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# bench_hybrid.py
+# Compares pure dense search against BM25-prefiltered hybrid search as the JD corpus grows.
+# Usage: python bench_hybrid.py --sizes 500 2000 10000 --top-k 10
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from soak_test import STORE_ENV
+from synthetic_data import make_jd, make_resume
+
+
+def dense_top_k(resume_embedding, index, k):
+    _, indices = index.search(resume_embedding, k)
+    return indices[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense vs. BM25 + dense hybrid retrieval benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # The app modules read their store paths at import time, so point them at a scratch
+    # directory first: the synthetic JDs are profiled there, not in the real JD profile store
+    with tempfile.TemporaryDirectory(prefix="bench-hybrid-stores-") as store_dir:
+        for variable, name in STORE_ENV.items():
+            os.environ[variable] = os.path.join(store_dir, name)
+        run(args)
+
+
+def run(args):
+    from faiss_engine import build_faiss_index, model
+    from hybrid_search import get_bm25_index, hybrid_top_matches
+
+    rng = random.Random(args.seed)
+    resumes = [make_resume(rng) for _ in range(args.queries)]
+
+    print(f"{'JDs':>8} {'dense ms':>10} {'hybrid ms':>10} {'speedup':>8} {'top-k overlap':>14}")
+    for size in args.sizes:
+        jds = [make_jd(rng) for _ in range(size)]
+        get_bm25_index.cache_clear()
+        get_bm25_index(tuple(jds))  # BM25 is built once per corpus, like the app's cache
+
+        dense_times, hybrid_times, overlaps = [], [], []
+        for resume in resumes:
+            start = time.perf_counter()
+            index, _ = build_faiss_index(jds)
+            dense = dense_top_k(model.encode([resume]), index, args.top_k)
+            dense_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            hybrid = hybrid_top_matches(resume, jds, top_k=args.top_k, candidates=args.candidates)
+            hybrid_times.append(time.perf_counter() - start)
+
+            hybrid_ids = {m["index"] for m in hybrid}
+            overlaps.append(len(hybrid_ids & set(dense.tolist())) / args.top_k)
+
+        dense_ms = np.median(dense_times) * 1000
+        hybrid_ms = np.median(hybrid_times) * 1000
+        print(f"{size:>8} {dense_ms:>10.1f} {hybrid_ms:>10.1f} {dense_ms / hybrid_ms:>7.1f}x {np.mean(overlaps):>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
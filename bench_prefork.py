@@ -0,0 +1,91 @@
+# bench_prefork.py
+# Independent worker processes that each load the encoder and JD catalog vs workers forked
+# from a master that loaded them once. Reports per-worker startup time and RSS/PSS/USS after
+# every worker has encoded and matched the same batch of resumes.
+# Usage: python bench_prefork.py --workers 4 --resumes 200
+import argparse
+import json
+import multiprocessing as mp
+import random
+import time
+
+from prefork import PreforkPool, memory_usage
+from synthetic_data import make_jd, make_resume
+
+
+def match_resume(args):
+    from faiss_engine import find_top_matches
+
+    resume_text, jd_list = args
+    return [m["index"] for m in find_top_matches(resume_text, jd_list, top_k=3)]
+
+
+def _independent_worker(tasks, results, ready):
+    # What a separately started server process does: load everything itself
+    from faiss_engine import model
+    from jd_catalog import get_catalog
+
+    model.encode(["warm up"])
+    get_catalog()
+    ready.send(time.perf_counter())
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        results.put(match_resume(task))
+
+
+def _summary(workers):
+    keys = ("startup_ms", "rss_mb", "pss_mb", "uss_mb")
+    return {f"mean_{key}": round(sum(w[key] for w in workers) / len(workers), 2) for key in keys}
+
+
+def run_independent(workers, items):
+    context = mp.get_context("spawn")
+    tasks, results = context.Queue(), context.Queue()
+    processes, startup_ms = [], []
+    for _ in range(workers):
+        receive, send = context.Pipe(duplex=False)
+        process = context.Process(target=_independent_worker, args=(tasks, results, send), daemon=True)
+        start = time.perf_counter()
+        process.start()
+        startup_ms.append(round((receive.recv() - start) * 1000, 2))
+        processes.append(process)
+    for item in items:
+        tasks.put(item)
+    for _ in items:
+        results.get()
+    stats = [{"startup_ms": ms, **memory_usage(p.pid)} for p, ms in zip(processes, startup_ms)]
+    for _ in processes:
+        tasks.put(None)
+    for process in processes:
+        process.join()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preforked vs independently loaded workers")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--jds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jds = [make_jd(rng) for _ in range(args.jds)]
+    items = [(make_resume(rng), jds) for _ in range(args.resumes)]
+
+    independent = run_independent(args.workers, items)
+
+    with PreforkPool(args.workers) as pool:
+        pool.map(match_resume, items)
+        stats = pool.stats()
+
+    print(json.dumps({
+        "independent": _summary(independent),
+        "prefork": _summary(stats["workers"]),
+        "prefork_master": stats["master"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench_rule_features.py
+# Per-resume keyword rule loops vs one sparse keyword-hit matrix for the whole batch.
+# Checks that every vectorised score equals the scalar rule it replaces.
+# Usage: python bench_rule_features.py --resumes 100000 --jds 20
+import argparse
+import random
+import time
+
+import numpy as np
+
+from nlp_utils import (analyze_career_path, count_categories, evaluate_relevant_experience,
+                       extract_jd_requirements, extract_skills, leadership_mention_score)
+from recommendation import HARD_SKILLS, SOFT_SKILLS as RECOMMENDATION_SOFT_SKILLS
+from rule_features import score_rules
+from screening import SOFT_SKILLS
+from synthetic_data import make_jd, make_resume
+
+
+def scalar_scores(resume_text, jd_skill_lists):
+    resume_lower = resume_text.lower()
+    resume_skills = set(extract_skills(resume_text))
+    row = list(count_categories(resume_text).values()) + [
+        leadership_mention_score(resume_text),
+        analyze_career_path(resume_text),
+        min(len([s for s in SOFT_SKILLS if s in resume_lower]) / len(SOFT_SKILLS), 1.0),
+        len(resume_skills & HARD_SKILLS),
+        len(resume_skills & RECOMMENDATION_SOFT_SKILLS),
+    ]
+    return row, [evaluate_relevant_experience(resume_text, skills) for skills in jd_skill_lists]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorised keyword rule scoring benchmark")
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--jds", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    resumes = [make_resume(rng, project_lines=rng.randint(2, 20)) for _ in range(args.resumes)]
+    jd_skill_lists = [extract_jd_requirements(make_jd(rng))["required_skills"] for _ in range(args.jds)]
+
+    start = time.perf_counter()
+    scalar = [scalar_scores(resume, jd_skill_lists) for resume in resumes]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores, relevant_experience = score_rules(resumes, jd_skill_lists)
+    vector_s = time.perf_counter() - start
+
+    mismatches = sum(
+        not (np.allclose(row, scores.iloc[i].to_numpy(dtype=float)) and np.allclose(coverage, relevant_experience[i]))
+        for i, (row, coverage) in enumerate(scalar)
+    )
+    print(f"{args.resumes} resumes x {args.jds} JDs")
+    print(f"scalar loops:  {scalar_s:8.2f}s")
+    print(f"sparse matrix: {vector_s:8.2f}s  ({scalar_s / vector_s:.1f}x)")
+    print(f"mismatches:    {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# bench_sharding.py
+# Search latency/throughput of the sharded index over 1, 2, 4 and 8 local shard processes,
+# checked against a single unsharded index for exact top-k agreement.
+# Usage: python bench_sharding.py --vectors 200000 --queries 200 --top-k 50
+import argparse
+import time
+
+import numpy as np
+
+from sharded_index import ShardedIndex, make_flat_index, merge_top_k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded vector index scaling benchmark")
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1, help="queries per search call")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--partition", choices=["hash", "time"], default="hash")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim), dtype=np.float32)
+    ids = np.arange(args.vectors, dtype=np.int64)
+    timestamps = np.sort(rng.integers(0, 30 * 86400, args.vectors))
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    reference = make_flat_index(args.dim)
+    reference.add_with_ids(vectors, ids)
+    ref_d, ref_i = reference.search(queries, args.top_k)
+    ref_d, ref_i = merge_top_k([ref_d], [ref_i], args.top_k)  # same tie-breaking as the shards
+
+    print(f"{args.vectors} x {args.dim} vectors, k={args.top_k}, batch={args.batch}, partition={args.partition}")
+    print(f"{'shards':>6} {'build s':>8} {'p50 ms':>8} {'p95 ms':>8} {'QPS':>8} {'exact':>6}")
+    for num_shards in args.shards:
+        with ShardedIndex(args.dim, num_shards, partition=args.partition, time_bucket=86400) as index:
+            start = time.perf_counter()
+            index.add(vectors, ids, timestamps=timestamps)
+            build_s = time.perf_counter() - start
+
+            latencies, results_d, results_i = [], [], []
+            start = time.perf_counter()
+            for offset in range(0, args.queries, args.batch):
+                call_start = time.perf_counter()
+                d, i = index.search(queries[offset:offset + args.batch], args.top_k)
+                latencies.append(time.perf_counter() - call_start)
+                results_d.append(d)
+                results_i.append(i)
+            total_s = time.perf_counter() - start
+
+            exact = np.array_equal(np.vstack(results_i), ref_i) and np.array_equal(np.vstack(results_d), ref_d)
+            p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+            print(f"{num_shards:>6} {build_s:>8.2f} {p50:>8.2f} {p95:>8.2f} {args.queries / total_s:>8.1f} {str(exact):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_spacy.py
+# Throughput of the keyword-rule extraction path vs the batched spaCy pipeline, on a single
+# document and on a large batch (docs/sec). Both produce extract_basic_info records.
+# Usage: python bench_spacy.py --docs 10000 --n-process 1 4
+import argparse
+import random
+import time
+
+from nlp_utils import extract_basic_info
+from spacy_pipeline import SPACY_MODEL, extract_basic_info_batch, load_pipeline
+from synthetic_data import make_resume
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rule vs spaCy extraction throughput")
+    parser.add_argument("--docs", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1])
+    parser.add_argument("--single-runs", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    documents = [make_resume(rng, project_lines=rng.randint(2, 20)) for _ in range(args.docs)]
+    nlp = load_pipeline()
+    print(f"spaCy pipeline: {SPACY_MODEL if 'ner' in nlp.pipe_names else 'blank en (model not installed)'} {nlp.pipe_names}")
+    extract_basic_info_batch(documents[:8])  # warm-up
+
+    print(f"{'path':<22} {'docs':>6} {'seconds':>8} {'docs/s':>8}")
+
+    def report(name, count, seconds):
+        print(f"{name:<22} {count:>6} {seconds:>8.2f} {count / seconds:>8.1f}")
+
+    start = time.perf_counter()
+    for document in documents[:args.single_runs]:
+        extract_basic_info(document)
+    report("rules single", args.single_runs, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for document in documents[:args.single_runs]:
+        extract_basic_info_batch([document])
+    report("spacy single", args.single_runs, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for document in documents:
+        extract_basic_info(document)
+    report("rules batch", len(documents), time.perf_counter() - start)
+
+    for n_process in args.n_process:
+        start = time.perf_counter()
+        extract_basic_info_batch(documents, batch_size=args.batch_size, n_process=n_process)
+        report(f"spacy batch n_process={n_process}", len(documents), time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
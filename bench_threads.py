@@ -0,0 +1,63 @@
+# bench_threads.py
+# Throughput vs latency matrix for encoder/FAISS thread counts against concurrent workers.
+# Each worker is a thread in this process, like a Streamlit session, and runs requests of
+# one resume encode plus a FAISS search over the JD corpus.
+# Usage: python bench_threads.py --threads 1 2 4 --workers 1 2 4 --requests 64
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import faiss
+import numpy as np
+
+from synthetic_data import make_jd, make_resume
+from thread_budget import configure_thread, configure_threads
+
+
+def run_requests(model, index, resumes, workers):
+    def one_request(resume_text):
+        start = time.perf_counter()
+        vector = model.encode([resume_text])
+        index.search(np.asarray(vector, dtype=np.float32), 10)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    # FAISS's thread limit is per thread, so each worker applies the configured one itself
+    with ThreadPoolExecutor(max_workers=workers, initializer=configure_thread) as pool:
+        latencies = list(pool.map(one_request, resumes))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thread budget benchmark matrix")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="intra-op threads per call")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrent workers")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--jds", type=int, default=20000)
+    args = parser.parse_args()
+
+    from faiss_engine import model
+
+    rng = random.Random(0)
+    jd_vectors = np.asarray(model.encode([make_jd(rng) for _ in range(args.jds)], batch_size=256), dtype=np.float32)
+    index = faiss.IndexFlatL2(jd_vectors.shape[1])
+    index.add(jd_vectors)
+    resumes = [make_resume(rng, project_lines=rng.randint(2, 20)) for _ in range(args.requests)]
+    run_requests(model, index, resumes[:4], 1)  # warm-up
+
+    cpu_count = os.cpu_count() or 1
+    print(f"{args.requests} requests, {args.jds} JDs, {cpu_count} CPUs")
+    print(f"{'threads':>7} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for threads in args.threads:
+        for workers in args.workers:
+            configure_threads(concurrency=workers, encoder_threads=threads, faiss_threads=threads)
+            wall, latencies = run_requests(model, index, resumes, workers)
+            p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+            marker = "  <- budget" if threads == max(1, cpu_count // workers) else ""
+            print(f"{threads:>7} {workers:>7} {len(resumes) / wall:>8.1f} {p50:>8.1f} {p95:>8.1f}{marker}")
+
+
+if __name__ == "__main__":
+    main()
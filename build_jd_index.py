@@ -0,0 +1,209 @@
+# build_jd_index.py
+# Offline build of the JD catalog served by jd_catalog.py. JDs are streamed from .txt files
+# (JDs separated by blank lines, like the sidebar input), PDFs (one JD per file) or JSONL
+# (one JSON object per line), encoded in large batches and written to a new versioned
+# artifact directory. CURRENT is switched to it only once every file is complete and its
+# checksums verify, and running apps pick the new version up on their next query.
+#
+# Usage:
+#   python build_jd_index.py jds/ extra.jsonl --output jd_catalog --batch-size 4096
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import faiss
+import numpy as np
+
+ARTIFACT_FILES = ("index.faiss", "id_map.npy", "profiles.jsonl", "offsets.npy")
+
+
+def iter_input_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def iter_jds(paths, text_field="text"):
+    """Yields (source, jd_text) one JD at a time, whatever the input size."""
+    for path in iter_input_files(paths):
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix == ".txt":
+            with open(path, encoding="utf-8") as f:
+                block, start = [], 1
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        if not block:
+                            start = line_number
+                        block.append(line)
+                    elif block:
+                        yield f"{path}:{start}", "".join(block).strip()
+                        block = []
+                if block:
+                    yield f"{path}:{start}", "".join(block).strip()
+        elif suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    if line.strip():
+                        text = json.loads(line).get(text_field, "").strip()
+                        if text:
+                            yield f"{path}:{line_number}", text
+        elif suffix == ".pdf":
+            import fitz  # PyMuPDF
+
+            with fitz.open(path) as doc:
+                text = "".join(page.get_text() for page in doc).strip()
+            if text:
+                yield path, text
+
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_artifact(version_dir, manifest):
+    mismatched = [
+        name for name in ARTIFACT_FILES
+        if file_sha256(os.path.join(version_dir, name)) != manifest["files"].get(name)
+    ]
+    if mismatched:
+        raise ValueError(f"Checksum mismatch in {version_dir}: {', '.join(mismatched)}")
+
+
+def build_artifact(paths, output_dir, version, batch_size=4096, text_field="text"):
+    """
+    Writes a complete artifact to ``output_dir`` and returns its manifest. Duplicate JDs
+    (same content hash) are kept once; IDs are row numbers in input order.
+    """
+    from faiss_engine import MODEL_ID, model
+    from jd_profiles import build_jd_profiles
+
+    dim = model.get_sentence_embedding_dimension()
+    index = faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+    jd_hashes = []
+    offsets = [0]
+    seen = set()
+    started = time.perf_counter()
+
+    os.makedirs(output_dir)
+    with open(os.path.join(output_dir, "profiles.jsonl"), "wb") as profiles_file:
+        for batch in iter_batches(iter_jds(paths, text_field), batch_size):
+            fresh = []
+            for source, text in batch:
+                key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append((source, text))
+            if not fresh:
+                continue
+
+            profiles = build_jd_profiles([text for _, text in fresh])
+            first_id = len(jd_hashes)
+            index.add_with_ids(
+                np.vstack([p["embedding"] for p in profiles]),
+                np.arange(first_id, first_id + len(profiles), dtype=np.int64),
+            )
+            for jd_id, (source, text), profile in zip(range(first_id, first_id + len(profiles)), fresh, profiles):
+                stored = {k: v for k, v in profile.items() if k != "embedding"}
+                stored.update(id=jd_id, source=source, text=text)
+                line = (json.dumps(stored) + "\n").encode("utf-8")
+                profiles_file.write(line)
+                offsets.append(offsets[-1] + len(line))
+                jd_hashes.append(profile["jd_hash"])
+            print(f"{len(jd_hashes)} JDs encoded ({time.perf_counter() - started:.1f}s)", flush=True)
+
+    faiss.write_index(index, os.path.join(output_dir, "index.faiss"))
+    np.save(os.path.join(output_dir, "id_map.npy"), np.array(jd_hashes, dtype="S64"))
+    np.save(os.path.join(output_dir, "offsets.npy"), np.array(offsets, dtype=np.int64))
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model_id": MODEL_ID,
+        "dim": dim,
+        "count": len(jd_hashes),
+        "index_type": "IDMap2,Flat",
+        "files": {name: file_sha256(os.path.join(output_dir, name)) for name in ARTIFACT_FILES},
+        # Apps compare sizes when they open a version; the checksums are verified at publish time
+        "sizes": {name: os.path.getsize(os.path.join(output_dir, name)) for name in ARTIFACT_FILES},
+    }
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def publish(root, version):
+    # Write-then-rename, so readers see either the old or the new pointer, never a partial one
+    pointer = os.path.join(root, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer + ".tmp", pointer)
+
+
+def prune(root, keep):
+    from jd_catalog import current_version
+
+    current = current_version(root)
+    versions = sorted(name for name in os.listdir(root) if os.path.isfile(os.path.join(root, name, "manifest.json")))
+    for name in versions[:-keep] if keep else []:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a versioned JD catalog artifact for the app")
+    parser.add_argument("inputs", nargs="+", help=".txt, .pdf or .jsonl files, or directories of them")
+    parser.add_argument("--output", default=os.environ.get("JD_CATALOG_DIR", "jd_catalog"), help="catalog root directory")
+    parser.add_argument("--batch-size", type=int, default=4096, help="JDs encoded per batch")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the JD text")
+    parser.add_argument("--keep", type=int, default=3, help="versions to keep after publishing (0 keeps all)")
+    parser.add_argument("--no-publish", action="store_true", help="build without switching CURRENT")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    # Timestamp first so versions sort by build time; the suffix keeps two builds in the same
+    # second from sharing a directory
+    version = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    staging = os.path.join(args.output, f".building-{version}")
+    try:
+        manifest = build_artifact(args.inputs, staging, version, args.batch_size, args.text_field)
+        os.rename(staging, os.path.join(args.output, version))
+        # Hashed once here, so the apps' request path only has to compare file sizes
+        verify_artifact(os.path.join(args.output, version), manifest)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if not args.no_publish:
+        publish(args.output, version)
+        prune(args.output, args.keep)
+    print(f"Built {version}: {manifest['count']} JDs" + ("" if args.no_publish else " (published)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bulk_encoding.py
+# Bulk encoding with the shared MiniLM model. Inputs are sorted by tokenised length and cut
+# into batches under a token budget (batch size x longest member), so short texts travel in
+# large batches, long ones in small batches, and little compute is spent on padding.
+# Embeddings are returned in the original input order.
+import os
+
+import numpy as np
+
+from faiss_engine import model
+
+# Padded tokens per forward pass; bounds activation memory as well as padding waste
+TOKEN_BUDGET = int(os.environ.get("ENCODE_TOKEN_BUDGET", 16384))
+MAX_BATCH_SIZE = 256
+
+
+def token_lengths(texts):
+    """Tokens per text as the encoder sees them: special tokens included, truncated to max_seq_length."""
+    if not texts:
+        return np.zeros(0, dtype=np.int64)
+    encoded = model.tokenizer(list(texts), add_special_tokens=True, truncation=True, max_length=model.max_seq_length)
+    return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+
+def plan_batches(sorted_lengths, token_budget=TOKEN_BUDGET, max_batch_size=MAX_BATCH_SIZE):
+    """
+    (start, end) slices over lengths sorted longest first. A batch pads to its first member,
+    so it grows until one more text would push batch size x that length over the budget.
+    """
+    batches = []
+    start = 0
+    while start < len(sorted_lengths):
+        per_batch = max(1, min(max_batch_size, token_budget // max(int(sorted_lengths[start]), 1)))
+        end = min(start + per_batch, len(sorted_lengths))
+        batches.append((start, end))
+        start = end
+    return batches
+
+
+def padding_stats(lengths, batches):
+    """Real vs padded token counts for batches given as (start, end) slices over ``lengths``."""
+    real = int(lengths.sum())
+    padded = int(sum((end - start) * lengths[start:end].max() for start, end in batches))
+    return {
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "padding_ratio": round(1 - real / padded, 4) if padded else 0.0,
+        "batches": len(batches),
+    }
+
+
+def encode_bulk(texts, token_budget=TOKEN_BUDGET, max_batch_size=MAX_BATCH_SIZE, return_stats=False):
+    texts = list(texts)
+    dim = model.get_sentence_embedding_dimension()
+    embeddings = np.empty((len(texts), dim), dtype=np.float32)
+    lengths = token_lengths(texts)
+    order = np.argsort(-lengths, kind="stable")
+    batches = plan_batches(lengths[order], token_budget, max_batch_size)
+
+    for start, end in batches:
+        positions = order[start:end]
+        embeddings[positions] = model.encode([texts[i] for i in positions], batch_size=end - start)
+
+    if return_stats:
+        return embeddings, padding_stats(lengths[order], batches)
+    return embeddings
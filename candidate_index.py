@@ -0,0 +1,251 @@
+# candidate_index.py
+# Persistent index of every processed resume, for the reverse query "which candidates fit this JD".
+# Vectors are the same MiniLM embeddings used by faiss_engine. Inserts go to SQLite immediately
+# and to the in-memory FAISS index; the FAISS index is snapshotted to disk periodically and
+# SQLite rows missing from it are replayed on load, so resumes are never re-encoded. Several
+# processes may write (the app and batch_jobs.py workers): ids from different writers
+# interleave, so replay goes by the ids each index lacks rather than by the largest id.
+# Searches catch up with rows other processes committed at most every REFRESH_SECONDS, so a
+# burst of queries costs one SQLite round trip rather than one each; this process's own
+# inserts are searchable at once. With CANDIDATE_INDEX_SHARDS above 1 the vectors live in a
+# sharded_index.ShardedIndex instead, exact search split across that many shard processes;
+# shards are not snapshotted, so every start replays the stored embeddings from SQLite.
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+
+import faiss
+import numpy as np
+
+from candidate_store import get_candidate_store
+from faiss_engine import model
+from jd_profiles import get_jd_profile
+
+INDEX_DIR = os.environ.get("CANDIDATE_INDEX_DIR", "candidate_index")
+# Exact search by default; "IDMap2,HNSW32,Flat" trades exactness for sub-millisecond queries
+INDEX_FACTORY = os.environ.get("CANDIDATE_INDEX_FACTORY", "IDMap2,Flat")
+SNAPSHOT_EVERY = 1000
+REFRESH_SECONDS = float(os.environ.get("CANDIDATE_INDEX_REFRESH_SECONDS", 2))
+SHARDS = int(os.environ.get("CANDIDATE_INDEX_SHARDS", 0))
+
+
+class CandidateIndex:
+    def __init__(self, directory=INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = os.path.join(directory, "candidates.db")
+        self.index_path = os.path.join(directory, "index.faiss")
+        self.dim = model.get_sentence_embedding_dimension()
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._indexed = set()
+        self._ids_by_hash = {}
+        # Every row with an id up to this one has been seen in SQLite
+        self._synced_id = 0
+        self._refreshed_at = 0.0
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS candidates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    resume_hash TEXT UNIQUE NOT NULL,
+                    name TEXT,
+                    embedding BLOB NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+        self._load()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _load(self):
+        if SHARDS > 1:
+            from sharded_index import ShardedIndex
+
+            self.index = ShardedIndex(self.dim, SHARDS)
+            self._indexed = set()
+        else:
+            if os.path.exists(self.index_path):
+                self.index = faiss.read_index(self.index_path)
+            else:
+                self.index = faiss.index_factory(self.dim, INDEX_FACTORY)
+            self._indexed = set(faiss.vector_to_array(self.index.id_map).tolist())
+        self.refresh()
+
+    def refresh(self):
+        """Adds rows committed by any process that this index does not hold yet."""
+        with self._lock, closing(self._connect()) as conn:
+            self._refreshed_at = time.monotonic()
+            # Committed rows only ever appear above _synced_id: SQLite serialises writers and
+            # an autoincrement id is allocated inside the writing transaction
+            rows = conn.execute(
+                "SELECT id, resume_hash FROM candidates WHERE id > ? ORDER BY id", (self._synced_id,)
+            ).fetchall()
+            if not rows:
+                return 0
+            self._ids_by_hash.update((resume_hash, candidate_id) for candidate_id, resume_hash in rows)
+            self._synced_id = rows[-1][0]
+            missing = [candidate_id for candidate_id, _ in rows if candidate_id not in self._indexed]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                fetched = conn.execute(
+                    f"SELECT id, embedding FROM candidates WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                ids = np.array([row[0] for row in fetched], dtype=np.int64)
+                vectors = np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in fetched])
+                self.index.add_with_ids(vectors, ids)
+                self._indexed.update(ids.tolist())
+            self._pending += len(missing)
+            return len(missing)
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def save(self):
+        with self._lock:
+            # Snapshot everything committed so far, whichever process wrote it
+            self.refresh()
+            if SHARDS <= 1:
+                tmp = f"{self.index_path}.{os.getpid()}.tmp"
+                faiss.write_index(self.index, tmp)
+                os.replace(tmp, self.index_path)
+            self._pending = 0
+
+    def lookup(self, resume_text):
+        """The id of an already indexed resume with this text, or None."""
+        resume_hash = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+        with self._lock:
+            return self._ids_by_hash.get(resume_hash)
+
+    def add_candidate(self, resume_text, name=None, embedding=None):
+        resume_hash = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+        with self._lock:
+            if resume_hash in self._ids_by_hash:
+                return self._ids_by_hash[resume_hash]
+
+        if embedding is None:
+            embedding = model.encode([resume_text])[0]
+        vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+
+        with self._lock:
+            if resume_hash in self._ids_by_hash:
+                return self._ids_by_hash[resume_hash]
+            with closing(self._connect()) as conn, conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO candidates (resume_hash, name, embedding, created_at) VALUES (?, ?, ?, ?)",
+                    (resume_hash, name, vector.tobytes(), datetime.now().isoformat(timespec="seconds")),
+                )
+                candidate_id = cursor.lastrowid if cursor.rowcount else None
+            if candidate_id is None:
+                # Another process stored the same resume first
+                self.refresh()
+                return self._ids_by_hash[resume_hash]
+            self.index.add_with_ids(vector, np.array([candidate_id], dtype=np.int64))
+            self._indexed.add(candidate_id)
+            self._ids_by_hash[resume_hash] = candidate_id
+            self._pending += 1
+            if self._pending >= SNAPSHOT_EVERY:
+                self.save()
+        return candidate_id
+
+    def search(self, query_vector, k=50):
+        with self._lock:
+            if time.monotonic() - self._refreshed_at >= REFRESH_SECONDS:
+                self.refresh()
+            k = min(k, self.index.ntotal)
+            if k == 0:
+                return []
+            distances, ids = self.index.search(np.asarray(query_vector, dtype=np.float32).reshape(1, -1), k)
+
+        # Approximate indexes pad with -1 when they find fewer than k neighbours
+        hits = [(int(i), dist) for i, dist in zip(ids[0], distances[0]) if i != -1]
+        if not hits:
+            return []
+        ids = [candidate_id for candidate_id, _ in hits]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, name, resume_hash FROM candidates WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        details = {row[0]: row for row in rows}
+        return [
+            {
+                "candidate_id": candidate_id,
+                "name": details[candidate_id][1],
+                "resume_hash": details[candidate_id][2],
+                "score": float(np.exp(-dist)),  # Same distance-to-similarity mapping as find_top_matches
+            }
+            for candidate_id, dist in hits
+        ]
+
+
+_candidate_index = None
+_candidate_index_lock = threading.Lock()
+# Set in preforked workers: inserts are prepared there and written by the master alone
+_insert_queue = None
+
+
+def get_candidate_index():
+    global _candidate_index
+    with _candidate_index_lock:
+        if _candidate_index is None:
+            _candidate_index = CandidateIndex()
+        return _candidate_index
+
+
+def forward_inserts(queue):
+    """Sends this process's inserts to ``queue`` for a writer process instead of writing them."""
+    global _insert_queue
+    _insert_queue = queue
+
+
+def prepare_candidate(resume_text, name=None, score=None, embedding=None):
+    """The expensive part of an insert (embedding and feature extraction), as a picklable dict."""
+    from candidate_store import extract_features
+
+    return {
+        "resume_text": resume_text,
+        "name": name,
+        "score": score,
+        "embedding": model.encode([resume_text])[0] if embedding is None else embedding,
+        "features": extract_features([resume_text])[0],
+    }
+
+
+def write_candidate(prepared):
+    candidate_id = get_candidate_index().add_candidate(
+        prepared["resume_text"], name=prepared["name"], embedding=prepared["embedding"]
+    )
+    # Same id in the columnar feature store, for boolean skill and range queries
+    get_candidate_store().append_features([candidate_id], [prepared["features"]], names=[prepared["name"]],
+                                          scores=[prepared["score"]])
+    return candidate_id
+
+
+def add_candidate(resume_text, name=None, score=None, embedding=None):
+    """
+    Indexes a resume and returns its id; None when the insert was forwarded to a writer.
+    A forwarded resume that is already indexed is not prepared again.
+    ``embedding`` saves encoding the resume again when the caller already has its vector.
+    """
+    if _insert_queue is not None:
+        # The writer dedupes too, but only after the encode here; skip resumes already indexed
+        candidate_id = get_candidate_index().lookup(resume_text)
+        if candidate_id is None:
+            _insert_queue.put(prepare_candidate(resume_text, name=name, score=score, embedding=embedding))
+        return candidate_id
+    candidate_id = get_candidate_index().add_candidate(resume_text, name=name, embedding=embedding)
+    get_candidate_store().add(candidate_id, resume_text, name=name, score=score)
+    return candidate_id
+
+
+def find_top_candidates(jd_text, k=50):
+    # The JD vector is already in the profile store, so a query never encodes anything new
+    jd_embedding = get_jd_profile(jd_text)["embedding"]
+    return get_candidate_index().search(jd_embedding, k)
@@ -0,0 +1,519 @@
+# candidate_store.py
+# Columnar store of parsed candidate features for boolean and range queries, e.g.
+#     python AND aws AND NOT only-diploma AND years >= 3
+# Every skill in the app's vocabularies and every degree flag is a bitmap over candidate
+# rows, kept in whichever of two containers is smaller: a sorted array of row numbers (4
+# bytes per candidate with the term) for rare terms, or a plain bitset (one uint64 word per
+# 64 candidates, 125 KB per million) once more than one candidate in 32 has it. Most skills
+# are rare, so they cost what they hold instead of a full bitset each. A query turns the
+# terms it names into bitsets, so AND/OR/NOT are word-wise numpy operations; the containers
+# are re-chosen whenever capacity doubles, and stored the same way in the .npz snapshot.
+# Years of experience, best grade and score are numeric columns with a sorted view, so a
+# range is two binary searches. Rows live in SQLite as they are appended; the in-memory
+# columns are snapshotted to disk periodically and rows the snapshot lacks are replayed on
+# load and before each query, by id rather than by the largest id, the same scheme as
+# candidate_index.
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+
+import numpy as np
+
+STORE_DIR = os.environ.get("CANDIDATE_STORE_DIR", "candidate_store")
+SNAPSHOT_EVERY = 10000
+NUMERIC_FIELDS = ("years", "grade", "score")
+
+# Degree flags; a candidate with a diploma and none of the degrees below is "only-diploma"
+DEGREE_FLAGS = {
+    "bachelor": ["bachelor", "b.tech", "b.e.", "b.sc", "bca", "b.com", "undergraduate"],
+    "master": ["master", "m.tech", "m.e.", "m.sc", "mca", "mba", "postgraduate"],
+    "doctorate": ["phd", "ph.d", "doctorate"],
+    "diploma": ["diploma", "polytechnic"],
+}
+
+
+def skill_vocabulary():
+    from nlp_utils import DEFAULT_SKILLS, JD_KNOWN_SKILLS
+
+    return sorted({skill.lower() for skill in JD_KNOWN_SKILLS} | {skill.lower() for skill in DEFAULT_SKILLS})
+
+
+def term_vocabulary():
+    return skill_vocabulary() + list(DEGREE_FLAGS) + ["only-diploma"]
+
+
+def grade_percent(grades):
+    """Best grade on a 0-100 scale from match_grade strings ("CGPA: 8.6", "Percentage: 92%")."""
+    best = np.nan
+    for grade in grades:
+        label, _, value = grade.partition(":")
+        try:
+            number = float(value.strip().rstrip("%"))
+        except ValueError:
+            continue
+        if label.strip().lower() in ("cgpa", "gpa"):
+            number = number * 25 if number <= 4 else number * 10
+        if number <= 100:
+            best = number if np.isnan(best) else max(best, number)
+    return best
+
+
+def extract_features(texts):
+    """Term lists, years of experience and best grade for a batch of resumes, in one keyword scan."""
+    from extraction_rules import parse_document
+    from rule_features import KeywordFeaturizer
+
+    skills = skill_vocabulary()
+    featurizer = KeywordFeaturizer(skills + [k for keywords in DEGREE_FLAGS.values() for k in keywords])
+    hits = featurizer.transform(texts).tocsr()
+    skill_columns = np.array([featurizer.position[s] for s in skills])
+    degree_hits = (hits @ featurizer.rule_matrix(list(DEGREE_FLAGS.values()))).toarray() > 0
+
+    features = []
+    for row, text in enumerate(texts):
+        found = set(hits.indices[hits.indptr[row]:hits.indptr[row + 1]])
+        terms = [skill for skill, column in zip(skills, skill_columns) if column in found]
+        terms += [flag for flag, hit in zip(DEGREE_FLAGS, degree_hits[row]) if hit]
+        if degree_hits[row, -1] and not degree_hits[row, :-1].any():
+            terms.append("only-diploma")
+        parsed = parse_document(text)
+        features.append({
+            "terms": terms,
+            "years": float(parsed["years_experience"]),
+            "grade": grade_percent(parsed["grades"]),
+        })
+    return features
+
+
+class CandidateStore:
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = os.path.join(directory, "features.db")
+        self.snapshot_path = os.path.join(directory, "columns.npz")
+        self._lock = threading.RLock()
+        self._pending = 0
+        # Every row up to this commit sequence number has been seen in SQLite
+        self._synced_seq = 0
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS features (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT,
+                    terms TEXT NOT NULL,
+                    years REAL,
+                    grade REAL,
+                    score REAL
+                )
+            """)
+            # Ids come from candidate_index and several processes commit them out of order, so
+            # rows also carry a commit sequence number to catch up by
+            if "seq" not in [row[1] for row in conn.execute("PRAGMA table_info(features)")]:
+                conn.execute("ALTER TABLE features ADD COLUMN seq INTEGER")
+                conn.execute("UPDATE features SET seq = id")
+            conn.execute("CREATE INDEX IF NOT EXISTS features_seq ON features (seq)")
+        self._load()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _reset(self, vocabulary):
+        self.vocabulary = list(vocabulary)
+        self.position = {term: i for i, term in enumerate(self.vocabulary)}
+        self.size = 0
+        self.ids = np.zeros(0, dtype=np.int64)
+        # Per term position: a bitset over the id array's capacity, or sorted rows with spare room
+        self._dense = {}
+        self._sparse = {term: np.zeros(0, dtype=np.uint32) for term in range(len(self.vocabulary))}
+        self._sparse_count = {term: 0 for term in range(len(self.vocabulary))}
+        self.columns = {field: np.zeros(0) for field in NUMERIC_FIELDS}
+        self._sorted = {field: (np.zeros(0, dtype=np.int64), np.zeros(0)) for field in NUMERIC_FIELDS}
+        self._sorted_upto = {field: 0 for field in NUMERIC_FIELDS}
+
+    def _load(self):
+        self._reset(term_vocabulary())
+        if os.path.exists(self.snapshot_path):
+            with np.load(self.snapshot_path, allow_pickle=False) as snapshot:
+                # A vocabulary change makes the term rows meaningless, and snapshots from before
+                # the sparse containers have none; both are rebuilt from SQLite
+                if list(snapshot["vocabulary"]) == self.vocabulary and "sparse_rows" in snapshot:
+                    self.size = int(snapshot["size"])
+                    self.ids = snapshot["ids"]
+                    self._dense = dict(zip(snapshot["dense_terms"].tolist(), snapshot["bits"]))
+                    offsets = snapshot["sparse_offsets"]
+                    for term, start, end in zip(snapshot["sparse_terms"].tolist(), offsets[:-1], offsets[1:]):
+                        self._sparse[term] = snapshot["sparse_rows"][start:end]
+                        self._sparse_count[term] = int(end - start)
+                    for term in self._dense:
+                        del self._sparse[term], self._sparse_count[term]
+                    self.columns = {field: snapshot[field] for field in NUMERIC_FIELDS}
+        self._known = set(self.ids[:self.size].tolist())
+        self.refresh()
+
+    def refresh(self):
+        """Appends rows committed by any process that the in-memory columns do not hold yet."""
+        with self._lock, closing(self._connect()) as conn:
+            rows = conn.execute("SELECT id, seq FROM features WHERE seq > ? ORDER BY seq", (self._synced_seq,)).fetchall()
+            if not rows:
+                return 0
+            self._synced_seq = rows[-1][1]
+            missing = [candidate_id for candidate_id, _ in rows if candidate_id not in self._known]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                fetched = conn.execute(
+                    f"SELECT id, terms, years, grade, score FROM features WHERE id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk,
+                ).fetchall()
+                self._append_rows(
+                    [row[0] for row in fetched], [json.loads(row[1]) for row in fetched],
+                    {field: [row[2 + i] for row in fetched] for i, field in enumerate(NUMERIC_FIELDS)},
+                )
+            self._pending += len(missing)
+            return len(missing)
+
+    def __len__(self):
+        return self.size
+
+    def save(self):
+        with self._lock:
+            self.refresh()
+            tmp = f"{self.snapshot_path}.{os.getpid()}.tmp.npz"
+            # Spare capacity is left out, in whole words so the arrays stay aligned on load
+            rows = (self.size + 63) // 64 * 64
+            dense_terms = sorted(self._dense)
+            sparse_terms = sorted(self._sparse)
+            counts = [self._sparse_count[term] for term in sparse_terms]
+            np.savez(
+                tmp, vocabulary=np.array(self.vocabulary), size=self.size, ids=self.ids[:rows],
+                dense_terms=np.array(dense_terms, dtype=np.int64),
+                bits=np.array([self._dense[term][:rows // 64] for term in dense_terms], dtype=np.uint64).reshape(len(dense_terms), rows // 64),
+                sparse_terms=np.array(sparse_terms, dtype=np.int64),
+                sparse_offsets=np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]),
+                sparse_rows=np.concatenate([self._sparse[term][:count] for term, count in zip(sparse_terms, counts)]
+                                           or [np.zeros(0, dtype=np.uint32)]),
+                **{field: column[:rows] for field, column in self.columns.items()},
+            )
+            os.replace(tmp, self.snapshot_path)
+            self._pending = 0
+
+    def _reserve(self, size):
+        capacity = len(self.ids)
+        if size <= capacity:
+            return
+        # Grow by doubling in whole words so bitsets stay aligned with the id array
+        capacity = max(64, ((max(size, capacity * 2) + 63) // 64) * 64)
+        self.ids = np.concatenate([self.ids, np.zeros(capacity - len(self.ids), dtype=np.int64)])
+        for term, words in self._dense.items():
+            self._dense[term] = np.concatenate([words, np.zeros(capacity // 64 - len(words), dtype=np.uint64)])
+        for field in NUMERIC_FIELDS:
+            column = self.columns[field]
+            self.columns[field] = np.concatenate([column, np.full(capacity - len(column), np.nan)])
+        # A bitset now costs twice as much: terms that have become rare go back to row arrays
+        for term, words in list(self._dense.items()):
+            rows = np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little")).astype(np.uint32)
+            if len(rows) * 4 < len(words) * 8:
+                del self._dense[term]
+                self._sparse[term], self._sparse_count[term] = rows, len(rows)
+
+    def _add_term_rows(self, term, rows):
+        if term in self._dense:
+            words = self._dense[term]
+            rows = rows.astype(np.uint64)
+            masks = np.left_shift(np.uint64(1), rows % np.uint64(64))
+            np.bitwise_or.at(words, (rows // np.uint64(64)).astype(np.int64), masks)
+            return
+        stored, count = self._sparse[term], self._sparse_count[term]
+        if count + len(rows) > len(stored):
+            grown = np.zeros(max(16, 2 * (count + len(rows))), dtype=np.uint32)
+            grown[:count] = stored[:count]
+            stored = self._sparse[term] = grown
+        stored[count:count + len(rows)] = rows
+        count = self._sparse_count[term] = count + len(rows)
+        # Switch to a bitset once the row array would be the larger of the two
+        if count * 4 > len(self.ids) // 64 * 8:
+            self._dense[term] = self._rows_to_words(stored[:count])
+            del self._sparse[term], self._sparse_count[term]
+
+    def _rows_to_words(self, rows):
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask, bitorder="little").view(np.uint64)
+
+    def bitmap_bytes(self):
+        """Bytes the term bitmaps take, and what a plain bitset per term would take instead."""
+        used = sum(words.nbytes for words in self._dense.values()) + 4 * sum(self._sparse_count.values())
+        return used, len(self.vocabulary) * len(self.ids) // 8
+
+    def _append_rows(self, ids, term_lists, numeric):
+        start = self.size
+        self._reserve(start + len(ids))
+        rows = np.arange(start, start + len(ids))
+        self.ids[rows] = ids
+        for field in NUMERIC_FIELDS:
+            self.columns[field][rows] = np.array([np.nan if v is None else v for v in numeric[field]], dtype=np.float64)
+
+        term_rows, row_numbers = [], []
+        for row, terms in zip(rows, term_lists):
+            for term in terms:
+                if term in self.position:
+                    term_rows.append(self.position[term])
+                    row_numbers.append(row)
+        if term_rows:
+            # Grouped by term; rows within a term stay ascending, so row arrays stay sorted
+            term_rows = np.array(term_rows)
+            order = np.argsort(term_rows, kind="stable")
+            term_rows, row_numbers = term_rows[order], np.array(row_numbers, dtype=np.int64)[order]
+            terms, starts = np.unique(term_rows, return_index=True)
+            for term, rows in zip(terms.tolist(), np.split(row_numbers, starts[1:])):
+                self._add_term_rows(term, rows)
+        self.size += len(ids)
+        self._known.update(ids)
+
+    def add_many(self, candidate_ids, texts, names=None, scores=None):
+        """Parses and appends candidates not already stored; returns how many were added."""
+        with self._lock:
+            new = [i for i, candidate_id in enumerate(candidate_ids) if candidate_id not in self._known]
+        if not new:
+            return 0
+        return self.append_features(
+            [candidate_ids[i] for i in new], extract_features([texts[i] for i in new]),
+            names=[names[i] for i in new] if names is not None else None,
+            scores=[scores[i] for i in new] if scores is not None else None,
+        )
+
+    def append_features(self, candidate_ids, features, names=None, scores=None):
+        """Appends already-extracted features for candidate_index ids, in any order."""
+        names = names if names is not None else [None] * len(candidate_ids)
+        scores = scores if scores is not None else [None] * len(candidate_ids)
+        with self._lock:
+            # Another thread may have added some of them while this batch was parsed
+            kept = [
+                (candidate_id, f, name, score)
+                for candidate_id, f, name, score in zip(candidate_ids, features, names, scores)
+                if candidate_id not in self._known
+            ]
+            if not kept:
+                return 0
+            rows = [
+                (candidate_id, name, json.dumps(f["terms"]), f["years"],
+                 None if np.isnan(f["grade"]) else f["grade"], score)
+                for candidate_id, f, name, score in kept
+            ]
+            with closing(self._connect()) as conn, conn:
+                # Writers are serialised, so MAX(seq) + 1 grows in commit order
+                conn.executemany(
+                    "INSERT OR IGNORE INTO features (id, name, terms, years, grade, score, seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM features))",
+                    rows,
+                )
+            self._append_rows(
+                [row[0] for row in rows], [f["terms"] for _, f, _, _ in kept],
+                {field: [row[3 + i] for row in rows] for i, field in enumerate(NUMERIC_FIELDS)},
+            )
+            self._pending += len(rows)
+            if self._pending >= SNAPSHOT_EVERY:
+                self.save()
+        return len(rows)
+
+    def add(self, candidate_id, resume_text, name=None, score=None):
+        return self.add_many([candidate_id], [resume_text], [name], [score])
+
+    # --- Queries ---
+
+    def _all_rows(self):
+        words = np.zeros(len(self.ids) // 64, dtype=np.uint64)
+        full, rest = divmod(self.size, 64)
+        words[:full] = np.iinfo(np.uint64).max
+        if rest:
+            words[full] = np.uint64((1 << rest) - 1)
+        return words
+
+    def term_bits(self, term):
+        term = term.lower()
+        if term not in self.position:
+            raise ValueError(f"Unknown skill or flag: {term}")
+        position = self.position[term]
+        if position in self._dense:
+            return self._dense[position]
+        return self._rows_to_words(self._sparse[position][:self._sparse_count[position]])
+
+    def _sorted_column(self, field):
+        # Rows appended since the last range query are sorted on their own and merged in
+        rows, values = self._sorted[field]
+        upto = self._sorted_upto[field]
+        if upto < self.size:
+            new_rows = np.arange(upto, self.size)
+            new_values = self.columns[field][upto:self.size]
+            present = ~np.isnan(new_values)
+            new_rows, new_values = new_rows[present], new_values[present]
+            order = np.argsort(new_values, kind="stable")
+            new_rows, new_values = new_rows[order], new_values[order]
+            at = np.searchsorted(values, new_values, side="right")
+            rows, values = np.insert(rows, at, new_rows), np.insert(values, at, new_values)
+            self._sorted[field] = (rows, values)
+            self._sorted_upto[field] = self.size
+        return rows, values
+
+    def range_bits(self, field, low=None, high=None, include_low=True, include_high=True):
+        if field not in NUMERIC_FIELDS:
+            raise ValueError(f"Unknown numeric field: {field}")
+        rows, values = self._sorted_column(field)
+        start = 0 if low is None else np.searchsorted(values, low, side="left" if include_low else "right")
+        end = len(values) if high is None else np.searchsorted(values, high, side="right" if include_high else "left")
+        return self._rows_to_words(rows[start:end])
+
+    def query(self, expression, limit=None):
+        """Candidate ids matching ``expression``, in insertion order."""
+        with self._lock:
+            self.refresh()
+            words = _QueryParser(self, expression).parse()
+            rows = np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little")[:self.size])
+            if limit is not None:
+                rows = rows[:limit]
+            return self.ids[rows].copy()
+
+    def count(self, expression):
+        with self._lock:
+            self.refresh()
+            return int(np.unpackbits(_QueryParser(self, expression).parse().view(np.uint8)).sum())
+
+    def describe(self, candidate_ids):
+        candidate_ids = [int(i) for i in candidate_ids]
+        if not candidate_ids:
+            return []
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT id, name, terms, years, grade, score FROM features WHERE id IN ({','.join('?' * len(candidate_ids))})",
+                candidate_ids,
+            ).fetchall()
+        details = {row[0]: row for row in rows}
+        return [
+            {"candidate_id": i, "name": details[i][1], "terms": json.loads(details[i][2]),
+             "years": details[i][3], "grade": details[i][4], "score": details[i][5]}
+            for i in candidate_ids if i in details
+        ]
+
+
+_TOKEN_PATTERN = re.compile(
+    r'\s*(?:(?P<quoted>"[^"]*")|(?P<paren>[()])|(?P<op>>=|<=|==|=|>|<)'
+    r'|(?P<plus>\d+(?:\.\d+)?\+)|(?P<word>[^\s()<>=!"]+))'
+)
+_RANGE_OPS = {
+    ">=": dict(include_low=True), ">": dict(include_low=False),
+    "<=": dict(include_high=True), "<": dict(include_high=False),
+}
+
+
+class _QueryParser:
+    """
+    expression := clause (OR clause)*
+    clause     := factor ((AND)? factor)*
+    factor     := NOT factor | "(" expression ")" | field op number | N+ years | term
+    Terms are skills or degree flags; multi-word skills are quoted ("machine learning").
+    """
+
+    def __init__(self, store, expression):
+        self.store = store
+        self.tokens = []
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = _TOKEN_PATTERN.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError(f"Cannot parse query near: {expression[position:]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            position = match.end()
+        self.index = 0
+
+    def _peek(self):
+        return self.tokens[self.index] if self.index < len(self.tokens) else (None, None)
+
+    def _keyword(self, word):
+        kind, value = self._peek()
+        return kind == "word" and value.upper() == word
+
+    def parse(self):
+        if not self.tokens:
+            return self.store._all_rows()
+        words = self._expression()
+        if self.index < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.index][1]!r} in query")
+        return words
+
+    def _expression(self):
+        words = self._clause()
+        while self._keyword("OR"):
+            self.index += 1
+            words = words | self._clause()
+        return words
+
+    def _clause(self):
+        words = self._factor()
+        while True:
+            kind, value = self._peek()
+            if self._keyword("AND"):
+                self.index += 1
+            elif kind is None or kind == "paren" and value == ")" or self._keyword("OR"):
+                return words
+            words = words & self._factor()
+
+    def _factor(self):
+        kind, value = self._peek()
+        if kind is None:
+            raise ValueError("Query ends unexpectedly")
+        self.index += 1
+        if kind == "word" and value.upper() == "NOT":
+            return self.store._all_rows() & ~self._factor()
+        if kind == "paren" and value == "(":
+            words = self._expression()
+            if self._peek() != ("paren", ")"):
+                raise ValueError("Missing ) in query")
+            self.index += 1
+            return words
+        if kind == "plus":
+            # "3+ years"
+            if self._keyword("YEARS") or self._keyword("YEAR"):
+                self.index += 1
+            return self.store.range_bits("years", low=float(value[:-1]))
+        if kind == "word" and value.lower() in NUMERIC_FIELDS and self._peek()[0] == "op":
+            op = self.tokens[self.index][1]
+            self.index += 1
+            number_kind, number = self._peek()
+            self.index += 1
+            try:
+                number = float(number)
+            except (TypeError, ValueError):
+                raise ValueError(f"Expected a number after {value} {op}")
+            if op in ("=", "=="):
+                return self.store.range_bits(value.lower(), low=number, high=number)
+            bound = "low" if op.startswith(">") else "high"
+            return self.store.range_bits(value.lower(), **{bound: number}, **_RANGE_OPS[op])
+        if kind == "quoted":
+            return self.store.term_bits(value[1:-1])
+        if kind == "word":
+            return self.store.term_bits(value)
+        raise ValueError(f"Unexpected {value!r} in query")
+
+
+_candidate_store = None
+_candidate_store_lock = threading.Lock()
+
+
+def get_candidate_store():
+    global _candidate_store
+    with _candidate_store_lock:
+        if _candidate_store is None:
+            _candidate_store = CandidateStore()
+        return _candidate_store
+
+
+def query_candidates(expression, limit=100):
+    store = get_candidate_store()
+    return store.describe(store.query(expression, limit=limit))
@@ -0,0 +1,212 @@
+# cascade.py
+# Staged ranking for bulk screening. Most candidates miss a JD's basic requirements, so the
+# requirements from the JD profiles (must-have skills, minimum experience, degree) are
+# checked first with one keyword-hit matrix and a regex pass per resume. Only candidates
+# that meet at least one JD are embedded and scored against the JD vectors, and only those
+# above the dense threshold get the full screening score. Every stage reports how many
+# candidates went in and out and how long it took; skipped work is priced at the measured
+# per-candidate cost of the stage that was skipped. The full score only covers the JDs a
+# candidate got through both cheap stages for. Batch screening jobs created with cascade=True
+# run the first two stages per candidate (screen_candidate) and only build the full record,
+# reusing the stage-2 embedding, for candidates that get through.
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+MIN_SKILL_COVERAGE = float(os.environ.get("CASCADE_MIN_SKILL_COVERAGE", 0.4))
+# Years below a JD's minimum still accepted; screening gives partial credit down to min - 1
+EXPERIENCE_TOLERANCE = int(os.environ.get("CASCADE_EXPERIENCE_TOLERANCE", 1))
+REQUIRE_DEGREE = os.environ.get("CASCADE_REQUIRE_DEGREE", "1") == "1"
+# Same similarity as the Role Matching tab: exp(-squared L2 distance)
+MIN_DENSE_SCORE = float(os.environ.get("CASCADE_MIN_DENSE_SCORE", 0.3))
+
+# Degree keywords that satisfy a JD's required_degree; a higher degree satisfies a lower one
+DEGREE_KEYWORDS = {
+    "bachelor": ["bachelor", "b.tech", "b.e.", "b.sc", "bca", "b.com", "undergraduate"],
+    "master": ["master", "m.tech", "m.e.", "m.sc", "mca", "mba", "postgraduate"],
+    "doctorate": ["phd", "ph.d", "doctorate"],
+}
+DEGREE_ORDER = ["bachelor", "master", "doctorate"]
+
+
+def requirement_filter(resume_texts, profiles, min_skill_coverage=MIN_SKILL_COVERAGE,
+                       experience_tolerance=EXPERIENCE_TOLERANCE, require_degree=REQUIRE_DEGREE):
+    """
+    Stage 1. Returns an (n_resumes, n_jds) boolean matrix of candidates meeting each JD's
+    hard requirements, plus the features it was decided on.
+    """
+    from extraction_rules import scan_experience
+    from rule_features import get_featurizer
+
+    skill_lists = [profile.get("required_skills", []) for profile in profiles]
+    degree_sets = [
+        [k for level in DEGREE_ORDER[i:] for k in DEGREE_KEYWORDS[level]] for i in range(len(DEGREE_ORDER))
+    ]
+    extra = {s.lower() for skills in skill_lists for s in skills} | {k for keywords in degree_sets for k in keywords}
+    featurizer = get_featurizer(tuple(sorted(extra)))
+    hits = featurizer.transform(resume_texts)
+
+    totals = np.array([len(skills) for skills in skill_lists], dtype=np.float64)
+    coverage = (hits @ featurizer.rule_matrix(skill_lists)).toarray() / np.maximum(totals, 1)
+    # A JD without recognised skills constrains nothing here
+    coverage[:, totals == 0] = 1.0
+
+    # Highest degree level mentioned: 0 none, 1 bachelor, 2 master, 3 doctorate
+    # (degree_sets are nested, so the number of sets hit is the level)
+    degree_level = ((hits @ featurizer.rule_matrix(degree_sets)).toarray() > 0).sum(axis=1)
+    required_level = np.array(
+        [DEGREE_ORDER.index(p["required_degree"]) + 1 if p.get("required_degree") in DEGREE_ORDER else 0
+         for p in profiles]
+    )
+
+    years = np.array([scan_experience(text)["screening_years"] for text in resume_texts], dtype=np.float64)
+    min_experience = np.array([p.get("min_experience", 0) for p in profiles], dtype=np.float64)
+
+    passed = (coverage >= min_skill_coverage) & (years[:, None] >= min_experience - experience_tolerance)
+    if require_degree:
+        passed &= degree_level[:, None] >= required_level
+    return passed, {"skill_coverage": coverage, "years": years, "degree_level": degree_level}
+
+
+def dense_scores(resume_texts, jd_embeddings, return_vectors=False):
+    """
+    Stage 2. exp(-squared L2 distance) of every resume to every JD, with one bulk encode.
+    With ``return_vectors`` also returns the resume embeddings.
+    """
+    from bulk_encoding import encode_bulk
+
+    vectors = encode_bulk(resume_texts)
+    distances = (
+        (vectors ** 2).sum(axis=1)[:, None] - 2 * vectors @ jd_embeddings.T + (jd_embeddings ** 2).sum(axis=1)
+    )
+    scores = np.exp(-np.maximum(distances, 0.0))
+    if return_vectors:
+        return scores, vectors
+    return scores
+
+
+def cheap_stages(resume_texts, profiles, min_skill_coverage=MIN_SKILL_COVERAGE,
+                 experience_tolerance=EXPERIENCE_TOLERANCE, require_degree=REQUIRE_DEGREE,
+                 min_dense_score=MIN_DENSE_SCORE):
+    """
+    Stages 1 and 2. Returns (passed, features, dense, stage1, stage2, stages, vectors): the
+    (n_resumes, n_jds) matrix of JDs each resume got through both stages for, the requirement
+    features, each resume's best dense score over the JDs it met (NaN if it met none), the
+    indices surviving each stage, the per-stage counts and timings, and the stage-2 embeddings
+    (one row per index in stage1).
+    """
+    n = len(resume_texts)
+    stages = []
+
+    start = time.perf_counter()
+    passed, features = requirement_filter(resume_texts, profiles, min_skill_coverage, experience_tolerance,
+                                          require_degree)
+    stage1 = np.flatnonzero(passed.any(axis=1))
+    stages.append({"stage": "requirements", "in": n, "out": len(stage1), "seconds": time.perf_counter() - start})
+
+    start = time.perf_counter()
+    dense = np.full(n, np.nan)
+    vectors = None
+    if len(stage1):
+        jd_embeddings = np.vstack([profile["embedding"] for profile in profiles])
+        pair_scores, vectors = dense_scores([resume_texts[i] for i in stage1], jd_embeddings, return_vectors=True)
+        # Only JDs whose requirements the candidate met count towards the dense score
+        pair_scores = np.where(passed[stage1], pair_scores, 0.0)
+        dense[stage1] = pair_scores.max(axis=1)
+        passed[stage1] &= pair_scores >= min_dense_score
+    stage2 = stage1[dense[stage1] >= min_dense_score]
+    stages.append({"stage": "dense", "in": len(stage1), "out": len(stage2), "seconds": time.perf_counter() - start})
+    return passed, features, dense, stage1, stage2, stages, vectors
+
+
+def stage_report(stages):
+    """
+    Totals for [requirements, dense, full] stage counts and timings: candidates in, the
+    work skipped and its cost, priced at what each stage took per candidate it processed.
+    """
+    requirements, dense, full = stages
+    dense_per_item = dense["seconds"] / max(dense["in"], 1)
+    full_per_item = full["seconds"] / max(full["in"], 1)
+    encodes_saved = requirements["in"] - dense["in"]
+    full_scores_saved = requirements["in"] - full["in"]
+    return {
+        "stages": [{**stage, "seconds": round(stage["seconds"], 3)} for stage in stages],
+        "encodes_saved": encodes_saved,
+        "full_scores_saved": full_scores_saved,
+        "estimated_seconds_saved": round(encodes_saved * dense_per_item + full_scores_saved * full_per_item, 3),
+        "seconds": round(sum(stage["seconds"] for stage in stages), 3),
+    }
+
+
+def screen_candidate(resume_text, jd_list):
+    """
+    The cheap stages for one resume, for workers that score candidates as they arrive.
+    Returns (stage reached, details); only "full" candidates need the full screening score.
+    ``details`` carries the stage-2 embedding (None if the resume was not encoded) and the
+    stage counts and timings.
+    """
+    from jd_profiles import ingest_jds
+
+    profiles = ingest_jds(jd_list)
+    _, features, dense, stage1, stage2, stages, vectors = cheap_stages([resume_text], profiles)
+    stage = "full" if len(stage2) else "dense" if len(stage1) else "requirements"
+    return stage, {
+        "skill_coverage": float(features["skill_coverage"].max()) if len(profiles) else 0.0,
+        "years": float(features["years"][0]),
+        "dense_score": None if np.isnan(dense[0]) else float(dense[0]),
+        "embedding": vectors[0] if len(stage1) else None,
+        "stages": stages,
+    }
+
+
+def cascade_rank(resume_texts, jd_list, names=None, min_skill_coverage=MIN_SKILL_COVERAGE,
+                 experience_tolerance=EXPERIENCE_TOLERANCE, require_degree=REQUIRE_DEGREE,
+                 min_dense_score=MIN_DENSE_SCORE, max_full_scores=None):
+    """
+    Ranks resumes against the JDs through the three stages. ``max_full_scores`` optionally
+    caps stage 3 to the best dense scores. Returns (table, report): one row per resume with
+    the last stage it reached, full-score survivors ranked first, and per-stage counts,
+    timings and the compute the cascade saved.
+    """
+    from jd_profiles import ingest_jds
+    from screening import score_resume_against_jds
+
+    resume_texts = list(resume_texts)
+    names = list(names) if names is not None else list(range(len(resume_texts)))
+    n = len(resume_texts)
+    profiles = ingest_jds(jd_list)
+    passed, features, dense, stage1, stage2, stages, _ = cheap_stages(
+        resume_texts, profiles, min_skill_coverage, experience_tolerance, require_degree, min_dense_score
+    )
+    if max_full_scores is not None and len(stage2) > max_full_scores:
+        stage2 = stage2[np.argsort(-dense[stage2], kind="stable")[:max_full_scores]]
+        stages[-1]["out"] = len(stage2)
+
+    start = time.perf_counter()
+    screening = np.full(n, np.nan)
+    best_jd = np.full(n, -1)
+    for i in stage2:
+        jd_indices = np.flatnonzero(passed[i])
+        best = score_resume_against_jds(resume_texts[i], [jd_list[j] for j in jd_indices]).iloc[0]
+        screening[i] = best["overall"]
+        best_jd[i] = jd_indices[best["jd_index"]]
+    stages.append({"stage": "full", "in": len(stage2), "out": len(stage2), "seconds": time.perf_counter() - start})
+
+    reached = np.full(n, "requirements", dtype=object)
+    reached[stage1] = "dense"
+    reached[stage2] = "full"
+    table = pd.DataFrame({
+        "candidate": names,
+        "stage": reached,
+        "skill_coverage": features["skill_coverage"].max(axis=1) if len(profiles) else 0.0,
+        "years": features["years"],
+        "degree_level": features["degree_level"],
+        "dense_score": dense,
+        "screening_score": screening,
+        "best_jd_index": best_jd,
+    })
+    table = table.sort_values(["screening_score", "dense_score"], ascending=False, na_position="last",
+                              kind="stable").reset_index(drop=True)
+    return table, stage_report(stages)
@@ -0,0 +1,85 @@
+# evidence.py
+# Explains a resume/JD match by pointing at the resume sentences that best support each JD
+# requirement. Sentences are encoded once, in batches, and cached by content hash, so an
+# explanation for any number of JDs is a single requirement-by-sentence matrix multiply
+# over cached unit vectors.
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from faiss_engine import model
+
+SENTENCE_CACHE_SIZE = 50000
+MIN_SENTENCE_WORDS = 3
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+|\s*[•●▪]\s*")
+
+_sentence_vectors = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def split_sentences(text):
+    sentences = (s.strip(" -*\t") for s in _SENTENCE_SPLIT.split(text))
+    return list(dict.fromkeys(s for s in sentences if len(s.split()) >= MIN_SENTENCE_WORDS))
+
+
+def encode_sentences(sentences):
+    """Unit-length vectors for the sentences, encoding only those not already cached."""
+    keys = [hashlib.sha256(s.encode("utf-8")).hexdigest() for s in sentences]
+    with _cache_lock:
+        vectors = [_sentence_vectors.get(key) for key in keys]
+        for key, vector in zip(keys, vectors):
+            if vector is not None:
+                _sentence_vectors.move_to_end(key)
+
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        encoded = np.asarray(model.encode([sentences[i] for i in missing], batch_size=64), dtype=np.float32)
+        encoded /= np.maximum(np.linalg.norm(encoded, axis=1, keepdims=True), 1e-12)
+        with _cache_lock:
+            for i, vector in zip(missing, encoded):
+                vector.setflags(write=False)
+                vectors[i] = vector
+                _sentence_vectors[keys[i]] = vector
+            while len(_sentence_vectors) > SENTENCE_CACHE_SIZE:
+                _sentence_vectors.popitem(last=False)
+
+    if not vectors:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.vstack(vectors)
+
+
+def explain_matches(resume_text, jd_texts, top_n=2):
+    """
+    For each JD, returns its requirement sentences with the ``top_n`` most similar resume
+    sentences (cosine similarity). All JDs are scored in one matrix multiply.
+    """
+    resume_sentences = split_sentences(resume_text)
+    jd_sentences = [split_sentences(jd) for jd in jd_texts]
+    requirements = [s for sentences in jd_sentences for s in sentences]
+    if not resume_sentences or not requirements:
+        return [[] for _ in jd_texts]
+
+    # One encode batch for whatever is not cached yet, then one matmul for every JD
+    vectors = encode_sentences(requirements + resume_sentences)
+    similarity = vectors[:len(requirements)] @ vectors[len(requirements):].T
+    top_n = min(top_n, len(resume_sentences))
+    best = np.argsort(-similarity, axis=1, kind="stable")[:, :top_n]
+
+    explanations = []
+    row = 0
+    for sentences in jd_sentences:
+        explanation = []
+        for requirement in sentences:
+            explanation.append({
+                "requirement": requirement,
+                "evidence": [
+                    {"sentence": resume_sentences[j], "similarity": float(similarity[row, j])} for j in best[row]
+                ],
+            })
+            row += 1
+        explanations.append(explanation)
+    return explanations
@@ -0,0 +1,143 @@
+# extraction_rules.py
+# Extraction rules declared once and compiled at import into combined patterns,
+# so a document is classified line by line in a single match per line.
+import re
+
+# Section headers, in priority order: the first rule that matches anywhere in a line wins
+SECTION_RULES = [
+    ("Education", r"education|educational background|academic profile|academics|scholastic|education & certifications"),
+    ("Projects", r"project"),
+    ("Training", r"training|certification"),
+    ("Activities", r"extra[- ]?curricular|activities"),
+]
+
+GRADE_LABELS = r"CGPA|GPA|Percentage|Grade"
+
+JOB_TITLE_CUES = r"we are hiring for|looking for|position:|role:"
+
+# Section patterns run case-sensitively against lowercased lines, which is much cheaper than re.I.
+# Plain alternation finds whether any rule matches in one scan (most lines match none)
+_SECTION_ANY_PATTERN = re.compile(
+    "|".join(rf"(?P<s{i}>{pattern})" for i, (_, pattern) in enumerate(SECTION_RULES))
+)
+# Lookahead branches make alternation order follow rule priority rather than match position
+_SECTION_PRIORITY_PATTERN = re.compile(
+    "|".join(rf"(?=.*?(?P<s{i}>{pattern}))" for i, (_, pattern) in enumerate(SECTION_RULES))
+)
+_SECTION_NAMES = {f"s{i}": name for i, (name, _) in enumerate(SECTION_RULES)}
+
+_GRADE_HINTS = ("gpa", "percentage", "grade")
+# A line is a grade line when a label appears as a whole word, but the value is taken from
+# the first label followed by a number anywhere in it ("Upgrade 9 ... GPA: 8.5" gives
+# "grade: 9"), exactly as the original parser did
+_GRADE_LINE = re.compile(rf"\b(?:{GRADE_LABELS})\b", re.I)
+_GRADE_PATTERN = re.compile(
+    rf"(?P<label>{GRADE_LABELS})\s*[:;/\\\-]?\s*(?P<value>[0-9]{{1,2}}(?:\.[0-9]{{1,2}})?%?)",
+    re.I,
+)
+
+# One scan covers every experience phrasing used by the resume and JD parsers:
+#   resume:    "<n>[+] years|yrs [of ]experience"
+#   screening: "<n>[+][ ]years|yrs [of ]experience", ignoring "<n>th year student" resumes
+#   JD:        "<n>[+] year[s] of experience"
+# Both branches share the leading number, which lets the scanner skip straight to digits.
+_EXPERIENCE_PATTERN = re.compile(
+    r"(?P<years>\d+)(?:"
+    r"(?:st|nd|rd|th)?\s+year\s+(?P<academic>student|b\.?tech|m\.?tech|undergraduate)"
+    r"|\+?(?P<gap>\s*)(?P<unit>years?|yrs)(?P<sep>\s+)(?P<of>of\s+)?experience)",
+    re.I,
+)
+
+_JOB_TITLE_PATTERN = re.compile(rf"(?i)({JOB_TITLE_CUES})\s+([\w\s\-\/]+)")
+
+
+def _classify_lowered(line):
+    match = _SECTION_ANY_PATTERN.search(line)
+    if not match:
+        return None
+    if match.lastgroup != "s0":
+        # A header line can hit several rules; resolve to the highest-priority one
+        match = _SECTION_PRIORITY_PATTERN.match(line)
+    return _SECTION_NAMES[match.lastgroup]
+
+
+def classify_line(line):
+    return _classify_lowered(line.lower())
+
+
+def match_grade(line):
+    if not _GRADE_LINE.search(line):
+        return None
+    match = _GRADE_PATTERN.search(line)
+    return f"{match.group('label')}: {match.group('value')}" if match else None
+
+
+def scan_experience(text):
+    """
+    Single pass over ``text`` that fills every experience field at once:
+    resume years, screening years (capped at 50, zeroed for students) and JD minimum.
+    """
+    resume_years = []
+    screening_years = []
+    jd_min_experience = None
+    academic = False
+
+    for match in _EXPERIENCE_PATTERN.finditer(text):
+        if match.group("academic"):
+            academic = True
+            continue
+
+        years = int(match.group("years"))
+        unit = match.group("unit").lower()
+        of = match.group("of")
+        spaced = bool(match.group("gap"))
+
+        if unit != "year":
+            screening_years.append(years)
+            if spaced and (of is None or of.lower() == "of "):
+                resume_years.append(years)
+        if jd_min_experience is None and spaced and unit != "yrs" and match.group("sep") == " " \
+                and of is not None and of.lower() == "of ":
+            jd_min_experience = years
+
+    screening_years = [y for y in screening_years if y <= 50]
+    return {
+        "years_experience": max(resume_years, default=0),
+        "screening_years": 0 if academic else max(screening_years, default=0),
+        "min_experience": jd_min_experience or 0,
+    }
+
+
+def match_job_title(jd_text):
+    match = _JOB_TITLE_PATTERN.search(jd_text)
+    return match.group(2).strip() if match else None
+
+
+def parse_document(text):
+    """
+    One pass over the document: section membership and grades per line,
+    plus the experience fields, in a single dict.
+    """
+    sections = {"General": []}
+    current_section = "General"
+    grades = []
+
+    for line, lowered in zip(text.splitlines(), text.lower().splitlines()):
+        line_clean = line.strip()
+
+        section = _classify_lowered(lowered)
+        if section:
+            current_section = section
+            sections.setdefault(current_section, [])
+
+        if line_clean:
+            sections[current_section].append(line_clean)
+            if any(hint in lowered for hint in _GRADE_HINTS):
+                grade = match_grade(line_clean)
+                if grade:
+                    grades.append(grade)
+
+    fields = scan_experience(text)
+    fields["sections"] = sections
+    fields["grades"] = grades
+    return fields
@@ -1,39 +1,100 @@
 # faiss_engine.py
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
 # Load model globally once
-model = SentenceTransformer("all-MiniLM-L6-v2")
+MODEL_ID = "all-MiniLM-L6-v2"
+model = SentenceTransformer(MODEL_ID)
+
+# Above this many JDs, BM25 prefilters candidates before dense re-ranking
+HYBRID_MIN_CORPUS = 1000
+
+# Squared L2 distance per (resume hash, JD hash), least recently used evicted first. Editing
+# a JD changes its hash, so after an edit only that JD is embedded and scored again.
+PAIR_CACHE_SIZE = 100000
+_pair_distances = OrderedDict()
+_pair_lock = threading.Lock()
 
 def build_faiss_index(job_descriptions):
+    # Only the benchmarks build one now: find_top_matches ranks cached pair distances itself
     if not job_descriptions:
         raise ValueError("Job descriptions list is empty.")
 
-    embeddings = model.encode(job_descriptions)
+    # JD vectors come from the profile store, so only unseen JDs are encoded
+    from jd_profiles import get_jd_embeddings
+    embeddings = get_jd_embeddings(job_descriptions)
     index = faiss.IndexFlatL2(embeddings.shape[1])
     index.add(np.array(embeddings))
     return index, embeddings
 
 
-def find_top_matches(resume_text, job_descriptions, top_k=3):
+def _content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def embed_resume(resume_text):
+    embedding = model.encode([resume_text])[0]
+    embedding.setflags(write=False)
+    return embedding
+
 
+def jd_distances(resume_text, job_descriptions, resume_embedding=None):
+    resume_key = _content_hash(resume_text)
+    keys = [(resume_key, _content_hash(jd)) for jd in job_descriptions]
+    with _pair_lock:
+        distances = np.array([_pair_distances.get(key, np.nan) for key in keys])
+        for key, distance in zip(keys, distances):
+            if not np.isnan(distance):
+                _pair_distances.move_to_end(key)
+
+    missing = np.flatnonzero(np.isnan(distances))
+    if len(missing):
+        # Unchanged JDs keep their cached scores; only new or edited ones are embedded
+        from jd_profiles import get_jd_embeddings
+        vectors = get_jd_embeddings([job_descriptions[i] for i in missing])
+        if resume_embedding is None:
+            resume_embedding = embed_resume(resume_text)
+        distances[missing] = ((vectors - resume_embedding) ** 2).sum(axis=1)
+        with _pair_lock:
+            for i in missing:
+                _pair_distances[keys[i]] = float(distances[i])
+            while len(_pair_distances) > PAIR_CACHE_SIZE:
+                _pair_distances.popitem(last=False)
+    return distances
+
+
+def find_top_matches(resume_text, job_descriptions, top_k=3, resume_embedding=None):
+    """
+    The ``top_k`` closest JDs by L2 distance. Up to HYBRID_MIN_CORPUS JDs, the distances come
+    from the pair cache and are ranked with a stable argsort instead of building a FAISS
+    IndexFlatL2 per call: the ranking is the same exhaustive search, and only new or edited
+    JDs cost anything. Larger corpora go through the BM25 prefilter in hybrid_search.
+    """
     if not job_descriptions:
         return []
-     
-    # Step 1: Embed all JDs and build index
-    index, jd_embeddings = build_faiss_index(job_descriptions)
 
-    # Step 2: Embed the resume
-    resume_embedding = model.encode([resume_text])
+    if len(job_descriptions) > HYBRID_MIN_CORPUS:
+        from hybrid_search import hybrid_top_matches
+        return hybrid_top_matches(resume_text, job_descriptions, top_k=top_k, resume_embedding=resume_embedding)
+     
+    # Step 1: Distances to every JD, reusing cached vectors and scores for unchanged JDs
+    distances = jd_distances(resume_text, job_descriptions, resume_embedding)
 
-    # Step 3: Search
-    distances, indices = index.search(np.array(resume_embedding), top_k)
+    # Step 2: Exhaustive nearest neighbours, same ranking as an IndexFlatL2 search
+    indices = np.argsort(distances, kind="stable")[:top_k]
 
-    # Step 4: Return results
+    # Step 3: Return results
     matches = []
-    for i, dist in zip(indices[0], distances[0]):
+    for i, dist in zip(indices, distances[indices]):
         matches.append({
+            "index": int(i),
             "job_description": job_descriptions[i],
             "score": float(np.exp(-dist))  # Converts distance into a similarity score (0 to 1)
         })
@@ -0,0 +1,96 @@
+# hybrid_search.py
+from functools import lru_cache
+
+import numpy as np
+
+from faiss_engine import jd_distances
+from token_index import query_token_ids, token_counts
+
+
+class BM25Index:
+    """Inverted-index BM25 over a fixed JD corpus, built on the shared token index."""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.num_docs = len(documents)
+
+        doc_terms, doc_tfs = zip(*(token_counts(doc) for doc in documents)) if documents else ((), ())
+        doc_lengths = np.fromiter((tfs.sum() for tfs in doc_tfs), dtype=np.float64, count=self.num_docs)
+        avg_length = doc_lengths.mean() if self.num_docs else 0.0
+
+        terms = np.concatenate(doc_terms) if doc_terms else np.zeros(0, dtype=np.int64)
+        tfs = np.concatenate(doc_tfs).astype(np.float64) if doc_tfs else np.zeros(0)
+        docs = np.repeat(np.arange(self.num_docs), [len(t) for t in doc_terms])
+
+        # Sort postings by term so each term's postings are one contiguous slice
+        order = np.argsort(terms, kind="stable")
+        terms, tfs, docs = terms[order], tfs[order], docs[order]
+        self.vocab, starts, doc_freq = np.unique(terms, return_index=True, return_counts=True)
+        self.starts = starts
+        self.ends = starts + doc_freq
+        self.postings = docs
+
+        idf = np.log(1 + (self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        length_norm = k1 * (1 - b + b * doc_lengths / max(avg_length, 1e-9))
+        # Per-posting contribution is query independent, so precompute it once
+        self.weights = np.repeat(idf, doc_freq) * tfs * (k1 + 1) / (tfs + length_norm[docs])
+
+    def scores(self, query_text):
+        query_terms = query_token_ids(query_text)
+        positions = np.searchsorted(self.vocab, query_terms)
+        in_range = positions < len(self.vocab)
+        positions, query_terms = positions[in_range], query_terms[in_range]
+        positions = positions[self.vocab[positions] == query_terms]
+
+        if len(positions) == 0:
+            return np.zeros(self.num_docs)
+
+        slices = [np.arange(self.starts[p], self.ends[p]) for p in positions]
+        hit = np.concatenate(slices)
+        return np.bincount(self.postings[hit], weights=self.weights[hit], minlength=self.num_docs)
+
+    def top_candidates(self, query_text, k):
+        scores = self.scores(query_text)
+        k = min(k, self.num_docs)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        return candidates, scores[candidates]
+
+
+@lru_cache(maxsize=4)
+def get_bm25_index(job_descriptions):
+    return BM25Index(list(job_descriptions))
+
+
+def _min_max(values):
+    spread = values.max() - values.min() if len(values) else 0.0
+    return (values - values.min()) / spread if spread > 0 else np.ones_like(values)
+
+
+def hybrid_top_matches(resume_text, job_descriptions, top_k=3, candidates=200, alpha=0.7, resume_embedding=None):
+    """
+    BM25 narrows the corpus to ``candidates`` JDs, then only those are embedded (or loaded
+    from the JD profile store) and re-ranked by ``alpha * dense + (1 - alpha) * bm25``
+    (both min-max scaled).
+    """
+    if not job_descriptions:
+        return []
+
+    bm25 = get_bm25_index(tuple(job_descriptions))
+    candidate_ids, bm25_scores = bm25.top_candidates(resume_text, candidates)
+
+    distances = jd_distances(resume_text, [job_descriptions[i] for i in candidate_ids], resume_embedding)
+
+    fused = alpha * _min_max(-distances) + (1 - alpha) * _min_max(bm25_scores)
+    ranked = np.argsort(-fused)[:top_k]
+
+    return [
+        {
+            "index": int(candidate_ids[r]),
+            "job_description": job_descriptions[candidate_ids[r]],
+            "score": float(np.exp(-distances[r])),
+            "bm25_score": float(bm25_scores[r]),
+            "fused_score": float(fused[r]),
+        }
+        for r in ranked
+    ]
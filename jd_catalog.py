@@ -0,0 +1,137 @@
+# jd_catalog.py
+# Serves the JD catalog artifacts written by build_jd_index.py. The FAISS vectors, ID map
+# and profile offsets are memory-mapped, so startup does not copy the catalog into the heap
+# and every app process shares one page-cache copy. Each query checks the CURRENT pointer;
+# when a new version is published it is opened in full and then swapped in under a lock,
+# while searches already running keep using the old version, and other sessions keep using
+# it until the new one is open. Checksums are verified once, by build_jd_index.py at publish
+# time; opening a version only compares file sizes with its manifest (JD_CATALOG_VERIFY=1
+# hashes the files as well). A version that fails to open (size, checksum or model mismatch,
+# missing files) is logged once and skipped: the app keeps serving the last good version, or
+# runs without a catalog.
+import json
+import logging
+import mmap
+import os
+import threading
+
+import faiss
+import numpy as np
+
+from build_jd_index import ARTIFACT_FILES, verify_artifact
+
+CATALOG_DIR = os.environ.get("JD_CATALOG_DIR", "jd_catalog")
+VERIFY_CHECKSUMS = os.environ.get("JD_CATALOG_VERIFY", "0") == "1"
+
+logger = logging.getLogger(__name__)
+
+
+def current_version(root=CATALOG_DIR):
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def check_sizes(version_dir, manifest):
+    mismatched = [
+        name for name in ARTIFACT_FILES
+        if os.path.getsize(os.path.join(version_dir, name)) != manifest["sizes"].get(name)
+    ]
+    if mismatched:
+        raise ValueError(f"Size mismatch in {version_dir}: {', '.join(mismatched)}")
+
+
+class JDCatalog:
+    def __init__(self, version_dir, verify=VERIFY_CHECKSUMS):
+        from faiss_engine import MODEL_ID
+
+        with open(os.path.join(version_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest["model_id"] != MODEL_ID:
+            raise ValueError(f"Catalog was built with {self.manifest['model_id']}, the app uses {MODEL_ID}.")
+        # Manifests from before sizes were recorded were not verified at publish time either
+        if verify or "sizes" not in self.manifest:
+            verify_artifact(version_dir, self.manifest)
+        else:
+            check_sizes(version_dir, self.manifest)
+
+        self.version = self.manifest["version"]
+        self.index = faiss.read_index(
+            os.path.join(version_dir, "index.faiss"), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+        )
+        self.jd_hashes = np.load(os.path.join(version_dir, "id_map.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(version_dir, "offsets.npy"), mmap_mode="r")
+        with open(os.path.join(version_dir, "profiles.jsonl"), "rb") as f:
+            # mmap of an empty file is an error; an empty catalog simply has no profiles
+            self._profiles = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b""
+
+    def __len__(self):
+        return self.index.ntotal
+
+    def profile(self, jd_id):
+        start, end = self.offsets[jd_id], self.offsets[jd_id + 1]
+        return json.loads(self._profiles[start:end])
+
+    def search(self, query_vector, k=5):
+        k = min(k, self.index.ntotal)
+        if k == 0:
+            return []
+        distances, ids = self.index.search(np.asarray(query_vector, dtype=np.float32).reshape(1, -1), k)
+        matches = []
+        for jd_id, dist in zip(ids[0], distances[0]):
+            if jd_id == -1:
+                continue
+            profile = self.profile(jd_id)
+            matches.append({
+                "id": int(jd_id),
+                "jd_hash": self.jd_hashes[jd_id].decode("ascii"),
+                "title": profile["title"],
+                "job_description": profile["text"],
+                "score": float(np.exp(-dist)),  # Same distance-to-similarity mapping as find_top_matches
+            })
+        return matches
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+_rejected_version = None
+
+
+def get_catalog(root=CATALOG_DIR):
+    """Returns the published catalog, or None when nothing usable has been built yet."""
+    global _catalog, _rejected_version
+    version = current_version(root)
+    if version is None:
+        return None
+    catalog = _catalog
+    if catalog is not None and catalog.version == version or version == _rejected_version:
+        return catalog
+    if catalog is not None:
+        # Another session is opening the new version: keep serving this one until it is ready
+        if not _catalog_lock.acquire(blocking=False):
+            return catalog
+    else:
+        _catalog_lock.acquire()
+    try:
+        if (_catalog is None or _catalog.version != version) and version != _rejected_version:
+            try:
+                # Fully open the new version before publishing it to other sessions
+                _catalog = JDCatalog(os.path.join(root, version))
+            except (OSError, ValueError, KeyError, RuntimeError) as e:
+                # Not retried until CURRENT points somewhere else
+                _rejected_version = version
+                kept = f"keeping {_catalog.version}" if _catalog is not None else "running without a catalog"
+                logger.warning("JD catalog %s rejected (%s); %s", version, e, kept)
+        return _catalog
+    finally:
+        _catalog_lock.release()
+
+
+def find_catalog_matches(resume_text, k=5):
+    catalog = get_catalog()
+    if catalog is None:
+        return []
+    from faiss_engine import embed_resume
+    return catalog.search(embed_resume(resume_text), k)
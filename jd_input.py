@@ -1,32 +1,34 @@
 # 📁 File: jd_input.py
 
 import streamlit as st
-import tempfile
-import fitz  # PyMuPDF
+from jd_profiles import ingest_jds, jd_hash
+from limits import MAX_JDS_PER_REQUEST, MAX_TEXT_CHARS, ResourceLimitError, check_upload_size, limit_text, read_pdf_text
 
 def read_text_file(uploaded_file):
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_file_path = tmp_file.name
-
-        with open(tmp_file_path, "r", encoding="utf-8") as file:
-            return file.read()
+        check_upload_size(uploaded_file)
+        notes = []
+        text = limit_text(uploaded_file.read().decode("utf-8"), notes)
+        for note in notes:
+            st.sidebar.warning(f"⚠️ {note}")
+        return text
+    except ResourceLimitError as e:
+        st.sidebar.error(f"❌ {e}")
+        return ""
     except Exception as e:
         st.sidebar.error(f"Error reading text file: {str(e)}")
         return ""
 
 def read_pdf_file(uploaded_file):
     try:
-        text = ""
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_file_path = tmp_file.name
-
-        with fitz.open(tmp_file_path) as doc:
-            for page in doc:
-                text += page.get_text()
+        check_upload_size(uploaded_file)
+        text, notes = read_pdf_text(uploaded_file.read())
+        for note in notes:
+            st.sidebar.warning(f"⚠️ {note}")
         return text
+    except ResourceLimitError as e:
+        st.sidebar.error(f"❌ {e}")
+        return ""
     except Exception as e:
         st.sidebar.error(f"Error reading PDF file: {str(e)}")
         return ""
@@ -37,7 +39,8 @@ def handle_jd_input():
 
     jd_text = ""
     if option == "Write JD":
-        jd_text = st.sidebar.text_area("📝 Paste one or more job descriptions (separate using two new lines)", height=250)
+        jd_text = st.sidebar.text_area("📝 Paste one or more job descriptions (separate using two new lines)", height=250, max_chars=MAX_TEXT_CHARS)
+        jd_text = limit_text(jd_text)  # max_chars is only enforced in the browser
     elif option == "Upload JD File":
         jd_file = st.sidebar.file_uploader("📁 Upload a JD file (.txt or .pdf)", type=["txt", "pdf"])
         if jd_file:
@@ -52,6 +55,9 @@ def handle_jd_input():
     # Cleanup and return multiple JDs if provided
     if jd_text:
         jd_list = [jd.strip() for jd in jd_text.split("\n\n") if jd.strip()]
+        if len(jd_list) > MAX_JDS_PER_REQUEST:
+            st.sidebar.warning(f"⚠️ Only the first {MAX_JDS_PER_REQUEST} of {len(jd_list)} JDs will be analysed.")
+            jd_list = jd_list[:MAX_JDS_PER_REQUEST]
         if jd_list:
             st.sidebar.success(f"✅ {len(jd_list)} JD(s) processed successfully.")
             return jd_list
@@ -60,3 +66,19 @@ def handle_jd_input():
             return None
 
     return None
+
+def track_jd_changes(jd_list):
+    # JDs are identified by content hash across reruns, so an edit to one paragraph
+    # only makes that JD "added"; everything else keeps its vectors and derived features
+    previous = st.session_state.get("jd_hashes", [])
+    current = [jd_hash(jd) for jd in jd_list]
+    previous_set, current_set = set(previous), set(current)
+
+    added = [jd for jd, key in zip(jd_list, current) if key not in previous_set]
+    removed = [key for key in previous if key not in current_set]
+    if added:
+        # Parse and embed each new JD once; screening later only loads these profiles
+        ingest_jds(added)
+
+    st.session_state.jd_hashes = current
+    return {"added": added, "removed": removed, "unchanged": len(jd_list) - len(added)}
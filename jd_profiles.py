@@ -0,0 +1,171 @@
+# jd_profiles.py
+# JD profiles are computed once at ingest time and persisted in SQLite, so screening a
+# candidate only loads the profile instead of re-parsing and re-embedding. Profiles are keyed
+# by JD hash together with a profile version covering the model id and the source of the
+# modules that build them, so changing the encoder, a skill list or a rule re-profiles every
+# JD on its next use instead of serving a stale profile.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+
+from bulk_encoding import encode_bulk
+from faiss_engine import model
+from nlp_utils import extract_jd_requirements, extract_job_title
+from token_index import token_ids, tokens_for
+
+DB_PATH = os.environ.get("JD_PROFILE_DB", "jd_profiles.db")
+MEMORY_CACHE_SIZE = 4096
+
+# Bump when the profile layout changes in a way the sources below don't capture
+PROFILE_FORMAT = 1
+# Modules whose code decides profile contents
+PROFILE_MODULES = ("jd_profiles.py", "nlp_utils.py", "extraction_rules.py", "token_index.py", "bulk_encoding.py")
+
+_memory_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_profile_version = None
+
+
+def jd_hash(jd_text):
+    return hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+
+
+def profile_version():
+    global _profile_version
+    if _profile_version is None:
+        from faiss_engine import MODEL_ID
+
+        digest = hashlib.sha256(f"{PROFILE_FORMAT}:{MODEL_ID}".encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for name in PROFILE_MODULES:
+            with open(os.path.join(base, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+        _profile_version = digest.hexdigest()[:16]
+    return _profile_version
+
+
+def profile_key(jd_text):
+    return f"{profile_version()}:{jd_hash(jd_text)}"
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS profiles (
+            profile_key TEXT PRIMARY KEY,
+            profile_version TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _remember(key, profile):
+    with _cache_lock:
+        _memory_cache[key] = profile
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _recall(key):
+    with _cache_lock:
+        profile = _memory_cache.get(key)
+        if profile is not None:
+            _memory_cache.move_to_end(key)
+        return profile
+
+
+def build_jd_profiles(jd_texts):
+    # Length-bucketed batches: JDs vary widely in length and arrive in no particular order
+    embeddings = encode_bulk(jd_texts)
+    profiles = []
+    for jd_text, embedding in zip(jd_texts, embeddings):
+        profile = extract_jd_requirements(jd_text)
+        profile["jd_hash"] = jd_hash(jd_text)
+        profile["title"] = extract_job_title(jd_text)
+        profile["tokens"] = tokens_for(token_ids(jd_text))
+        profile["embedding"] = np.asarray(embedding, dtype=np.float32)
+        profiles.append(profile)
+    return profiles
+
+
+def _load(keys):
+    found = {}
+    with closing(_connect()) as conn:
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = conn.execute(
+                f"SELECT profile_key, profile, embedding FROM profiles WHERE profile_key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            for key, profile_json, embedding in rows:
+                profile = json.loads(profile_json)
+                profile["embedding"] = np.frombuffer(embedding, dtype=np.float32)
+                found[key] = profile
+    return found
+
+
+def _save(profiles):
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = []
+    for profile in profiles:
+        stored = {k: v for k, v in profile.items() if k != "embedding"}
+        rows.append((f"{profile_version()}:{profile['jd_hash']}", profile_version(), json.dumps(stored),
+                     profile["embedding"].tobytes(), now))
+    with closing(_connect()) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def ingest_jds(jd_texts):
+    """
+    Returns the profile of every JD in order, computing and persisting only
+    the ones not already in the store.
+    """
+    keys = [profile_key(jd) for jd in jd_texts]
+    profiles = {key: _recall(key) for key in keys}
+
+    missing_keys = list(dict.fromkeys(key for key, profile in profiles.items() if profile is None))
+    if missing_keys:
+        profiles.update(_load(missing_keys))
+
+        texts_by_key = dict(zip(keys, jd_texts))
+        to_build = [texts_by_key[key] for key in missing_keys if profiles.get(key) is None]
+        if to_build:
+            built = build_jd_profiles(to_build)
+            _save(built)
+            profiles.update((f"{profile_version()}:{profile['jd_hash']}", profile) for profile in built)
+
+        for key in missing_keys:
+            _remember(key, profiles[key])
+
+    return [profiles[key] for key in keys]
+
+
+def get_jd_profile(jd_text):
+    return ingest_jds([jd_text])[0]
+
+
+def get_jd_embeddings(jd_texts):
+    profiles = ingest_jds(jd_texts)
+    if not profiles:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return np.vstack([profile["embedding"] for profile in profiles])
+
+
+def purge_stale_profiles():
+    """Deletes profiles built under an older profile version; returns how many."""
+    with closing(_connect()) as conn, conn:
+        conn.execute("DROP TABLE IF EXISTS jd_profiles")  # the unversioned layout
+        return conn.execute("DELETE FROM profiles WHERE profile_version != ?", (profile_version(),)).rowcount
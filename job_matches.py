@@ -4,13 +4,12 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-import re
 from math import pi
-from faiss_engine import find_top_matches
-from nlp_utils import count_categories
+from jd_catalog import find_catalog_matches
+from report_cache import get_report
 
 
-def show_job_matches(resume_text, jd_text):
+def show_job_matches(resume_text, jd_text, report=None):
     st.markdown("<h2 class='section-title fade-in-up'>📊 Role Compatibility Analysis</h2>", unsafe_allow_html=True)
 
     jd_list = jd_text
@@ -18,9 +17,13 @@ def show_job_matches(resume_text, jd_text):
         st.error("❌ No valid job descriptions found.")
         return
 
+    common_skills = []
+
     # Get top matching JDs via FAISS
     with st.spinner("🔭 Scanning for optimal matches..."):
-        top_matches = find_top_matches(resume_text, jd_list, top_k=3)
+        if report is None:
+            report = get_report(resume_text, jd_list)
+        top_matches = report["top_matches"]
     
     # Display top match score
     if top_matches:
@@ -64,12 +67,10 @@ def show_job_matches(resume_text, jd_text):
             </div>
             """, unsafe_allow_html=True)
 
-        # Skill overlap percentage
-        resume_words = set(re.findall(r"\w+", resume_text.lower()))
-        jd_words = set(re.findall(r"\w+", " ".join(jd_list).lower()))
-        common = resume_words.intersection(jd_words)
-        common_skills = [word for word in common if len(word) > 3]
-        skill_overlap_pct = len(common_skills) / max(len(jd_words), 1) * 100
+        # Skill overlap percentage against the best matching JD
+        top_jd_index = top_matches[0]["index"]
+        skill_overlap_pct = report["keyword_overlap"][top_jd_index]
+        common_skills = report["common_skills"]
         
         with col3:
             st.markdown(f"""
@@ -123,12 +124,13 @@ def show_job_matches(resume_text, jd_text):
             ax1.axis('equal')
             plt.tight_layout()
             st.pyplot(fig1)
+            plt.close(fig1)  # pyplot keeps every figure alive until it is closed
             st.markdown("</div>", unsafe_allow_html=True)
     else:
         st.warning("No top matches found to visualize.")
 
     # 📊 Enhanced Visualizations
-    counts = count_categories(resume_text)
+    counts = report["counts"]
 
     # Radar chart for skills analysis
     with st.container():
@@ -168,7 +170,7 @@ def show_job_matches(resume_text, jd_text):
         plt.ylim(0, 100)
         
         # Add grid
-        ax.grid(True, color='rgba(255, 255, 255, 0.2)', linestyle='--', linewidth=0.5)
+        ax.grid(True, color=(1, 1, 1, 0.2), linestyle='--', linewidth=0.5)
         
         # Set background color
         ax.set_facecolor('#0a0e17')
@@ -176,6 +178,7 @@ def show_job_matches(resume_text, jd_text):
         
         plt.tight_layout()
         st.pyplot(fig2)
+        plt.close(fig2)
         st.markdown("</div>", unsafe_allow_html=True)
 
     # Enhanced bar charts with 3D effect
@@ -207,10 +210,11 @@ def show_job_matches(resume_text, jd_text):
         fig3.patch.set_facecolor('#0a0e17')
         
         # Add grid
-        ax3.grid(True, color='rgba(255, 255, 255, 0.1)', linestyle='--', linewidth=0.5)
+        ax3.grid(True, color=(1, 1, 1, 0.1), linestyle='--', linewidth=0.5)
         
         plt.tight_layout()
         st.pyplot(fig3)
+        plt.close(fig3)
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
@@ -239,10 +243,11 @@ def show_job_matches(resume_text, jd_text):
         fig4.patch.set_facecolor('#0a0e17')
         
         # Add grid
-        ax4.grid(True, color='rgba(255, 255, 255, 0.1)', linestyle='--', linewidth=0.5)
+        ax4.grid(True, color=(1, 1, 1, 0.1), linestyle='--', linewidth=0.5)
         
         plt.tight_layout()
         st.pyplot(fig4)
+        plt.close(fig4)
         st.markdown("</div>", unsafe_allow_html=True)
 
     # Matched keywords with enhanced visualization
@@ -311,22 +316,46 @@ def show_job_matches(resume_text, jd_text):
             </div>
             """, unsafe_allow_html=True)
 
+    # Resume sentences backing each requirement of the top matches
+    if top_matches:
+        with st.expander("🔎 Why These Matches (Supporting Evidence)", expanded=False):
+            for i, (match, explanation) in enumerate(zip(top_matches, report["evidence"])):
+                st.markdown(f"**Rank #{i+1} · {match['score'] * 100:.2f}% match**")
+                for item in explanation:
+                    evidence = "".join(
+                        f"<li>{e['sentence']} <span style='color: #7f8c8d;'>({e['similarity'] * 100:.0f}%)</span></li>"
+                        for e in item["evidence"]
+                    )
+                    st.markdown(f"""
+                    <div style="background: rgba(18, 25, 40, 0.7); padding: 10px 15px; border-radius: 10px; margin-bottom: 10px;">
+                        <p style="color: #3498db; margin: 0 0 5px 0;">📌 {item['requirement']}</p>
+                        <ul style="color: #bdc3c7; margin: 0;">{evidence}</ul>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+    # Roles from the offline-built JD catalog, when one has been published
+    catalog_matches = find_catalog_matches(resume_text, k=5)
+    if catalog_matches:
+        with st.expander("🗂️ Similar Roles in the JD Catalog", expanded=False):
+            for match in catalog_matches:
+                jd_preview = match["job_description"][:200].replace("\n", " ").strip()
+                st.markdown(f"**{match['title']}** · {match['score'] * 100:.2f}%  \n{jd_preview}...")
+
 # for the summary logic
-def get_resume_match_summary(resume_text, jd_text):
+def get_resume_match_summary(resume_text, jd_text, report=None):
     jd_list = jd_text if isinstance(jd_text, list) else [jd_text]
     if not jd_list:
         return None
 
-    top_matches = find_top_matches(resume_text, jd_list, top_k=3)
+    if report is None:
+        report = get_report(resume_text, jd_list)
+    top_matches = report["top_matches"]
     top_score_raw = top_matches[0]["score"] if top_matches else 0.0
     top_score = max(0.0, min(top_score_raw, 1.0))
 
-    resume_words = set(re.findall(r"\w+", resume_text.lower()))
-    jd_words = set(re.findall(r"\w+", " ".join(jd_list).lower()))
-    common_skills = [word for word in resume_words.intersection(jd_words) if len(word) > 3]
-    skill_overlap_pct = len(common_skills) / max(len(jd_words), 1) * 100
+    skill_overlap_pct = report["keyword_overlap"][top_matches[0]["index"]] if top_matches else 0.0
 
-    counts = count_categories(resume_text)
+    counts = report["counts"]
 
     return {
         "top_score": top_score,
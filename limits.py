@@ -0,0 +1,142 @@
+# limits.py
+# Resource governance for the app: caps on what one request may submit, time budgets for the
+# analysis stages, and a process-wide pool of work slots. Streamlit runs every session as a
+# thread in one process, so the slot pool bounds how many analyses compete for the CPU and
+# makes further sessions wait (or be turned away) instead of thrashing.
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import fitz  # PyMuPDF
+
+
+def _env_number(name, default, cast=int):
+    return cast(os.environ.get(name, default))
+
+
+MAX_UPLOAD_BYTES = _env_number("MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+MAX_PDF_PAGES = _env_number("MAX_PDF_PAGES", 30)
+MAX_TEXT_CHARS = _env_number("MAX_TEXT_CHARS", 100000)
+MAX_JDS_PER_REQUEST = _env_number("MAX_JDS_PER_REQUEST", 50)
+
+# Seconds each stage may take before later work is cut short
+STAGE_BUDGETS = {
+    stage: _env_number(f"STAGE_BUDGET_{stage.upper()}", default, float)
+    for stage, default in (
+        ("extract", 15), ("analysis", 30), ("job_matches", 30), ("screening", 30), ("recommendation", 30)
+    )
+}
+
+MAX_CONCURRENT_WORK = _env_number("MAX_CONCURRENT_WORK", os.cpu_count() or 1)
+MAX_QUEUED_WORK = _env_number("MAX_QUEUED_WORK", 4 * MAX_CONCURRENT_WORK)
+WORK_QUEUE_TIMEOUT = _env_number("WORK_QUEUE_TIMEOUT", 30, float)
+
+
+class ResourceLimitError(Exception):
+    pass
+
+
+class ServerBusyError(ResourceLimitError):
+    pass
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+
+def stage_deadline(*stages):
+    # Stages share one deadline, so time saved early carries over to later stages
+    return Deadline(sum(STAGE_BUDGETS[stage] for stage in stages))
+
+
+def check_upload_size(uploaded_file):
+    size = getattr(uploaded_file, "size", None)
+    if size is None:
+        size = len(uploaded_file.getvalue())
+    if size > MAX_UPLOAD_BYTES:
+        raise ResourceLimitError(
+            f"File is {size / 1024 / 1024:.1f} MB; the limit is {MAX_UPLOAD_BYTES / 1024 / 1024:.0f} MB."
+        )
+
+
+def limit_text(text, notes=None):
+    if len(text) > MAX_TEXT_CHARS:
+        if notes is not None:
+            notes.append(f"Text was cut to the first {MAX_TEXT_CHARS:,} characters.")
+        return text[:MAX_TEXT_CHARS]
+    return text
+
+
+def read_pdf_text(data, stage="extract"):
+    """
+    Extracts text from PDF bytes within the page, length and time limits.
+    Returns (text, notes); notes say what was left out when a limit was hit.
+    """
+    notes = []
+    deadline = stage_deadline(stage)
+    parts = []
+    length = 0
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        if doc.page_count > MAX_PDF_PAGES:
+            notes.append(f"Only the first {MAX_PDF_PAGES} of {doc.page_count} pages were read.")
+        for page_number in range(min(doc.page_count, MAX_PDF_PAGES)):
+            if deadline.expired():
+                notes.append(f"Reading stopped after {page_number} pages (time budget reached).")
+                break
+            page_text = doc[page_number].get_text()
+            parts.append(page_text)
+            length += len(page_text)
+            if length > MAX_TEXT_CHARS:
+                break
+    return limit_text("".join(parts), notes), notes
+
+
+_work_slots = threading.BoundedSemaphore(MAX_CONCURRENT_WORK)
+_waiting = 0
+_waiting_lock = threading.Lock()
+
+
+@contextmanager
+def work_slot(timeout=WORK_QUEUE_TIMEOUT):
+    """
+    Holds one of MAX_CONCURRENT_WORK slots for the duration of the block. At most
+    MAX_QUEUED_WORK callers wait for a slot; beyond that, or after ``timeout`` seconds,
+    ServerBusyError is raised so the session can ask the user to retry.
+    """
+    global _waiting
+    with _waiting_lock:
+        if _waiting >= MAX_QUEUED_WORK:
+            raise ServerBusyError("The server is at capacity. Please try again shortly.")
+        _waiting += 1
+    try:
+        acquired = _work_slots.acquire(timeout=timeout)
+    finally:
+        with _waiting_lock:
+            _waiting -= 1
+    if not acquired:
+        raise ServerBusyError("Timed out waiting for a free worker. Please try again shortly.")
+    try:
+        yield
+    finally:
+        _work_slots.release()
+
+
+def try_work_slot():
+    """
+    Takes a slot only if one is free right now, for optional work such as speculative
+    analysis. Returns True when taken; the caller must then call release_work_slot().
+    """
+    return _work_slots.acquire(blocking=False)
+
+
+def release_work_slot():
+    _work_slots.release()
@@ -0,0 +1,322 @@
+# load_test.py
+# Headless load test for the Streamlit app. Each simulated recruiter session drives the real
+# main.py through Streamlit's AppTest API: provide a resume and JDs, click Launch Analysis and
+# render every tab. Sessions run concurrently in separate processes, because AppTest keeps
+# its mock runtime in process-global state. Each session process is therefore an app process
+# of its own, with its own encoder copy, work slots, thread budget, stage pool and caches: the
+# run measures per-session latency and memory while N such processes compete for the CPU,
+# not N sessions sharing one server's limits, and it is not a per-pod capacity figure. Peak
+# RSS is reported per session process. Report stages start in the background as soon as
+# the resume and JDs are in, so a tab's time is the wait for the stages it reads, counted from
+# when they started, plus its rendering, and launch time runs from entering the JDs; both
+# stay comparable with runs from before the stages were split out. The stores the app writes
+# to (report cache, JD profiles, candidate index and feature store, batch job queue) start
+# empty in a scratch directory for each run, so earlier runs never turn timings into cache hits.
+# Before the sessions start, every tab is rendered once with the matches stage held back, to
+# check that TAB_STAGES (and main.py) list every stage a tab reads.
+#
+# Usage:
+#   python load_test.py --sessions 8 --iterations 3 --output report.json
+#   python load_test.py --sessions 8 --baseline last_release.json --max-regression 0.2
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from soak_test import STORE_ENV
+from synthetic_data import make_jd, make_resume
+
+TABS = {
+    "analysis": "Fit Overview",
+    "job_matches": "Role Matching",
+    "screening": "Comprehensive Screening",
+    "recommendation": "Final Recommendation",
+}
+
+# Report stages each tab reads, as in main.py
+TAB_STAGES = {
+    "analysis": ("profile",),
+    "job_matches": ("profile", "matches"),
+    "screening": ("profile", "matches", "screening"),
+    "recommendation": ("profile", "recommendation"),
+}
+
+_tab_timings = []
+
+
+def _record_tab(tab, elapsed):
+    _tab_timings.append((tab, elapsed))
+
+
+def _session_script():
+    # Runs as the Streamlit script inside AppTest. The resume uploader is replaced by text
+    # from session state (AppTest cannot drive file_uploader); every other step is main.py.
+    import runpy
+    import time
+
+    import streamlit as st
+
+    import analysis
+    import job_matches
+    import load_test
+    import recommendation
+    import resume_upload
+    import screening
+
+    if not getattr(resume_upload, "_load_test_patched", False):
+        resume_upload.handle_resume_upload = lambda: st.session_state.get("load_test_resume")
+
+        def timed(module_name, func):
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - start
+                    pending = st.session_state.get("speculative_report")
+                    if pending is not None:
+                        elapsed += max(pending.stage_seconds.get(stage, 0.0) for stage in load_test.TAB_STAGES[module_name])
+                    load_test._record_tab(load_test.TABS[module_name], elapsed)
+            return wrapper
+
+        for module, name in ((analysis, "show_analysis"), (job_matches, "show_job_matches"),
+                             (screening, "show_screening"), (recommendation, "show_recommendation")):
+            setattr(module, name, timed(module.__name__, getattr(module, name)))
+        resume_upload._load_test_patched = True
+
+    runpy.run_path("main.py", run_name="__main__")
+
+
+def _run_session(session_id, iterations, jds_per_request, timeout, seed, results):
+    from streamlit.testing.v1 import AppTest
+
+    # The app script reports tab timings through the importable module, not this __main__ copy
+    import load_test
+
+    rng = random.Random(seed + session_id)
+    records = []
+    errors = []
+    for iteration in range(iterations):
+        at = AppTest.from_function(_session_script, default_timeout=timeout)
+        at.session_state["load_test_resume"] = make_resume(rng, project_lines=rng.randint(2, 20))
+        at.run()
+
+        # The report starts with the JD input, so launch time is counted from there
+        start = time.perf_counter()
+        at.sidebar.text_area[0].input("\n\n".join(make_jd(rng) for _ in range(jds_per_request))).run()
+        load_test._tab_timings.clear()
+        at.sidebar.button[0].click().run()
+        launch = time.perf_counter() - start
+
+        if at.exception:
+            errors.append(f"session {session_id} iteration {iteration}: {at.exception[0].value}")
+        records.append({"launch": launch, "tabs": dict(load_test._tab_timings)})
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    results.put({
+        "session": session_id,
+        "records": records,
+        "errors": errors,
+        "peak_rss_mb": usage.ru_maxrss / 1024,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+    })
+
+
+def _check_tab_stages(seed, delay, results):
+    # Runs in its own process on empty stores. Holds back the matches stage on a pool with
+    # a worker per stage, so the other stages finish first, and renders each tab as soon as
+    # the stages TAB_STAGES lists for it are done: a tab reading a stage it does not list
+    # fails here instead of only when stage workers happen to finish out of order.
+    from concurrent.futures import ThreadPoolExecutor
+
+    import analysis
+    import job_matches
+    import recommendation
+    import report_cache
+    import screening
+    from thread_budget import configure_thread
+
+    stage_matches = report_cache._stage_matches
+
+    def delayed_matches(*args):
+        time.sleep(delay)
+        return stage_matches(*args)
+
+    report_cache._stage_matches = delayed_matches
+    # Sizes the stage queue as usual, then swaps in a pool where no stage waits for a worker
+    report_cache.stage_executor()
+    report_cache._stage_executor = ThreadPoolExecutor(
+        max_workers=4, thread_name_prefix="report-stage", initializer=configure_thread,
+    )
+
+    rng = random.Random(seed)
+    resume_text = make_resume(rng, project_lines=8)
+    jd_text = "\n\n".join(make_jd(rng) for _ in range(3))
+    jd_list = jd_text.split("\n\n")
+    renders = {
+        "analysis": lambda report: analysis.show_analysis(resume_text, jd_text, report=report),
+        "job_matches": lambda report: job_matches.show_job_matches(resume_text, jd_list, report=report),
+        "screening": lambda report: screening.show_screening(resume_text, jd_text, report=report),
+        "recommendation": lambda report: recommendation.show_recommendation(resume_text, jd_text, report=report),
+    }
+
+    errors = []
+    try:
+        pending = report_cache.PendingReport(resume_text, jd_list)
+        waiting = dict(TAB_STAGES)
+        while waiting:
+            for tab in [tab for tab, needs in waiting.items() if pending.done(needs)]:
+                try:
+                    renders[tab](pending.wait(waiting.pop(tab)))
+                except Exception as e:
+                    errors.append(f"{TABS[tab]} tab with a delayed matches stage: {e!r}")
+            if waiting:
+                pending.wait_any([stage for needs in waiting.values() for stage in needs])
+    except Exception as e:
+        errors.append(f"stage check: {e!r}")
+    results.put(errors)
+
+
+@contextmanager
+def scratch_stores(prefix):
+    """
+    Points the app's stores at an empty scratch directory while the block runs, then puts the
+    previous paths back and removes it. Spawned processes inherit the paths.
+    """
+    store_dir = tempfile.mkdtemp(prefix=prefix)
+    saved = {variable: os.environ.get(variable) for variable in STORE_ENV}
+    for variable, name in STORE_ENV.items():
+        os.environ[variable] = os.path.join(store_dir, name)
+    try:
+        yield store_dir
+    finally:
+        for variable, value in saved.items():
+            if value is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = value
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def check_tab_stages(seed, delay=2.0):
+    """Returns errors from rendering every tab while the matches stage lags behind the others."""
+    with scratch_stores("load-test-stage-check-"):
+        context = mp.get_context("spawn")
+        results = context.Queue()
+        process = context.Process(target=_check_tab_stages, args=(seed, delay, results))
+        process.start()
+        errors = results.get()
+        process.join()
+        return errors
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(p50, 4), "p95": round(p95, 4), "p99": round(p99, 4), "count": len(values)}
+
+
+def run_load_test(sessions, iterations, jds_per_request, timeout, seed):
+    # All sessions share this run's stores
+    with scratch_stores("load-test-stores-"):
+        return _run_sessions(sessions, iterations, jds_per_request, timeout, seed)
+
+
+def _run_sessions(sessions, iterations, jds_per_request, timeout, seed):
+    context = mp.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_run_session, args=(i, iterations, jds_per_request, timeout, seed, results))
+        for i in range(sessions)
+    ]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    session_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    wall = time.perf_counter() - start
+
+    launches = [r["launch"] for s in session_results for r in s["records"]]
+    per_tab = {tab: [r["tabs"][tab] for s in session_results for r in s["records"] if tab in r["tabs"]]
+               for tab in TABS.values()}
+    cpu_seconds = sum(s["cpu_seconds"] for s in session_results)
+
+    return {
+        "config": {"sessions": sessions, "iterations": iterations, "jds_per_request": jds_per_request,
+                   "cpu_count": os.cpu_count()},
+        "wall_seconds": round(wall, 2),
+        "launch_seconds": _percentiles(launches),
+        "tab_seconds": {tab: _percentiles(values) for tab, values in per_tab.items()},
+        # Per session process, each with its own encoder copy; not summed into a pod figure
+        "peak_rss_mb": {
+            "max_session": round(max(s["peak_rss_mb"] for s in session_results), 1),
+            "mean_session": round(sum(s["peak_rss_mb"] for s in session_results) / len(session_results), 1),
+        },
+        "cpu": {
+            "seconds": round(cpu_seconds, 2),
+            "utilisation": round(cpu_seconds / wall / (os.cpu_count() or 1), 3),
+        },
+        "errors": [e for s in session_results for e in s["errors"]],
+    }
+
+
+def find_regressions(report, baseline, max_regression):
+    regressions = []
+
+    def check(name, current, previous):
+        if previous and current > previous * (1 + max_regression):
+            regressions.append(f"{name}: {previous} -> {current} (+{(current / previous - 1) * 100:.0f}%)")
+
+    check("launch p95", report["launch_seconds"].get("p95", 0), baseline["launch_seconds"].get("p95", 0))
+    for tab, stats in report["tab_seconds"].items():
+        check(f"{tab} p95", stats.get("p95", 0), baseline["tab_seconds"].get(tab, {}).get("p95", 0))
+    check("peak session RSS MB", report["peak_rss_mb"]["max_session"], baseline["peak_rss_mb"].get("max_session", 0))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the ZenResume Streamlit app")
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated recruiters, one app process each")
+    parser.add_argument("--iterations", type=int, default=3, help="analyses per session")
+    parser.add_argument("--jds", type=int, default=5, help="JDs pasted per analysis")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per script run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed fractional p95/RSS growth")
+    args = parser.parse_args()
+
+    stage_errors = check_tab_stages(args.seed)
+    for error in stage_errors:
+        print(f"STAGE ORDER {error}", file=sys.stderr)
+
+    report = run_load_test(args.sessions, args.iterations, args.jds, args.timeout, args.seed)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = bool(report["errors"]) or bool(stage_errors)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
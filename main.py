@@ -1,16 +1,34 @@
 # main.py
 import streamlit as st
-from resume_upload import handle_resume_upload
-from jd_input import handle_jd_input
+from resume_upload import handle_batch_upload, handle_resume_upload
+from jd_input import handle_jd_input, track_jd_changes
 from analysis import show_analysis
 from job_matches import show_job_matches
 from screening import show_screening
 from recommendation import show_recommendation
 from faiss_engine import find_top_matches
+from limits import ResourceLimitError, ServerBusyError, stage_deadline, work_slot
+from jd_catalog import get_catalog
+from thread_budget import configure_thread
+from report_cache import PendingReport, speculate
+from batch_jobs import create_job, ensure_workers
+from batch_screening import show_batch_job
+from candidate_store import get_candidate_store, query_candidates
 import random
+from contextlib import nullcontext
 
 st.set_page_config(page_title="ZenResume - Advanced Analytics", layout="wide")
 
+# Share the cores between concurrent calls instead of every call using all of them. The
+# split is made once per process; each rerun only applies the FAISS limit to its own thread
+configure_thread()
+
+# Memory-map the published JD catalog (if any) before the first analysis needs it
+get_catalog()
+
+# Background batch workers; candidates left running by a previous process are re-queued first
+ensure_workers()
+
 # Load custom CSS
 with open("styles.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
@@ -78,13 +96,29 @@ if "show_tabs" not in st.session_state:
 
 # Sidebar Inputs
 st.sidebar.title("📤 Upload Inputs")
-resume_text = handle_resume_upload()
+mode = st.sidebar.radio("Screening mode:", ("Single Resume", "Batch Screening"))
+resume_text = None
+resume_files = []
+if mode == "Batch Screening":
+    resume_files = handle_batch_upload()
+else:
+    resume_text = handle_resume_upload()
 jd_text = handle_jd_input()
 
-# Prepare JD list for multi-match
+# Prepare JD list for multi-match, tracking which JDs changed since the last rerun
 if jd_text:
-    if "jd_list" not in st.session_state:
-        st.session_state.jd_list = jd_text.split("\n\n") if isinstance(jd_text, str) else jd_text
+    st.session_state.jd_list = jd_text.split("\n\n") if isinstance(jd_text, str) else jd_text
+    track_jd_changes(st.session_state.jd_list)
+
+# Start the report as soon as both inputs are known, so the work overlaps with the user
+# reviewing their inputs; Launch Analysis attaches to it. Changed inputs cancel it. It only
+# starts when a work slot is free, so speculation never queues behind requested analyses.
+if resume_text and jd_text:
+    st.session_state.speculative_report = speculate(st.session_state.get("speculative_report"),
+                                                    resume_text, st.session_state.jd_list)
+elif st.session_state.get("speculative_report") is not None:
+    st.session_state.speculative_report.cancel()
+    st.session_state.speculative_report = None
 
 # Sidebar Next Button
 if resume_text and jd_text:
@@ -93,6 +127,29 @@ if resume_text and jd_text:
     if next_clicked:
         st.session_state.show_tabs = True
 
+# The job id lives in the URL, so the progress view survives reloads and redeploys
+if mode == "Batch Screening" and resume_files and jd_text:
+    cascade = st.sidebar.checkbox("Pre-filter on requirements", value=False,
+                                  help="Only fully score candidates who meet a JD's must-have skills, experience and degree")
+    if st.sidebar.button("🚀 Start Batch Job", help="Queue every uploaded resume for screening"):
+        try:
+            st.query_params["batch_job"] = create_job(resume_files, st.session_state.jd_list, cascade=cascade)
+        except ResourceLimitError as e:
+            st.sidebar.error(f"❌ {e}")
+batch_job = st.query_params.get("batch_job")
+
+# Boolean skill and range search over every candidate parsed so far
+with st.sidebar.expander("🔎 Search Candidates"):
+    candidate_query = st.text_input("Query", placeholder="python AND aws AND NOT only-diploma AND 3+ years")
+    if candidate_query:
+        try:
+            matches = query_candidates(candidate_query, limit=50)
+            st.caption(f"{get_candidate_store().count(candidate_query)} candidate(s) match")
+            if matches:
+                st.dataframe([{k: m[k] for k in ("name", "years", "grade", "score")} for m in matches], hide_index=True)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+
 # Conditional display of main sections
 if st.session_state.show_tabs and resume_text and jd_text:
     st.markdown("""
@@ -111,21 +168,62 @@ if st.session_state.show_tabs and resume_text and jd_text:
         "🎯 Final Recommendation"
     ])
 
-    with tabs[0]:
-        with st.spinner("Analyzing resume structure..."):
-            show_analysis(resume_text, jd_text)
+    # Each tab renders as soon as the report stages it reads are done: the profile is ready
+    # immediately, FAISS matches, screening and recommendation stream in from background
+    # workers, usually already started speculatively. Unfinished stages keep running past
+    # the deadline and still land in the cache. Screening also shows the match summary, so it
+    # waits for the matches stage as well.
+    stages = [
+        ("analysis", "Analyzing resume structure...", ("profile",),
+         lambda report: show_analysis(resume_text, jd_text, report=report)),
+        ("job_matches", "Calculating role compatibility...", ("profile", "matches"),
+         lambda report: show_job_matches(resume_text, st.session_state.jd_list, report=report)),
+        ("screening", "Running comprehensive screening...", ("profile", "matches", "screening"),
+         lambda report: show_screening(resume_text, jd_text, report=report)),
+        ("recommendation", "Generating final recommendations...", ("profile", "recommendation"),
+         lambda report: show_recommendation(resume_text, jd_text, report=report)),
+    ]
 
-    with tabs[1]:
-        with st.spinner("Calculating role compatibility..."):
-            show_job_matches(resume_text, st.session_state.jd_list)
+    # One work slot per analysis bounds how many sessions compute at once (a speculative
+    # report holds its own); the stages share a time budget and any tab still waiting when it
+    # runs out is skipped
+    pending = st.session_state.get("speculative_report")
+    try:
+        with nullcontext() if pending is not None else work_slot():
+            deadline = stage_deadline(*(name for name, _, _, _ in stages))
+            waiting = []
+            for tab, (name, message, needs, render) in zip(tabs, stages):
+                placeholder = tab.empty()
+                placeholder.info(f"⏳ {message}")
+                waiting.append((placeholder, needs, render))
 
-    with tabs[2]:
-        with st.spinner("Running comprehensive screening..."):
-            screening_score = show_screening(resume_text, jd_text)
+            if pending is None:
+                pending = st.session_state.speculative_report = PendingReport(resume_text, st.session_state.jd_list)
+            while waiting:
+                for item in [item for item in waiting if pending.done(item[1])]:
+                    placeholder, needs, render = item
+                    with placeholder.container():
+                        render(pending.wait(needs))
+                    waiting.remove(item)
+                if not waiting:
+                    break
+                try:
+                    pending.wait_any([stage for _, needs, _ in waiting for stage in needs], timeout=deadline.remaining())
+                except TimeoutError:
+                    for placeholder, _, _ in waiting:
+                        placeholder.warning("⏱️ Skipped: the analysis ran past its time budget. Click **Launch Analysis** again to retry.")
+                    break
+    except ServerBusyError as e:
+        st.warning(f"⏳ {e}")
 
-    with tabs[3]:
-        with st.spinner("Generating final recommendations..."):
-            show_recommendation(resume_text, jd_text)
+elif mode == "Batch Screening" and batch_job:
+    st.markdown("""
+    <div style='text-align: center; margin-bottom: 2.5rem;' class="float">
+        <h1 class="header-title">ZenResume</h1>
+        <p class="header-subtitle">Advanced Resume Analytics Platform</p>
+    </div>
+    """, unsafe_allow_html=True)
+    show_batch_job(batch_job)
 
 # ... rest of your code ...
 
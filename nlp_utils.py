@@ -1,8 +1,13 @@
+import os
 import re
 from sentence_transformers import SentenceTransformer, util
+from extraction_rules import classify_line, scan_experience, match_job_title, parse_document
 
 _sbert_model = SentenceTransformer("all-MiniLM-L6-v2")
 
+# "rules" (keyword lists) or "spacy" (spacy_pipeline) for education and career fields
+EXTRACTION_BACKEND = os.environ.get("EXTRACTION_BACKEND", "rules")
+
 def semantic_recommendation(text1, text2):
     emb1 = _sbert_model.encode(text1, convert_to_tensor=True)
     emb2 = _sbert_model.encode(text2, convert_to_tensor=True)
@@ -62,16 +67,16 @@ def estimate_skill_depth(resume_text):
 
     return skill_depth_scores
 
-def analyze_career_path(resume_text):
-    job_levels = [
-        "intern", "junior", "associate", "engineer", "developer", "senior", "lead", "manager", "architect",
-        "director", "head", "vp", "chief", "cto", "ceo"
-    ]
+JOB_LEVELS = [
+    "intern", "junior", "associate", "engineer", "developer", "senior", "lead", "manager", "architect",
+    "director", "head", "vp", "chief", "cto", "ceo"
+]
 
+def analyze_career_path(resume_text):
     resume_text = resume_text.lower()
-    progression = [level for level in job_levels if level in resume_text]
+    progression = [level for level in JOB_LEVELS if level in resume_text]
     unique_levels = list(dict.fromkeys(progression))
-    return min(len(unique_levels) / len(job_levels), 1.0)
+    return min(len(unique_levels) / len(JOB_LEVELS), 1.0)
 
 def split_sections(text):
     sections = {}
@@ -83,14 +88,7 @@ def split_sections(text):
     for line in lines:
         line_clean = line.strip()
 
-        if re.search(r'education|educational background|academic profile|academics|scholastic|education & certifications', line_clean, re.I):
-            current_section = "Education"
-        elif re.search(r'project', line_clean, re.I):
-            current_section = "Projects"
-        elif re.search(r'training|certification', line_clean, re.I):
-            current_section = "Training"
-        elif re.search(r'extra[- ]?curricular|activities', line_clean, re.I):
-            current_section = "Activities"
+        current_section = classify_line(line_clean) or current_section
 
         if current_section not in sections:
             sections[current_section] = []
@@ -100,59 +98,55 @@ def split_sections(text):
 
     return sections
 
+DEFAULT_SKILLS = {
+    "python", "java", "sql", "html", "css", "data analysis", "machine learning",
+    "deep learning", "nlp", "c++", "javascript", "docker", "aws", "git", "linux"
+}
+
 def extract_skills(text, skill_set=None):
     if skill_set is None:
-        skill_set = {
-            "python", "java", "sql", "html", "css", "data analysis", "machine learning",
-            "deep learning", "nlp", "c++", "javascript", "docker", "aws", "git", "linux"
-        }
+        skill_set = DEFAULT_SKILLS
 
     text = text.lower()
     found_skills = {skill for skill in skill_set if skill.lower() in text}
     return list(found_skills)
 
 def estimate_experience(text):
-    matches = re.findall(r'(\d+)\+?\s+(?:years|yrs)\s+(?:of )?experience', text.lower())
-    return max((int(match) for match in matches), default=0)
+    return scan_experience(text)["years_experience"]
+
+CAREER_KEYWORDS = [
+    "intern", "trainee", "developer", "engineer", "software engineer", "senior developer",
+    "team lead", "manager", "architect", "cto", "data analyst", "data scientist",
+    "qa engineer", "web developer", "android developer", "ios developer", "sde",
+    "ml engineer", "ai engineer", "research intern", "project manager",
+    "campus ambassador", "club lead", "researcher", "lab assistant", "teaching assistant",
+    "hackathon", "ideathon", "trainingship", "virtual internship", "bootcamp",
+    "summer internship", "industrial training", "certification", "course completion",
+    "open source contributor", "github contributor", "freelancer", "mentor", "volunteer",
+    "project lead", "innovation head", "capstone project", "startup cofounder"
+]
 
 def extract_titles(text):
-    career_keywords = [
-        "intern", "trainee", "developer", "engineer", "software engineer", "senior developer",
-        "team lead", "manager", "architect", "cto", "data analyst", "data scientist",
-        "qa engineer", "web developer", "android developer", "ios developer", "sde",
-        "ml engineer", "ai engineer", "research intern", "project manager",
-        "campus ambassador", "club lead", "researcher", "lab assistant", "teaching assistant",
-        "hackathon", "ideathon", "trainingship", "virtual internship", "bootcamp",
-        "summer internship", "industrial training", "certification", "course completion",
-        "open source contributor", "github contributor", "freelancer", "mentor", "volunteer",
-        "project lead", "innovation head", "capstone project", "startup cofounder"
-    ]
-
     text = text.lower()
-    found = [keyword for keyword in career_keywords if keyword in text]
+    found = [keyword for keyword in CAREER_KEYWORDS if keyword in text]
     return " → ".join(dict.fromkeys(found)) or "Career progression not found."
 
-def count_categories(text):
-    technical_skills = {"python", "java", "sql", "html", "css", "docker", "aws", "git", "linux", "javascript", "machine learning", "deep learning", "nlp"}
-    soft_skills = {"communication", "teamwork", "leadership", "problem solving", "adaptability", "creativity", "critical thinking", "time management"}
-    education_keywords = {"bachelor", "master", "phd", "degree", "university", "college", "school", "academy", "certificate", "certification"}
-    project_keywords = {"project", "capstone", "prototype", "application", "game", "system", "website", "software", "platform"}
-    achievement_keywords = {"award", "winner", "honor", "recognition", "published", "patent", "certificate", "certification"}
-    experience_keywords = {"internship", "job", "work", "experience", "role", "position", "employment", "consultant", "freelance"}
+CATEGORY_KEYWORDS = {
+    "Technical Skills": {"python", "java", "sql", "html", "css", "docker", "aws", "git", "linux", "javascript", "machine learning", "deep learning", "nlp"},
+    "Soft Skills": {"communication", "teamwork", "leadership", "problem solving", "adaptability", "creativity", "critical thinking", "time management"},
+    "Education": {"bachelor", "master", "phd", "degree", "university", "college", "school", "academy", "certificate", "certification"},
+    "Projects": {"project", "capstone", "prototype", "application", "game", "system", "website", "software", "platform"},
+    "Achievements": {"award", "winner", "honor", "recognition", "published", "patent", "certificate", "certification"},
+    "Experience": {"internship", "job", "work", "experience", "role", "position", "employment", "consultant", "freelance"},
+}
 
+def count_categories(text):
     text_lower = text.lower()
 
     def count_hits(keywords):
         return sum(1 for kw in keywords if kw in text_lower)
 
-    return {
-        "Technical Skills": count_hits(technical_skills),
-        "Soft Skills": count_hits(soft_skills),
-        "Education": count_hits(education_keywords),
-        "Projects": count_hits(project_keywords),
-        "Achievements": count_hits(achievement_keywords),
-        "Experience": count_hits(experience_keywords)
-    }
+    return {category: count_hits(keywords) for category, keywords in CATEGORY_KEYWORDS.items()}
 
 def group_education_lines(lines):
     grouped = []
@@ -175,31 +169,36 @@ def group_education_lines(lines):
         grouped.append(" | ".join(current))
     return grouped
 
-def extract_basic_info(text):
-    sections = split_sections(text)
+def extract_basic_info(text, entities=None):
+    """
+    ``entities`` from spacy_pipeline.extract_entities replace the keyword guesses for
+    education and career progression and add organisations and dates. With
+    EXTRACTION_BACKEND=spacy they are computed here for single documents.
+    """
+    if entities is None and EXTRACTION_BACKEND == "spacy":
+        from spacy_pipeline import extract_entities
+        entities = next(iter(extract_entities([text])))
+
+    parsed = parse_document(text)
+    sections = parsed["sections"]
     skills = extract_skills(text)
 
     education_section = sections.get("Education", []) + sections.get("Qualification", [])
 
     cleaned_education = education_section[:]
-    grades_only = []
-
-    # Robust: extract grading info from full resume text
-    for line in text.splitlines():
-        line_clean = line.strip()
-        if re.search(r"\b(CGPA|GPA|Percentage|Grade)\b", line_clean, re.I):
-            grade_match = re.search(
-                r"(CGPA|GPA|Percentage|Grade)\s*[:;/\\\-]?\s*([0-9]{1,2}(\.[0-9]{1,2})?%?)",
-                line_clean, re.I
-            )
-            if grade_match:
-                grades_only.append(f"{grade_match.group(1)}: {grade_match.group(2)}")
+    # Grading info comes from the full resume text, collected in the same parse pass
+    grades_only = parsed["grades"]
 
     cleaned_education = list(dict.fromkeys([line for line in cleaned_education if len(line.strip()) > 8 and not line.strip().isdigit()]))
     grades_only = list(dict.fromkeys(grades_only))
 
-    years_experience = estimate_experience(text)
+    years_experience = parsed["years_experience"]
     career_progression = extract_titles(text)
+    if entities is not None:
+        if entities["education"]:
+            cleaned_education = entities["education"]
+        if entities["titles"]:
+            career_progression = " → ".join(entities["titles"])
 
     red_flags = []
     red_flag_rules = [
@@ -237,7 +236,7 @@ def extract_basic_info(text):
     recommendation_summary = "; ".join(recommendations)
     confidence_score = min(0.5 + (0.05 * len(skills)), 1.0)
 
-    return {
+    info = {
         "skills": skills,
         "education": "; ".join(group_education_lines(cleaned_education)) if cleaned_education else "Not detected",
         "grades": grades_only,
@@ -247,6 +246,10 @@ def extract_basic_info(text):
         "confidence_score": confidence_score,
         "recommendations": recommendation_summary
     }
+    if entities is not None:
+        info["organizations"] = entities["organizations"]
+        info["dates"] = entities["dates"]
+    return info
 
 def generate_red_flags_html(red_flags):
     if not red_flags:
@@ -296,16 +299,47 @@ def title_match_score(resume_text, jd_title):
     jd_title = jd_title.lower()
     return 1.0 if jd_title in resume_text else 0.0
 
+LEADERSHIP_TERMS = ["lead", "managed", "mentored", "supervised", "headed", "led team", "project lead"]
+
 def leadership_mention_score(resume_text):
-    leadership_terms = ["lead", "managed", "mentored", "supervised", "headed", "led team", "project lead"]
     resume_text = resume_text.lower()
-    mentions = sum(1 for term in leadership_terms if term in resume_text)
-    return min(mentions / len(leadership_terms), 1.0)
+    mentions = sum(1 for term in LEADERSHIP_TERMS if term in resume_text)
+    return min(mentions / len(LEADERSHIP_TERMS), 1.0)
 
 def extract_job_title(jd_text):
     # Try regex-based title extraction
-    match = re.search(r'(?i)(we are hiring for|looking for|position:|role:)\s+([\w\s\-\/]+)', jd_text)
-    if match:
-        return match.group(2).strip()
+    title = match_job_title(jd_text)
+    if title is not None:
+        return title
     # Fallback: assume first line contains title
     return jd_text.strip().split("\n")[0][:100]
+
+JD_KNOWN_SKILLS = [
+    "python", "java", "javascript", "typescript", "c++", "c", "go", "rust", "ruby", "scala", "kotlin", "r",
+    "react", "angular", "vue", "next.js", "node.js", "flask", "django", "express", "spring boot", "fastapi",
+    "machine learning", "deep learning", "nlp", "computer vision", "data analysis", "data visualization",
+    "scikit-learn", "pandas", "numpy", "matplotlib", "seaborn", "tensorflow", "keras", "pytorch", "huggingface",
+    "sql", "mysql", "postgresql", "mongodb", "firebase", "cassandra", "oracle", "sqlite", "snowflake",
+    "aws", "azure", "gcp", "heroku", "digitalocean", "lambda", "s3", "ec2", "firebase",
+    "docker", "kubernetes", "jenkins", "gitlab", "github actions", "ansible", "terraform", "helm",
+    "pytest", "unittest", "selenium", "cypress", "postman", "jmeter",
+    "git", "github", "bitbucket", "jira", "confluence",
+    "communication", "leadership", "teamwork", "problem solving", "adaptability", "critical thinking",
+    "excel", "power bi", "tableau", "airflow", "hadoop", "spark", "kafka", "elasticsearch", "graphql", "rest api"
+]
+
+def extract_jd_requirements(jd_text):
+    requirements = {
+        "required_skills": [],
+        "min_experience": 0,
+        "required_degree": ""
+    }
+
+    jd_text = jd_text.lower()
+    requirements["required_skills"] = [skill for skill in JD_KNOWN_SKILLS if skill in jd_text]
+    requirements["min_experience"] = scan_experience(jd_text)["min_experience"]
+    if "bachelor" in jd_text or "b.tech" in jd_text:
+        requirements["required_degree"] = "bachelor"
+    elif "master" in jd_text or "m.tech" in jd_text:
+        requirements["required_degree"] = "master"
+    return requirements
@@ -0,0 +1,229 @@
+# prefork.py
+# Preforked worker pool. The master loads the sentence encoder, runs one encode so lazily
+# built buffers exist, opens the memory-mapped JD catalog and imports the scoring modules,
+# then forks the workers. Workers share all of that through copy-on-write pages: the weight
+# tensors live in C allocations that nothing writes to, and gc.freeze() moves every Python
+# object loaded so far into the permanent generation so the collector never writes to their
+# headers. Refcount updates still copy the pages of the Python objects a worker touches, but
+# not the tensors themselves. A worker is ready in milliseconds instead of reloading the model.
+# The candidate index and feature store are loaded in the master too, and the master is their
+# only writer: workers embed and parse candidates, then queue the inserts to a writer thread
+# the master starts once every worker has forked.
+#
+# Usage:
+#   python prefork.py --workers 4                 # drain the batch screening queue
+#   python prefork.py --workers 4 --stats-only    # fork, report startup and memory, exit
+import gc
+import importlib
+import json
+import multiprocessing as mp
+import os
+import threading
+import time
+
+_shared_loaded = False
+
+
+def load_shared_state():
+    """Everything the workers should inherit rather than load. Safe to call more than once."""
+    global _shared_loaded
+    if _shared_loaded:
+        return
+    import faiss
+    import torch
+
+    # Keep the master single-threaded: an OpenMP thread team created before fork() is not
+    # usable in the children, so the thread pools are only started in the workers
+    torch.set_num_threads(1)
+    faiss.omp_set_num_threads(1)
+
+    from candidate_index import get_candidate_index
+    from candidate_store import get_candidate_store
+    from faiss_engine import model
+    from jd_catalog import get_catalog
+
+    model.encode(["warm up the encoder before forking"])
+    get_catalog()
+    get_candidate_index()
+    get_candidate_store()
+
+    # Import the worker-side modules now, so no worker imports (and allocates) them again
+    for module_name in ("batch_jobs", "bulk_encoding", "report_cache", "results_writer"):
+        importlib.import_module(module_name)
+
+    gc.collect()
+    gc.freeze()
+    _shared_loaded = True
+
+
+def memory_usage(pid=None):
+    """RSS, PSS, USS (private pages) and shared pages in MB, from /proc/<pid>/smaps_rollup."""
+    fields = {}
+    with open(f"/proc/{pid or os.getpid()}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "uss_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1),
+        "shared_mb": round(fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0), 1),
+    }
+
+
+def _write_inserts(inserts):
+    from candidate_index import get_candidate_index, write_candidate
+    from candidate_store import get_candidate_store
+
+    while True:
+        prepared = inserts.get()
+        if prepared is None:
+            break
+        try:
+            write_candidate(prepared)
+        except Exception as e:
+            print(f"Candidate insert failed: {e!r}", flush=True)
+    get_candidate_index().save()
+    get_candidate_store().save()
+
+
+def _worker_main(index, workers, tasks, results, ready, inserts):
+    from candidate_index import forward_inserts
+    from thread_budget import configure_threads
+
+    configure_threads(concurrency=workers)
+    forward_inserts(inserts)
+    ready.send(time.perf_counter())
+    ready.close()
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        task_id, func, args, kwargs = task
+        try:
+            results.put((task_id, True, func(*args, **kwargs)))
+        except Exception as e:
+            results.put((task_id, False, repr(e)))
+
+
+def _serve_batch_jobs(index, workers, tasks, results, ready, inserts):
+    import batch_jobs
+    from candidate_index import forward_inserts
+    from thread_budget import configure_threads
+
+    configure_threads(concurrency=workers)
+    forward_inserts(inserts)
+    ready.send(time.perf_counter())
+    ready.close()
+    batch_jobs.ensure_workers(1)
+    # Block until the master sends the stop sentinel
+    tasks.get()
+
+
+class PreforkPool:
+    """
+    Forks ``workers`` processes from a master that has already loaded the shared state.
+    ``submit``/``map`` run module-level functions in the workers; results come back pickled.
+    """
+
+    def __init__(self, workers=None, target=_worker_main):
+        from limits import MAX_CONCURRENT_WORK
+
+        self.workers = workers or MAX_CONCURRENT_WORK
+        load_shared_state()
+        context = mp.get_context("fork")
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._inserts = context.Queue()
+        self._writer = None
+        self._next_id = 0
+        self._done = {}
+        self.processes = []
+        self.startup_ms = []
+
+        for index in range(self.workers):
+            receive, send = context.Pipe(duplex=False)
+            process = context.Process(target=target, args=(index, self.workers, self._tasks, self._results, send, self._inserts),
+                                      name=f"prefork-worker-{index}", daemon=True)
+            start = time.perf_counter()
+            process.start()
+            send.close()
+            ready_at = receive.recv()
+            receive.close()
+            self.processes.append(process)
+            self.startup_ms.append(round((ready_at - start) * 1000, 2))
+        # Only now that nothing else will fork does the master start a thread
+        self._writer = threading.Thread(target=_write_inserts, args=(self._inserts,), name="prefork-writer", daemon=True)
+        self._writer.start()
+
+    def submit(self, func, *args, **kwargs):
+        task_id = self._next_id
+        self._next_id += 1
+        self._tasks.put((task_id, func, args, kwargs))
+        return task_id
+
+    def result(self, task_id):
+        while task_id not in self._done:
+            done_id, ok, value = self._results.get()
+            self._done[done_id] = (ok, value)
+        ok, value = self._done.pop(task_id)
+        if not ok:
+            raise RuntimeError(f"Worker task failed: {value}")
+        return value
+
+    def map(self, func, items):
+        task_ids = [self.submit(func, item) for item in items]
+        return [self.result(task_id) for task_id in task_ids]
+
+    def stats(self):
+        return {
+            "master": memory_usage(),
+            "workers": [
+                {"pid": process.pid, "startup_ms": startup_ms, **memory_usage(process.pid)}
+                for process, startup_ms in zip(self.processes, self.startup_ms)
+            ],
+        }
+
+    def close(self):
+        for _ in self.processes:
+            self._tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        if self._writer is not None:
+            self._inserts.put(None)
+            self._writer.join()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Preforked workers sharing the encoder and JD catalog")
+    parser.add_argument("--workers", type=int, help="defaults to MAX_CONCURRENT_WORK")
+    parser.add_argument("--stats-only", action="store_true", help="report startup and memory, then exit")
+    args = parser.parse_args()
+
+    pool = PreforkPool(args.workers, target=_worker_main if args.stats_only else _serve_batch_jobs)
+    print(json.dumps(pool.stats(), indent=2))
+    if args.stats_only:
+        pool.close()
+        return
+    try:
+        for process in pool.processes:
+            process.join()
+    except KeyboardInterrupt:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,10 @@ def load_model():
 model = load_model()
 
 # --- Semantic Recommendation Function ---
-def semantic_recommendation(resume_text, jd_text):
+def semantic_recommendation(resume_text, jd_text, resume_embedding=None):
     if isinstance(jd_text, list): jd_text = " ".join(jd_text)
-    resume_emb = model.encode(resume_text, convert_to_tensor=True)
+    # Same model as faiss_engine, so a caller's resume vector can be reused as is
+    resume_emb = model.encode(resume_text, convert_to_tensor=True) if resume_embedding is None else resume_embedding
     jd_emb = model.encode(jd_text, convert_to_tensor=True)
     similarity_score = util.pytorch_cos_sim(resume_emb, jd_emb).item()
     return round(similarity_score, 3)
@@ -23,8 +24,16 @@ def extract_skills(text):
     from nlp_utils import extract_skills as base_extract
     return base_extract(text)
 
-# --- Main Recommendation Function ---
-def show_recommendation(resume_text, jd_text):
+HARD_SKILLS = {
+    "python", "java", "node.js", "docker", "aws", "gcp", "sql", "mongodb", "pytorch", "react", "spring boot",
+    "typescript", "fastapi", "flask", "tensorflow", "azure", "kubernetes", "ci/cd", "spark", "graphql", "airflow"
+}
+SOFT_SKILLS = {
+    "teamwork", "communication", "leadership", "adaptability", "critical thinking", "problem solving"
+}
+
+# --- Recommendation Scoring ---
+def compute_recommendation(resume_text, jd_text, resume_embedding=None):
     jd_combined = " ".join(jd_text) if isinstance(jd_text, list) else jd_text
 
     resume_skills = set(extract_skills(resume_text))
@@ -35,16 +44,8 @@ def show_recommendation(resume_text, jd_text):
     total_required = len(jd_skills) or 1
     confidence_score = round(len(matched_skills) / total_required, 2)
 
-    hard_skills = {
-        "python", "java", "node.js", "docker", "aws", "gcp", "sql", "mongodb", "pytorch", "react", "spring boot",
-        "typescript", "fastapi", "flask", "tensorflow", "azure", "kubernetes", "ci/cd", "spark", "graphql", "airflow"
-    }
-    soft_skills = {
-        "teamwork", "communication", "leadership", "adaptability", "critical thinking", "problem solving"
-    }
-
-    matched_hard = resume_skills & hard_skills
-    matched_soft = resume_skills & soft_skills
+    matched_hard = resume_skills & HARD_SKILLS
+    matched_soft = resume_skills & SOFT_SKILLS
 
     critical_keywords = {"aws", "gcp", "kubernetes", "ci/cd", "graphql", "communication", "leadership"}
     critical_missing = critical_keywords & missing_skills
@@ -74,17 +75,36 @@ def show_recommendation(resume_text, jd_text):
         "leadership": "Leadership Principles (HarvardX)"
     }
 
-    suggestions = [f"• {learning_links[skill]}" for skill in critical_missing if skill in learning_links]
-    suggested_courses = "<br>" + "<br>".join(suggestions) if suggestions else "None"
+    semantic_score = semantic_recommendation(resume_text, jd_combined, resume_embedding)
+
+    return {
+        "matched_skills": sorted(matched_skills),
+        "missing_skills": sorted(missing_skills),
+        "critical_missing": sorted(critical_missing),
+        "suggested_courses": [learning_links[skill] for skill in sorted(critical_missing) if skill in learning_links],
+        "confidence_score": confidence_score,
+        "match_tags": match_tags,
+        "semantic_score": semantic_score,
+        "final_tag": "#recommended" if semantic_score > 0.75 else "#not_recommended",
+    }
 
-    semantic_score = semantic_recommendation(resume_text, jd_combined)
-    final_tag = "#recommended" if semantic_score > 0.75 else "#not_recommended"
+# --- Main Recommendation Function ---
+def show_recommendation(resume_text, jd_text, report=None):
+    if report is None:
+        from report_cache import get_report
+        report = get_report(resume_text, jd_text)
+    result = report["recommendation"]
+    match_tags = result["match_tags"]
+    confidence_score = result["confidence_score"]
+    semantic_score = result["semantic_score"]
+    final_tag = result["final_tag"]
+
+    suggestions = [f"• {course}" for course in result["suggested_courses"]]
+    suggested_courses = "<br>" + "<br>".join(suggestions) if suggestions else "None"
 
     analysis_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    from nlp_utils import extract_basic_info
-
-    info = extract_basic_info(resume_text)
+    info = report["info"]
 
   
 
@@ -0,0 +1,376 @@
+# report_cache.py
+# Everything the four report tabs compute for one (resume, JD set), cached as a whole. The
+# key combines the resume hash, the ordered JD hashes, the model id and a config version
+# hashed from the source of the scoring modules and the JD profile version, so editing a
+# rule, weight or skill list invalidates old reports (and the profiles they read)
+# automatically. Recent reports live in an in-memory LRU; all of them are kept in SQLite so
+# a candidate reopened later, or by another process, is not recomputed either.
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import closing
+from datetime import datetime
+
+DB_PATH = os.environ.get("REPORT_CACHE_DB", "report_cache.db")
+MEMORY_CACHE_SIZE = 256
+# Stage tasks queued or running per stage worker; past this new reports are refused, like MAX_QUEUED_WORK
+STAGE_QUEUE_DEPTH = 4
+
+# Bump when the report layout changes in a way the scoring sources below don't capture
+REPORT_FORMAT = 1
+# Modules whose code decides report contents
+SCORING_MODULES = (
+    "extraction_rules.py", "nlp_utils.py", "token_index.py", "faiss_engine.py", "hybrid_search.py",
+    "screening.py", "recommendation.py", "job_matches.py", "spacy_pipeline.py", "report_cache.py",
+    "jd_profiles.py", "rule_features.py", "bulk_encoding.py", "evidence.py",
+)
+
+_memory_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_config_version = None
+_stage_executor = None
+_max_queued_stages = 0
+_stage_executor_lock = threading.Lock()
+_queued_stages = 0
+_queued_stages_lock = threading.Lock()
+
+
+def config_version():
+    global _config_version
+    if _config_version is None:
+        from jd_profiles import profile_version
+        from nlp_utils import EXTRACTION_BACKEND
+
+        # Reports read stored JD profiles, so a new profile version is a new config too
+        digest = hashlib.sha256(f"{REPORT_FORMAT}:{EXTRACTION_BACKEND}:{profile_version()}".encode())
+        base = os.path.dirname(os.path.abspath(__file__))
+        for name in SCORING_MODULES:
+            with open(os.path.join(base, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+        _config_version = digest.hexdigest()[:16]
+    return _config_version
+
+
+def report_key(resume_text, jd_list):
+    from faiss_engine import MODEL_ID
+
+    parts = {
+        "resume": hashlib.sha256(resume_text.encode("utf-8")).hexdigest(),
+        # Order matters: reports refer to JDs by position
+        "jds": hashlib.sha256("\n".join(hashlib.sha256(jd.encode("utf-8")).hexdigest() for jd in jd_list).encode()).hexdigest(),
+        "model": MODEL_ID,
+        "config": config_version(),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+# A report is built in stages so it can be shown progressively: the profile is cheap and
+# usually computed inline, the others run on the stage executor. Screening reuses the profile's info.
+def _stage_profile(resume_text, jd_list):
+    from nlp_utils import (analyze_career_path, count_categories, extract_basic_info,
+                           extract_certifications_and_achievements)
+
+    return {
+        "info": extract_basic_info(resume_text),
+        "counts": count_categories(resume_text),
+        "cert_achievements": extract_certifications_and_achievements(resume_text),
+        "career_analysis": analyze_career_path(resume_text),
+    }
+
+
+def _stage_matches(resume_text, jd_list):
+    from evidence import explain_matches
+    from faiss_engine import find_top_matches
+    from token_index import common_keywords, keyword_overlap
+
+    top_matches = find_top_matches(resume_text, jd_list, top_k=3) if jd_list else []
+    return {
+        "top_matches": top_matches,
+        "keyword_overlap": keyword_overlap(resume_text, jd_list) if jd_list else [],
+        "common_skills": common_keywords(resume_text, jd_list[top_matches[0]["index"]]) if top_matches else [],
+        # Resume sentences backing each requirement of the top matches
+        "evidence": explain_matches(resume_text, [match["job_description"] for match in top_matches]),
+    }
+
+
+def _stage_screening(resume_text, jd_list, info):
+    from screening import score_resume_against_jds
+
+    return {"ranking": score_resume_against_jds(resume_text, jd_list, resume_info=info) if jd_list else None}
+
+
+def _stage_recommendation(resume_text, jd_list):
+    from recommendation import compute_recommendation
+
+    return {"recommendation": compute_recommendation(resume_text, jd_list)}
+
+
+def build_report(resume_text, jd_list):
+    report = _stage_profile(resume_text, jd_list)
+    report.update(_stage_matches(resume_text, jd_list))
+    report.update(_stage_screening(resume_text, jd_list, report["info"]))
+    report.update(_stage_recommendation(resume_text, jd_list))
+    return report
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS reports (
+            report_key TEXT PRIMARY KEY,
+            config_version TEXT NOT NULL,
+            report BLOB NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _remember(key, report):
+    with _cache_lock:
+        _memory_cache[key] = report
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def _recall(key):
+    with _cache_lock:
+        report = _memory_cache.get(key)
+        if report is not None:
+            _memory_cache.move_to_end(key)
+        return report
+
+
+def _load(key):
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT report FROM reports WHERE report_key = ?", (key,)).fetchone()
+    return pickle.loads(row[0]) if row else None
+
+
+def _save(key, report):
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?)",
+            (key, config_version(), pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL),
+             datetime.now().isoformat(timespec="seconds")),
+        )
+
+
+def stage_executor():
+    """
+    The pool the report stages run on. Stages run the encoder and FAISS, so it gets the same
+    concurrency thread_budget splits the cores by: stage threads x intra-op threads stays at
+    about one thread per core.
+    """
+    global _stage_executor, _max_queued_stages
+    with _stage_executor_lock:
+        if _stage_executor is None:
+            from limits import MAX_CONCURRENT_WORK
+            from thread_budget import configure_thread, current_concurrency
+
+            workers = current_concurrency()
+            _stage_executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="report-stage", initializer=configure_thread,
+            )
+            # Room for the stages of every analysis holding a work slot, even with fewer stage workers
+            _max_queued_stages = STAGE_QUEUE_DEPTH * max(workers, MAX_CONCURRENT_WORK)
+        return _stage_executor
+
+
+def _reserve_stages(count):
+    global _queued_stages
+    from limits import ServerBusyError
+
+    stage_executor()
+    with _queued_stages_lock:
+        if _queued_stages + count > _max_queued_stages:
+            raise ServerBusyError("The server is at capacity. Please try again shortly.")
+        _queued_stages += count
+
+
+def _release_stages(count):
+    global _queued_stages
+    with _queued_stages_lock:
+        _queued_stages -= count
+
+
+def _stage_finished(_):
+    # Done callbacks also run for cancelled stages, so a dropped stage frees its place at once
+    _release_stages(1)
+
+
+def _submit_stage(func, *args):
+    future = stage_executor().submit(func, *args)
+    future.add_done_callback(_stage_finished)
+    return future
+
+
+def _normalise_jds(jd_list):
+    if isinstance(jd_list, str):
+        jd_list = [jd_list]
+    return list(jd_list or [])
+
+
+def get_report(resume_text, jd_list):
+    """
+    Returns the report for this resume and JD list, computing it only on a miss in both
+    tiers. Reports are shared between sessions and must be treated as read-only.
+    """
+    jd_list = _normalise_jds(jd_list)
+    key = report_key(resume_text, jd_list)
+    report = _recall(key)
+    if report is None:
+        report = _load(key)
+        if report is None:
+            report = build_report(resume_text, jd_list)
+            _save(key, report)
+        _remember(key, report)
+    return report
+
+
+class PendingReport:
+    """
+    A report whose stages complete one by one. ``report`` holds every stage collected so
+    far; ``wait`` blocks for named stages. The profile is computed inline unless
+    ``background`` is set, e.g. for speculative work started before anyone asked for the
+    report. Once all stages are done the full report is stored in both cache tiers, even if
+    nobody is waiting for it any more; a cancelled report is not stored. With ``holds_slot``
+    the caller has taken a work slot for this report, released once every stage is done.
+    ``stage_seconds`` records when each stage finished, counted from the report's start.
+    Raises ServerBusyError when the stage queue is full (STAGE_QUEUE_DEPTH per stage worker or
+    work slot, whichever there are more of).
+    """
+
+    def __init__(self, resume_text, jd_list, background=False, holds_slot=False):
+        from limits import release_work_slot
+
+        jd_list = _normalise_jds(jd_list)
+        self.key = report_key(resume_text, jd_list)
+        self._futures = {}
+        self.stage_seconds = {}
+        started = time.perf_counter()
+        cached = _recall(self.key) or _load(self.key)
+        if cached is not None:
+            _remember(self.key, cached)
+            self.report = dict(cached)
+            if holds_slot:
+                release_work_slot()
+            return
+
+        try:
+            _reserve_stages(4 if background else 3)
+        except Exception:
+            if holds_slot:
+                release_work_slot()
+            raise
+        self.report = {}
+        if background:
+            profile = _submit_stage(_stage_profile, resume_text, jd_list)
+        else:
+            profile = Future()
+            try:
+                profile.set_result(_stage_profile(resume_text, jd_list))
+            except Exception:
+                # Nothing was queued yet: hand back the places reserved for the other stages
+                _release_stages(3)
+                if holds_slot:
+                    release_work_slot()
+                raise
+            self.report.update(profile.result())
+        self._futures = {
+            "profile": profile,
+            "matches": _submit_stage(_stage_matches, resume_text, jd_list),
+            # Queued after the profile, so by the time it runs the profile is running or done
+            "screening": _submit_stage(
+                lambda: _stage_screening(resume_text, jd_list, profile.result()["info"])
+            ),
+            "recommendation": _submit_stage(_stage_recommendation, resume_text, jd_list),
+        }
+        remaining = [len(self._futures)]
+        remaining_lock = threading.Lock()
+
+        def on_stage_done(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            if holds_slot:
+                release_work_slot()
+            if any(f.cancelled() or f.exception() for f in self._futures.values()):
+                return
+            report = {}
+            for future in self._futures.values():
+                report.update(future.result())
+            _save(self.key, report)
+            _remember(self.key, report)
+
+        def timed(stage):
+            def record(_):
+                self.stage_seconds.setdefault(stage, time.perf_counter() - started)
+            return record
+
+        for stage, future in self._futures.items():
+            future.add_done_callback(timed(stage))
+            future.add_done_callback(on_stage_done)
+
+    def cancel(self):
+        """Drops stages that have not started. If every stage was already running, the report still completes and is cached."""
+        for future in self._futures.values():
+            future.cancel()
+
+    def failed(self):
+        """True once a stage was cancelled or raised; waiting on this report cannot complete it."""
+        return any(f.cancelled() or (f.done() and f.exception()) for f in self._futures.values())
+
+    def done(self, stages):
+        return all(self._futures[s].done() for s in stages if s in self._futures)
+
+    def wait_any(self, stages, timeout=None):
+        """Blocks until at least one of the unfinished ``stages`` completes (or ``timeout``)."""
+        pending = [self._futures[s] for s in stages if s in self._futures and not self._futures[s].done()]
+        if pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("Report stages did not finish in time.")
+
+    def wait(self, stages, timeout=None):
+        for stage in stages:
+            if stage in self._futures:
+                self.report.update(self._futures[stage].result(timeout=timeout))
+        return self.report
+
+
+def speculate(previous, resume_text, jd_list):
+    """
+    Background report for inputs that are known but not yet asked for. Returns ``previous``
+    while it is for the same inputs and has not failed; otherwise cancels it and starts over.
+    Speculation is optional work: it runs under a work slot of its own, and returns None
+    instead of waiting when no slot or stage capacity is free.
+    """
+    from limits import ServerBusyError, try_work_slot
+
+    key = report_key(resume_text, _normalise_jds(jd_list))
+    if previous is not None:
+        if previous.key == key and not previous.failed():
+            return previous
+        previous.cancel()
+    if not try_work_slot():
+        return None
+    try:
+        return PendingReport(resume_text, jd_list, background=True, holds_slot=True)
+    except ServerBusyError:
+        return None
+
+
+def purge_stale_reports():
+    """Deletes disk entries written under an older config version; returns how many."""
+    with closing(_connect()) as conn, conn:
+        return conn.execute("DELETE FROM reports WHERE config_version != ?", (config_version(),)).rowcount
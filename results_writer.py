@@ -0,0 +1,178 @@
+# results_writer.py
+# Streams per-candidate screening records to Parquet or Arrow IPC files. Records are buffered
+# only until a row group is full and then written out, so memory stays bounded by
+# row_group_size no matter how many candidates go through.
+import hashlib
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+ROW_GROUP_SIZE = 1000
+
+_STRING_LIST = pa.list_(pa.string())
+_MATCH_TYPE = pa.struct([("jd_index", pa.int32()), ("title", pa.string()), ("score", pa.float32())])
+
+
+def results_schema(embedding_dim=None):
+    fields = [
+        ("candidate", pa.string()),
+        ("resume_hash", pa.string()),
+        # Screening (best JD)
+        ("screening_score", pa.float32()),
+        ("experience_score", pa.float32()),
+        ("culture_fit", pa.float32()),
+        ("academic_score", pa.float32()),
+        ("best_jd_index", pa.int32()),
+        ("best_jd_title", pa.string()),
+        # Extracted resume info
+        ("skills", _STRING_LIST),
+        ("years_experience", pa.int32()),
+        ("education", pa.string()),
+        ("grades", _STRING_LIST),
+        ("red_flags", _STRING_LIST),
+        # JD matching and recommendation
+        ("top_matches", pa.list_(_MATCH_TYPE)),
+        ("matched_skills", _STRING_LIST),
+        ("missing_skills", _STRING_LIST),
+        ("match_tags", _STRING_LIST),
+        ("recommendation_confidence", pa.float32()),
+        ("semantic_score", pa.float32()),
+        ("final_tag", pa.string()),
+        # Last cascade stage reached, for batch jobs run with the cascade
+        ("cascade_stage", pa.string()),
+    ]
+    if embedding_dim:
+        fields.append(("embedding", pa.list_(pa.float32(), embedding_dim)))
+    return pa.schema(fields)
+
+
+def build_candidate_record(resume_text, jd_list, name=None, include_embedding=False, top_k=3, embedding=None):
+    """
+    Runs the same scoring as the Screening, Role Matching and Recommendation tabs and returns
+    one flat record, without rendering anything. Pass ``embedding`` when the resume has
+    already been encoded, so it is not encoded again.
+    """
+    from faiss_engine import embed_resume, find_top_matches
+    from nlp_utils import extract_basic_info
+    from recommendation import compute_recommendation
+    from screening import score_resume_against_jds
+
+    info = extract_basic_info(resume_text)
+    ranking = score_resume_against_jds(resume_text, jd_list, resume_info=info)
+    best = ranking.iloc[0]
+    titles = dict(zip(ranking["jd_index"], ranking["title"]))
+    matches = find_top_matches(resume_text, jd_list, top_k=top_k, resume_embedding=embedding)
+    recommendation = compute_recommendation(resume_text, jd_list, resume_embedding=embedding)
+
+    record = {
+        "candidate": name,
+        "resume_hash": hashlib.sha256(resume_text.encode("utf-8")).hexdigest(),
+        "screening_score": float(best["overall"]),
+        "experience_score": float(best["experience"]),
+        "culture_fit": float(best["culture_fit"]),
+        "academic_score": float(best["academic"]),
+        "best_jd_index": int(best["jd_index"]),
+        "best_jd_title": best["title"],
+        "skills": list(info["skills"]),
+        "years_experience": int(info["years_experience"]),
+        "education": info["education"],
+        "grades": list(info["grades"]),
+        "red_flags": list(info["red_flags"]),
+        "top_matches": [
+            {"jd_index": m["index"], "title": titles.get(m["index"]), "score": m["score"]} for m in matches
+        ],
+        "matched_skills": recommendation["matched_skills"],
+        "missing_skills": recommendation["missing_skills"],
+        "match_tags": recommendation["match_tags"],
+        "recommendation_confidence": recommendation["confidence_score"],
+        "semantic_score": recommendation["semantic_score"],
+        "final_tag": recommendation["final_tag"],
+    }
+    if include_embedding:
+        record["embedding"] = embed_resume(resume_text) if embedding is None else embedding
+    return record
+
+
+class ResultsWriter:
+    """
+    ``format="parquet"`` writes one Parquet row group per flush; ``format="arrow"`` writes an
+    Arrow IPC file with one record batch per flush. With ``include_embeddings=True`` every
+    record must carry an ``embedding`` vector of ``embedding_dim`` floats.
+    """
+
+    def __init__(self, path, format="parquet", include_embeddings=False, embedding_dim=None,
+                 row_group_size=ROW_GROUP_SIZE, compression="zstd"):
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unknown results format: {format}")
+        if include_embeddings and embedding_dim is None:
+            from faiss_engine import model
+            embedding_dim = model.get_sentence_embedding_dimension()
+
+        self.path = path
+        self.format = format
+        self.include_embeddings = include_embeddings
+        self.embedding_dim = embedding_dim if include_embeddings else None
+        self.row_group_size = row_group_size
+        self.schema = results_schema(self.embedding_dim)
+        self.rows_written = 0
+        self._buffer = []
+
+        if format == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self._writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.row_group_size:
+            self.flush()
+
+    def _to_table(self, records):
+        columns = {}
+        for field in self.schema:
+            if field.name == "embedding":
+                vectors = np.vstack([r["embedding"] for r in records]).astype(np.float32, copy=False)
+                columns["embedding"] = pa.FixedSizeListArray.from_arrays(vectors.ravel(), self.embedding_dim)
+            else:
+                columns[field.name] = pa.array([r.get(field.name) for r in records], type=field.type)
+        return pa.Table.from_pydict(columns, schema=self.schema)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        table = self._to_table(self._buffer)
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_screening_results(resumes, jd_list, path, format="parquet", include_embeddings=False,
+                             row_group_size=ROW_GROUP_SIZE, top_k=3):
+    """
+    ``resumes`` is any iterable of (name, resume_text) pairs, e.g. a generator over a folder,
+    so the whole batch never has to be in memory. Returns the number of records written.
+    """
+    with ResultsWriter(path, format=format, include_embeddings=include_embeddings,
+                       row_group_size=row_group_size) as writer:
+        for name, resume_text in resumes:
+            writer.write(build_candidate_record(resume_text, jd_list, name=name,
+                                                include_embedding=include_embeddings, top_k=top_k))
+    return writer.rows_written
@@ -1,25 +1,47 @@
 # 📁 File: resume_upload.py
 
+import hashlib
+
 import streamlit as st
-import fitz  # PyMuPDF
-import tempfile
+from candidate_index import add_candidate
+from limits import ResourceLimitError, check_upload_size, read_pdf_text
 
 def extract_text_from_pdf(pdf_file):
-    text = ""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        tmp_file.write(pdf_file.read())
-        tmp_file_path = tmp_file.name
-    
-    doc = fitz.open(tmp_file_path)
-    for page in doc:
-        text += page.get_text()
-    doc.close()
+    # Same limits as the upload path; use read_pdf_text directly to get the truncation notes
+    text, _ = read_pdf_text(pdf_file.read())
     return text
 
 def handle_resume_upload():
     uploaded_file = st.sidebar.file_uploader("📄 Upload Resume (PDF)", type=["pdf"])
     if uploaded_file is not None:
-        resume_text = extract_text_from_pdf(uploaded_file)
+        try:
+            check_upload_size(uploaded_file)
+        except ResourceLimitError as e:
+            st.sidebar.error(f"❌ {e}")
+            return None
+        resume_text, notes = read_pdf_text(uploaded_file.read())
+        for note in notes:
+            st.sidebar.warning(f"⚠️ {note}")
+        # Keep every processed resume searchable by JD; re-uploads are deduplicated by content hash.
+        # Every widget click reruns this with the same upload, so index it once per session
+        resume_hash = hashlib.sha256(resume_text.encode("utf-8")).hexdigest()
+        if st.session_state.get("indexed_resume_hash") != resume_hash:
+            add_candidate(resume_text, name=uploaded_file.name)
+            st.session_state.indexed_resume_hash = resume_hash
         st.sidebar.success("✅ Resume uploaded and processed.")
         return resume_text
-    return None 
\ No newline at end of file
+    return None
+
+def handle_batch_upload():
+    uploaded_files = st.sidebar.file_uploader("📂 Upload Resumes (PDF)", type=["pdf"], accept_multiple_files=True)
+    files = []
+    for uploaded_file in uploaded_files or []:
+        try:
+            check_upload_size(uploaded_file)
+        except ResourceLimitError as e:
+            st.sidebar.error(f"❌ {e}")
+            continue
+        files.append((uploaded_file.name, uploaded_file.getvalue()))
+    if files:
+        st.sidebar.success(f"✅ {len(files)} resume(s) ready for batch screening.")
+    return files
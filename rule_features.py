@@ -0,0 +1,201 @@
+# rule_features.py
+# Keyword-rule scoring for whole batches of resumes. Each text is scanned once into a row of
+# a sparse keyword-hit matrix; every rule (category counts, leadership, career levels,
+# culture fit, skill matches, JD skill coverage) is then a matrix product with a 0/1
+# keyword-to-rule matrix. Hits follow the scalar rules exactly: a keyword counts when it
+# occurs anywhere in the lowercased text, once per text. The cascade and the candidate store
+# use the featurizer directly; run as a script it rescores resume files in bulk, with the
+# app's rules or a JSON rubric of named keyword sets.
+#
+# Usage:
+#   python rule_features.py resumes/ --jd backend.txt --output rule_scores.csv
+#   python rule_features.py resumes/ --rubric rubric.json --output rubric_scores.csv
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def _trie_pattern(words):
+    # Common prefixes are merged into one branch and optional extensions are greedy, so at
+    # any position the regex matches the longest keyword starting there
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class KeywordFeaturizer:
+    def __init__(self, keywords):
+        self.vocabulary = sorted({k.lower() for k in keywords if k})
+        self.position = {k: i for i, k in enumerate(self.vocabulary)}
+        # Zero-width lookahead: the scan is tried at every offset, so overlapping and nested
+        # keywords ("project lead", "lead") are all seen
+        self._pattern = re.compile(f"(?=({_trie_pattern(self.vocabulary)}))")
+        # A match only reports the longest keyword at its offset; shorter keywords that are
+        # prefixes of it ("project" in "project lead") start there too
+        self._closure = {
+            k: tuple(self.position[p] for p in self.vocabulary if k.startswith(p)) for k in self.vocabulary
+        }
+
+    def transform(self, texts):
+        indptr = [0]
+        indices = []
+        for text in texts:
+            hits = set()
+            for longest in set(self._pattern.findall(text.lower())):
+                hits.update(self._closure[longest])
+            indices.extend(sorted(hits))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulary)))
+
+    def rule_matrix(self, keyword_sets):
+        """Keyword-to-rule matrix; a keyword listed twice in one set counts twice, as in the scalar loops."""
+        rows, cols = [], []
+        for col, keywords in enumerate(keyword_sets):
+            for keyword in keywords:
+                rows.append(self.position[keyword.lower()])
+                cols.append(col)
+        data = np.ones(len(rows), dtype=np.float32)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(len(self.vocabulary), len(keyword_sets)))
+
+
+def _rule_sets():
+    from nlp_utils import CATEGORY_KEYWORDS, DEFAULT_SKILLS, JOB_LEVELS, LEADERSHIP_TERMS
+    from recommendation import HARD_SKILLS, SOFT_SKILLS as RECOMMENDATION_SOFT_SKILLS
+    from screening import SOFT_SKILLS
+
+    rule_sets = {category: sorted(keywords) for category, keywords in CATEGORY_KEYWORDS.items()}
+    rule_sets.update({
+        "leadership": LEADERSHIP_TERMS,
+        "career_levels": list(dict.fromkeys(JOB_LEVELS)),
+        "culture_fit": sorted(SOFT_SKILLS),
+        # Recommendation matches its skill sets against extract_skills' default skills only
+        "hard_skills_matched": sorted(DEFAULT_SKILLS & HARD_SKILLS),
+        "soft_skills_matched": sorted(DEFAULT_SKILLS & RECOMMENDATION_SOFT_SKILLS),
+    })
+    return rule_sets
+
+
+@lru_cache(maxsize=8)
+def get_featurizer(extra_keywords=()):
+    keywords = [k for keywords in _rule_sets().values() for k in keywords]
+    return KeywordFeaturizer(keywords + list(extra_keywords))
+
+
+def score_keyword_sets(resume_texts, keyword_sets, featurizer=None):
+    """Hit counts of every resume against every named keyword set, as a DataFrame."""
+    if featurizer is None:
+        featurizer = KeywordFeaturizer([k for keywords in keyword_sets.values() for k in keywords])
+    hits = featurizer.transform(resume_texts)
+    counts = (hits @ featurizer.rule_matrix(list(keyword_sets.values()))).toarray()
+    return pd.DataFrame(counts.astype(np.int64), columns=list(keyword_sets))
+
+
+def score_rules(resume_texts, jd_skill_lists=None):
+    """
+    Scores a batch of resumes with the app's keyword rules. Returns a DataFrame with one row
+    per resume and, when ``jd_skill_lists`` is given, an (n_resumes, n_jds) array matching
+    evaluate_relevant_experience for every pair.
+    """
+    from nlp_utils import CATEGORY_KEYWORDS
+
+    jd_skill_lists = jd_skill_lists or []
+    rule_sets = _rule_sets()
+    featurizer = get_featurizer(tuple(sorted({s.lower() for skills in jd_skill_lists for s in skills})))
+
+    hits = featurizer.transform(resume_texts)
+    counts = (hits @ featurizer.rule_matrix(list(rule_sets.values()))).toarray()
+    counts = dict(zip(rule_sets, counts.T))
+
+    scores = pd.DataFrame({category: counts[category].astype(np.int64) for category in CATEGORY_KEYWORDS})
+    scores["leadership"] = np.minimum(counts["leadership"] / len(rule_sets["leadership"]), 1.0)
+    scores["career_path"] = np.minimum(counts["career_levels"] / len(rule_sets["career_levels"]), 1.0)
+    scores["culture_fit"] = np.minimum(counts["culture_fit"] / len(rule_sets["culture_fit"]), 1.0)
+    scores["hard_skills_matched"] = counts["hard_skills_matched"].astype(np.int64)
+    scores["soft_skills_matched"] = counts["soft_skills_matched"].astype(np.int64)
+
+    relevant_experience = None
+    if jd_skill_lists:
+        coverage = (hits @ featurizer.rule_matrix(jd_skill_lists)).toarray()
+        lengths = np.array([len(skills) for skills in jd_skill_lists], dtype=np.float64)
+        relevant_experience = np.where(lengths > 0, np.minimum(coverage / np.maximum(lengths, 1), 1.0), 0.0)
+    return scores, relevant_experience
+
+
+def _read_resume(path):
+    if path.lower().endswith(".pdf"):
+        from limits import read_pdf_text
+        with open(path, "rb") as f:
+            return read_pdf_text(f.read())[0]
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def score_files(paths, rubric=None, jd_texts=(), chunk_size=10000):
+    """
+    Scores .txt and .pdf resumes under ``paths``, ``chunk_size`` files per matrix, yielding one
+    DataFrame per chunk with a ``file`` column. With ``rubric`` (name -> keywords) the columns
+    are its hit counts; otherwise the app's rule scores, plus relevant experience per JD.
+    """
+    from build_jd_index import iter_input_files
+    from nlp_utils import extract_jd_requirements
+
+    files = [path for path in iter_input_files(paths) if path.lower().endswith((".txt", ".pdf"))]
+    featurizer = KeywordFeaturizer([k for keywords in rubric.values() for k in keywords]) if rubric else None
+    jd_skill_lists = [extract_jd_requirements(text)["required_skills"] for text in jd_texts]
+    for start in range(0, len(files), chunk_size):
+        chunk = files[start:start + chunk_size]
+        texts = [_read_resume(path) for path in chunk]
+        if rubric:
+            scores = score_keyword_sets(texts, rubric, featurizer)
+        else:
+            scores, relevant_experience = score_rules(texts, jd_skill_lists)
+            for j in range(len(jd_skill_lists)):
+                scores[f"relevant_experience_jd{j + 1}"] = relevant_experience[:, j]
+        scores.insert(0, "file", chunk)
+        yield scores
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Score resume files with the keyword rules, a batch at a time")
+    parser.add_argument("inputs", nargs="+", help=".txt/.pdf resumes, or directories of them")
+    parser.add_argument("--rubric", help='JSON file of named keyword sets, e.g. {"cloud": ["aws", "gcp"]}')
+    parser.add_argument("--jd", action="append", default=[], help="JD text file; adds its relevant experience")
+    parser.add_argument("--output", default="rule_scores.csv")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    rubric = None
+    if args.rubric:
+        with open(args.rubric, encoding="utf-8") as f:
+            rubric = json.load(f)
+    jd_texts = []
+    for path in args.jd:
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            jd_texts.append(f.read())
+
+    rows = 0
+    for i, scores in enumerate(score_files(args.inputs, rubric, jd_texts, args.chunk_size)):
+        scores.to_csv(args.output, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(scores)
+    print(f"Scored {rows} resumes -> {args.output}")
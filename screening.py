@@ -1,108 +1,115 @@
 import streamlit as st
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+import pandas as pd
 from nlp_utils import (
     extract_basic_info,
-    extract_certifications_and_achievements,
-    estimate_skill_depth,
-    analyze_career_path,
     count_academic_points,
-    calculate_experience_score,
-    evaluate_relevant_experience,
-    title_match_score,
     leadership_mention_score,
-    extract_job_title
+    JD_KNOWN_SKILLS
 )
-import re
-import time
+from extraction_rules import scan_experience
+from jd_profiles import ingest_jds
+from report_cache import get_report
 
 # Inject CSS styles
 with open("styles.css") as f:
     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
-def extract_years_of_experience(resume_text):
-    text = resume_text.lower()
-    matches = re.findall(r'(\d+)\+?\s*(?:years|yrs)\s+(?:of\s+)?experience', text)
-    academic_phrases = re.findall(r'\d+(st|nd|rd|th)?\s+year\s+(student|b\.?tech|m\.?tech|undergraduate)', text)
-    if academic_phrases:
-        return 0
-    if matches:
-        years = [int(y) for y in matches if int(y) <= 50]
-        return max(years) if years else 0
-    return 0
-
-def extract_jd_requirements(jd_text):
-    requirements = {
-        "required_skills": [],
-        "min_experience": 0,
-        "required_degree": ""
-    }
-
-    jd_text = jd_text.lower()
-    known_skills = [
-        "python", "java", "javascript", "typescript", "c++", "c", "go", "rust", "ruby", "scala", "kotlin", "r",
-        "react", "angular", "vue", "next.js", "node.js", "flask", "django", "express", "spring boot", "fastapi",
-        "machine learning", "deep learning", "nlp", "computer vision", "data analysis", "data visualization",
-        "scikit-learn", "pandas", "numpy", "matplotlib", "seaborn", "tensorflow", "keras", "pytorch", "huggingface",
-        "sql", "mysql", "postgresql", "mongodb", "firebase", "cassandra", "oracle", "sqlite", "snowflake",
-        "aws", "azure", "gcp", "heroku", "digitalocean", "lambda", "s3", "ec2", "firebase",
-        "docker", "kubernetes", "jenkins", "gitlab", "github actions", "ansible", "terraform", "helm",
-        "pytest", "unittest", "selenium", "cypress", "postman", "jmeter",
-        "git", "github", "bitbucket", "jira", "confluence",
-        "communication", "leadership", "teamwork", "problem solving", "adaptability", "critical thinking",
-        "excel", "power bi", "tableau", "airflow", "hadoop", "spark", "kafka", "elasticsearch", "graphql", "rest api"
-    ]
-
-    requirements["required_skills"] = [skill for skill in known_skills if skill in jd_text]
-    exp_match = re.search(r'(\d+)\+?\s+years? of experience', jd_text)
-    if exp_match:
-        requirements["min_experience"] = int(exp_match.group(1))
-    if "bachelor" in jd_text or "b.tech" in jd_text:
-        requirements["required_degree"] = "bachelor"
-    elif "master" in jd_text or "m.tech" in jd_text:
-        requirements["required_degree"] = "master"
-    return requirements
-
-def show_screening(resume_text, jd_text):
-    st.markdown("<h2 class='section-title'>📋 Screening Dashboard</h2>", unsafe_allow_html=True)
+# Experience relevance = weighted experience fit, JD skill coverage, title match and leadership
+EXPERIENCE_WEIGHTS = {"experience": 0.4, "skills": 0.3, "title": 0.2, "leadership": 0.1}
+# Overall screening score = weighted experience relevance, culture fit and academics
+SCREENING_WEIGHTS = {"experience": 0.4, "culture": 0.2, "academic": 0.4}
 
-    resume_info = extract_basic_info(resume_text)
-    if isinstance(jd_text, list):
-        jd_text = jd_text[0] if jd_text else ""
-    jd_info = extract_jd_requirements(jd_text)
+SOFT_SKILLS = {
+    "adaptability", "collaboration", "communication", "creativity", "critical thinking", "decision making", "emotional intelligence", "empathy", "leadership", "negotiation", "organization", "problem solving", "teamwork", "time management", "work ethic", "flexibility", "conflict resolution", "accountability", "active listening", "attention to detail", "cooperation", "dependability", "discipline", "initiative", "interpersonal skills", "resilience", "resourcefulness", "self-awareness", "stress management", "verbal communication", "written communication", "positivity", "motivation", "curiosity", "open-mindedness", "self-confidence", "constructive criticism", "risk management", "strategic thinking", "customer service", "delegation", "project management", "goal setting", "business etiquette", "persuasiveness", "tactfulness", "inclusivity", "diversity awareness", "presentation skills", "cultural intelligence", "mentoring", "coaching", "assertiveness", "patience", "public speaking", "influence", "clarity", "sense of humor", "mindfulness", "self-discipline", "proactive mindset", "team building", "diplomacy", "analytical mindset", "prioritization", "design thinking", "multitasking", "perspective taking", "learning agility", "self-motivation", "body language awareness", "growth mindset", "feedback reception", "task ownership", "inspirational speaking", "information sharing", "storytelling", "professionalism", "change management", "value alignment", "process orientation", "initiative at work", "rapport building", "barrier handling", "self-reflection", "credibility", "relationship nurturing", "ethical communication", "honesty", "reliability", "followership", "respectfulness", "personal development", "eagerness to learn", "consensus building", "humility", "networking", "helpfulness", "meeting deadlines", "clarifying expectations"
+}
 
+_SKILL_VOCAB = list(dict.fromkeys(JD_KNOWN_SKILLS))
+_SKILL_POSITION = {skill: i for i, skill in enumerate(_SKILL_VOCAB)}
+
+def extract_years_of_experience(resume_text):
+    return scan_experience(resume_text)["screening_years"]
+
+def score_resume_against_jds(resume_text, jd_list, resume_info=None):
+    """
+    Scores one resume against every JD at once and returns a DataFrame ranked by overall score.
+    Resume features are computed once; per-JD requirements become arrays, so each extra
+    JD only adds a row to the matrices below.
+    """
+    if resume_info is None:
+        resume_info = extract_basic_info(resume_text)
+    resume_lower = resume_text.lower()
+    profiles = ingest_jds(jd_list)
+
+    # Shared resume features
     resume_exp = extract_years_of_experience(resume_text)
-    exp_required = jd_info.get("min_experience", 0)
-    jd_title = extract_job_title(jd_text)
-    jd_skills = jd_info.get("required_skills", [])
+    leadership = leadership_mention_score(resume_text)
+    overlap = len([s for s in SOFT_SKILLS if s in resume_lower])
+    culture_fit = min(overlap / len(SOFT_SKILLS), 1.0)
+    academic_score = count_academic_points(resume_info.get("grades", [])) / 100
+    resume_skill_hits = np.fromiter((skill in resume_lower for skill in _SKILL_VOCAB), dtype=np.float64, count=len(_SKILL_VOCAB))
+
+    # Per-JD requirement arrays
+    exp_required = np.array([p.get("min_experience", 0) for p in profiles], dtype=np.float64)
+    required_skills = np.zeros((len(profiles), len(_SKILL_VOCAB)))
+    for row, profile in enumerate(profiles):
+        for skill in profile.get("required_skills", []):
+            required_skills[row, _SKILL_POSITION[skill]] += 1
+    title_match = np.fromiter((p["title"].lower() in resume_lower for p in profiles), dtype=np.float64, count=len(profiles))
+
+    experience_fit = np.select(
+        [resume_exp >= exp_required, resume_exp >= exp_required - 1, np.full(len(profiles), resume_exp > 0)],
+        [1.0, 0.7, 0.4],
+        default=0.2,
+    )
+    skill_totals = required_skills.sum(axis=1)
+    skill_coverage = np.minimum(required_skills @ resume_skill_hits / np.maximum(skill_totals, 1), 1.0)
+    skill_coverage[skill_totals == 0] = 0.0
 
-    # ✅ New experience relevance logic
     experience_relevance = (
-        0.4 * calculate_experience_score(resume_exp, exp_required) +
-        0.3 * evaluate_relevant_experience(resume_text, jd_skills) +
-        0.2 * title_match_score(resume_text, jd_title) +
-        0.1 * leadership_mention_score(resume_text)
+        EXPERIENCE_WEIGHTS["experience"] * experience_fit +
+        EXPERIENCE_WEIGHTS["skills"] * skill_coverage +
+        EXPERIENCE_WEIGHTS["title"] * title_match +
+        EXPERIENCE_WEIGHTS["leadership"] * leadership
     )
-
-    soft_skills = {   "adaptability", "collaboration", "communication", "creativity", "critical thinking", "decision making", "emotional intelligence", "empathy", "leadership", "negotiation", "organization", "problem solving", "teamwork", "time management", "work ethic", "flexibility", "conflict resolution", "accountability", "active listening", "attention to detail", "cooperation", "dependability", "discipline", "initiative", "interpersonal skills", "resilience", "resourcefulness", "self-awareness", "stress management", "verbal communication", "written communication", "positivity", "motivation", "curiosity", "open-mindedness", "self-confidence", "constructive criticism", "risk management", "strategic thinking", "customer service", "delegation", "project management", "goal setting", "business etiquette", "persuasiveness", "tactfulness", "inclusivity", "diversity awareness", "presentation skills", "cultural intelligence", "mentoring", "coaching", "assertiveness", "patience", "public speaking", "influence", "clarity", "sense of humor", "mindfulness", "self-discipline", "proactive mindset", "team building", "diplomacy", "analytical mindset", "prioritization", "design thinking", "multitasking", "perspective taking", "learning agility", "self-motivation", "body language awareness", "growth mindset", "feedback reception", "task ownership", "inspirational speaking", "information sharing", "storytelling", "professionalism", "change management", "value alignment", "process orientation", "initiative at work", "rapport building", "barrier handling", "self-reflection", "credibility", "relationship nurturing", "ethical communication", "honesty", "reliability", "followership", "respectfulness", "personal development", "eagerness to learn", "consensus building", "humility", "networking", "helpfulness", "meeting deadlines", "clarifying expectations"
-    }
-    overlap = len([s for s in soft_skills if s in resume_text.lower()])
-    culture_fit = min(overlap / len(soft_skills), 1.0)
-
-    academic_score = count_academic_points(resume_info.get("grades", [])) / 100
-
     screening_score = (
-        experience_relevance * 0.4 +
-        culture_fit * 0.2 +
-        academic_score * 0.4
+        experience_relevance * SCREENING_WEIGHTS["experience"] +
+        culture_fit * SCREENING_WEIGHTS["culture"] +
+        academic_score * SCREENING_WEIGHTS["academic"]
     )
 
-    with st.spinner("Scoring resume against job description..."):
-        time.sleep(1)
+    table = pd.DataFrame({
+        "jd_index": np.arange(len(profiles)),
+        "title": [p["title"] for p in profiles],
+        "overall": screening_score,
+        "experience": experience_relevance,
+        "culture_fit": culture_fit,
+        "academic": academic_score,
+        "skill_coverage": skill_coverage,
+        "required_experience": exp_required.astype(int),
+    })
+    return table.sort_values("overall", ascending=False, kind="stable").reset_index(drop=True)
+
+def show_screening(resume_text, jd_text, report=None):
+    st.markdown("<h2 class='section-title'>📋 Screening Dashboard</h2>", unsafe_allow_html=True)
 
-    cert_achievements = extract_certifications_and_achievements(resume_text)
-    skill_depth = estimate_skill_depth(resume_text)
-    career_analysis = analyze_career_path(resume_text)
+    jd_list = jd_text if isinstance(jd_text, list) else [jd_text]
+    if not jd_list:
+        st.error("❌ No valid job descriptions found.")
+        return 0.0
+    if report is None:
+        report = get_report(resume_text, jd_list)
+
+    # ✅ Scored against every JD in one go; the headline metrics describe the best fit
+    ranking = report["ranking"]
+    best = ranking.iloc[0]
+    screening_score = float(best["overall"])
+    experience_relevance = float(best["experience"])
+    culture_fit = float(best["culture_fit"])
+    academic_score = float(best["academic"])
+
+    cert_achievements = report["cert_achievements"]
+    career_analysis = report["career_analysis"]
 
     # Display key metrics
     with st.container():
@@ -112,9 +119,22 @@ def show_screening(resume_text, jd_text):
         col3.metric("🤝 Culture Fit", f"{culture_fit * 100:.1f}%")
         col4.metric("🧪 Academic Performance", f"{academic_score * 100:.1f}%")
 
+    if len(jd_list) > 1:
+        st.markdown(f"<div class='custom-card'><h4>🏁 Role Ranking</h4><p>Best fit: <b>{best['title']}</b> across {len(jd_list)} roles.</p></div>", unsafe_allow_html=True)
+        st.dataframe(
+            ranking.assign(rank=ranking.index + 1)[["rank", "title", "overall", "experience", "skill_coverage", "required_experience"]],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "overall": st.column_config.ProgressColumn("Overall", format="%.2f", min_value=0.0, max_value=1.0),
+                "experience": st.column_config.ProgressColumn("Experience", format="%.2f", min_value=0.0, max_value=1.0),
+                "skill_coverage": st.column_config.ProgressColumn("Skill Coverage", format="%.2f", min_value=0.0, max_value=1.0),
+            },
+        )
+
     from job_matches import get_resume_match_summary
 
-    match_data = get_resume_match_summary(resume_text, jd_text)
+    match_data = get_resume_match_summary(resume_text, jd_list, report=report)
 
     if match_data:
         summary_parts = []
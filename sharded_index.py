@@ -0,0 +1,148 @@
+# sharded_index.py
+# Vector index split across local shard processes. Each shard owns a FAISS IDMap2/Flat index
+# in its own process; a search is sent to every shard at once and the partial top-k lists
+# are merged into a global top-k identical to searching one unsharded index. candidate_index
+# uses it when CANDIDATE_INDEX_SHARDS is above 1.
+import multiprocessing as mp
+
+import faiss
+import numpy as np
+
+# Brute-force L2 switches to a BLAS formulation above this many queries, whose rounding depends
+# on how vectors are blocked together. Pinning the direct kernel makes every (query, vector)
+# distance bit-identical no matter which shard holds the vector.
+EXACT_BLAS_THRESHOLD = 2 ** 30
+
+
+def make_flat_index(dim, exact=True):
+    if exact:
+        faiss.cvar.distance_compute_blas_threshold = EXACT_BLAS_THRESHOLD
+    return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+
+
+def _shard_worker(conn, dim, exact, threads):
+    faiss.omp_set_num_threads(threads)
+    index = make_flat_index(dim, exact)
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            # The owning process exited without close(), e.g. an app index left open until shutdown
+            break
+        if command == "add":
+            vectors, ids = payload
+            index.add_with_ids(vectors, ids)
+            conn.send(index.ntotal)
+        elif command == "search":
+            queries, k = payload
+            conn.send(index.search(queries, k))
+        elif command == "count":
+            conn.send(index.ntotal)
+        elif command == "close":
+            conn.send(None)
+            break
+    conn.close()
+
+
+def merge_top_k(distances, ids, k):
+    """
+    Merges per-shard results, each (nq, k), into a global (nq, k) top-k.
+    Ties on distance are broken by ID so the result is deterministic.
+    """
+    distances = np.hstack(distances)
+    ids = np.hstack(ids)
+    # Missing neighbours (-1) from small shards sort last
+    distances = np.where(ids == -1, np.inf, distances)
+    order = np.lexsort((ids, distances), axis=-1)[:, :k]
+    return np.take_along_axis(distances, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+class ShardedIndex:
+    """
+    ``partition="hash"`` routes a vector to shard ``id % num_shards``; ``partition="time"``
+    routes by ``timestamp // time_bucket``, so each shard holds whole time windows.
+    """
+
+    def __init__(self, dim, num_shards=4, partition="hash", time_bucket=86400, exact=True, threads_per_shard=1):
+        if partition not in ("hash", "time"):
+            raise ValueError(f"Unknown partition scheme: {partition}")
+        self.dim = dim
+        self.num_shards = num_shards
+        self.partition = partition
+        self.time_bucket = time_bucket
+        self.exact = exact
+        self._counts = [0] * num_shards
+
+        # Spawn rather than fork: the parent may hold torch/OpenMP state that is unsafe to fork
+        context = mp.get_context("spawn")
+        self._connections = []
+        self._processes = []
+        for _ in range(num_shards):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(child_conn, dim, exact, threads_per_shard), daemon=True)
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def _shard_of(self, ids, timestamps):
+        if self.partition == "hash":
+            return ids % self.num_shards
+        if timestamps is None:
+            raise ValueError("Time partitioning needs a timestamp per vector.")
+        return (np.asarray(timestamps, dtype=np.int64) // self.time_bucket) % self.num_shards
+
+    def add(self, vectors, ids, timestamps=None):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        ids = np.asarray(ids, dtype=np.int64)
+        shards = self._shard_of(ids, timestamps)
+
+        busy = []
+        for shard, conn in enumerate(self._connections):
+            mask = shards == shard
+            if mask.any():
+                conn.send(("add", (vectors[mask], ids[mask])))
+                busy.append(shard)
+        for shard in busy:
+            self._counts[shard] = self._connections[shard].recv()
+
+    def add_with_ids(self, vectors, ids):
+        """FAISS-style add, so the index can stand in for an IDMap index (hash partitioning only)."""
+        self.add(vectors, ids)
+
+    @property
+    def ntotal(self):
+        # Shards only grow through add(), which records their sizes
+        return sum(self._counts)
+
+    def __len__(self):
+        for conn in self._connections:
+            conn.send(("count", None))
+        return sum(conn.recv() for conn in self._connections)
+
+    def search(self, queries, k):
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32)
+        # Fan out to every shard before waiting on any, so shards search in parallel
+        for conn in self._connections:
+            conn.send(("search", (queries, k)))
+        partial = [conn.recv() for conn in self._connections]
+        return merge_top_k([d for d, _ in partial], [i for _, i in partial], k)
+
+    def close(self):
+        for conn in self._connections:
+            try:
+                conn.send(("close", None))
+                conn.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+            conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,331 @@
+# soak_test.py
+# Long-running leak check. Replays upload -> analyse cycles through main.py in this process,
+# many cycles per AppTest session so session state accumulates the way it does for a visitor
+# who keeps uploading: the resume arrives as PDF bytes and goes through the same text
+# extraction and candidate indexing as an upload, then Launch Analysis renders every tab.
+# The candidate index, feature store, report cache, JD profile store and batch job queue
+# live in a scratch directory for the run, never in the working tree. RSS, open file
+# descriptors and temp-dir bytes are sampled as it runs. The in-memory caches are capped at
+# --cache-cap entries for the run and the warmup lasts until every one of them is full, so
+# cache fill is never counted as growth; growth after it beyond the thresholds fails the run
+# and dumps the top tracemalloc allocators since the end of warmup. Streamlit closes every
+# pyplot figure when a script run ends, so figures are counted right after each tab renders
+# instead: any still open there leak outside Streamlit and hold memory for the rest of the
+# run.
+#
+# Usage:
+#   python soak_test.py --cycles 2000 --output soak.json
+#   python soak_test.py --duration 3600 --max-rss-growth-mb 64
+#   python soak_test.py --cache-cap 0     # production cache sizes; warmup runs much longer
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_data import make_jd, make_pdf_bytes, make_resume
+
+_open_figures = [0]
+
+# Bounded in-memory caches: (module, size constant, OrderedDict) and (module, lru_cache function)
+DICT_CACHES = (
+    ("evidence", "SENTENCE_CACHE_SIZE", "_sentence_vectors"),
+    ("faiss_engine", "PAIR_CACHE_SIZE", "_pair_distances"),
+    ("jd_profiles", "MEMORY_CACHE_SIZE", "_memory_cache"),
+    ("report_cache", "MEMORY_CACHE_SIZE", "_memory_cache"),
+)
+LRU_CACHES = (
+    ("token_index", "token_counts"),
+    ("token_index", "_query_tokens"),
+    ("faiss_engine", "embed_resume"),
+    ("token_index", "_jd_token_matrix"),
+)
+# Stores the app writes to, redirected to a scratch directory for the run
+STORE_ENV = {
+    "CANDIDATE_INDEX_DIR": "candidate_index",
+    "CANDIDATE_STORE_DIR": "candidate_store",
+    "REPORT_CACHE_DB": "report_cache.db",
+    "JD_PROFILE_DB": "jd_profiles.db",
+    # main.py starts the batch workers, which create and poll this queue on every cycle
+    "BATCH_JOBS_DB": "batch_jobs.db",
+}
+
+
+def _record_open_figures():
+    import matplotlib.pyplot as plt
+
+    _open_figures[0] = max(_open_figures[0], len(plt.get_fignums()))
+
+
+def _session_script():
+    # Runs as the Streamlit script inside AppTest. AppTest cannot drive file_uploader, so
+    # the upload handler is replaced by the body of handle_resume_upload fed from session state.
+    import runpy
+
+    import streamlit as st
+
+    import analysis
+    import job_matches
+    import recommendation
+    import resume_upload
+    import screening
+    import soak_test
+
+    if not getattr(resume_upload, "_soak_test_patched", False):
+        from candidate_index import add_candidate
+        from limits import read_pdf_text
+
+        def upload():
+            pdf_bytes = st.session_state.get("soak_resume_pdf")
+            if pdf_bytes is None:
+                return None
+            resume_text, _ = read_pdf_text(pdf_bytes)
+            add_candidate(resume_text, name=st.session_state.get("soak_resume_name"))
+            return resume_text
+
+        resume_upload.handle_resume_upload = upload
+
+        def counted(func):
+            def wrapper(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    soak_test._record_open_figures()
+            return wrapper
+
+        for module, name in ((analysis, "show_analysis"), (job_matches, "show_job_matches"),
+                             (screening, "show_screening"), (recommendation, "show_recommendation")):
+            setattr(module, name, counted(getattr(module, name)))
+        resume_upload._soak_test_patched = True
+
+    runpy.run_path("main.py", run_name="__main__")
+
+
+def cap_caches(cap):
+    """Lowers every bounded cache to at most ``cap`` entries, so a warmup can fill them."""
+    import functools
+    import importlib
+
+    for module_name, size_name, _ in DICT_CACHES:
+        module = importlib.import_module(module_name)
+        setattr(module, size_name, min(getattr(module, size_name), cap))
+    for module_name, func_name in LRU_CACHES:
+        original = getattr(importlib.import_module(module_name), func_name)
+        if original.cache_parameters()["maxsize"] <= cap:
+            continue
+        replacement = functools.lru_cache(maxsize=cap)(original.__wrapped__)
+        # Rebind it wherever it was imported by name, not only in its own module
+        for module in list(sys.modules.values()):
+            for name, value in list(getattr(module, "__dict__", {}).items()):
+                if value is original:
+                    setattr(module, name, replacement)
+
+
+def cache_fill():
+    """Entries and cap of every bounded cache."""
+    import importlib
+
+    fill = {}
+    for module_name, size_name, cache_name in DICT_CACHES:
+        module = importlib.import_module(module_name)
+        fill[f"{module_name}.{cache_name}"] = (len(getattr(module, cache_name)), getattr(module, size_name))
+    for module_name, func_name in LRU_CACHES:
+        info = getattr(importlib.import_module(module_name), func_name).cache_info()
+        fill[f"{module_name}.{func_name}"] = (info.currsize, info.maxsize)
+    return fill
+
+
+def caches_full():
+    return all(size >= cap for size, cap in cache_fill().values())
+
+
+def _rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def _dir_bytes(path, exclude=None):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        if exclude:
+            dirs[:] = [d for d in dirs if os.path.join(root, d) != exclude]
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass  # removed while walking
+    return total
+
+
+def sample(cycle, started, temp_dir, store_dir=None):
+    # The app script reports figures through the importable module, not this __main__ copy
+    import soak_test
+
+    gc.collect()
+    figures, soak_test._open_figures[0] = soak_test._open_figures[0], 0
+    return {
+        "cycle": cycle,
+        "seconds": round(time.perf_counter() - started, 1),
+        "rss_mb": round(_rss_mb(), 1),
+        "open_fds": _open_fds(),
+        # The stores grow by design; only other temp files count
+        "temp_mb": round(_dir_bytes(temp_dir, exclude=store_dir) / (1024 * 1024), 2),
+        "figures": figures,
+    }
+
+
+def new_session(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(_session_script, default_timeout=timeout)
+    at.run()
+    return at
+
+
+def run_cycle(at, rng, cycle, jds_per_request):
+    # A new upload and new JDs in the same session, then Launch Analysis
+    at.session_state["soak_resume_pdf"] = make_pdf_bytes(make_resume(rng, project_lines=rng.randint(2, 20)))
+    at.session_state["soak_resume_name"] = f"soak-{cycle}.pdf"
+    at.sidebar.text_area[0].input("\n\n".join(make_jd(rng) for _ in range(jds_per_request))).run()
+    at.sidebar.button[0].click().run()
+    return [f"cycle {cycle}: {e.value}" for e in at.exception]
+
+
+def check_growth(samples, limits, max_figures):
+    """Compares the last sample with the first one after warmup; figures against an absolute cap."""
+    failures = []
+    if len(samples) >= 2:
+        first, last = samples[0], samples[-1]
+        for key, limit in limits.items():
+            growth = last[key] - first[key]
+            if growth > limit:
+                failures.append(f"{key} grew by {growth:.2f} (limit {limit}) between cycles {first['cycle']} and {last['cycle']}")
+    figures = max((s["figures"] for s in samples), default=0)
+    if figures > max_figures:
+        failures.append(f"{figures} matplotlib figure(s) left open after a tab rendered (limit {max_figures})")
+    return failures
+
+
+def top_allocators(baseline, limit=25):
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    return [str(stat) for stat in snapshot.compare_to(baseline, "traceback")[:limit]]
+
+
+def run_soak_test(cycles, duration, warmup, max_warmup, sample_every, jds_per_request, timeout, seed, temp_dir,
+                  limits, max_figures, trace_frames, cache_cap=None, cycles_per_session=0):
+    # Must happen before the app modules are imported: they read these paths at import time
+    store_dir = tempfile.mkdtemp(prefix="soak-stores-", dir=temp_dir)
+    for variable, name in STORE_ENV.items():
+        os.environ[variable] = os.path.join(store_dir, name)
+    try:
+        if cache_cap:
+            cap_caches(cache_cap)
+        return _run(cycles, duration, warmup, max_warmup, sample_every, jds_per_request, timeout, seed, temp_dir,
+                    store_dir, limits, max_figures, trace_frames, cache_cap, cycles_per_session)
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def _run(cycles, duration, warmup, max_warmup, sample_every, jds_per_request, timeout, seed, temp_dir, store_dir,
+         limits, max_figures, trace_frames, cache_cap, cycles_per_session):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    samples, errors = [], []
+    baseline = None
+    warmed_at = None
+    at = None
+
+    cycle = 0
+    while cycle < cycles and (duration is None or time.perf_counter() - started < duration):
+        if at is None or cycles_per_session and cycle % cycles_per_session == 0:
+            at = new_session(timeout)
+        errors += run_cycle(at, rng, cycle, jds_per_request)
+        cycle += 1
+        if warmed_at is None and cycle >= warmup and (caches_full() or cycle >= max_warmup):
+            # Caches are full; growth from here on is what the thresholds judge
+            warmed_at = cycle
+            if not caches_full():
+                errors.append(f"caches still not full after {max_warmup} warmup cycles: {cache_fill()}")
+            tracemalloc.start(trace_frames)
+            baseline = tracemalloc.take_snapshot()
+        if warmed_at is not None and (cycle - warmed_at) % sample_every == 0:
+            samples.append(sample(cycle, started, temp_dir, store_dir))
+            print(json.dumps(samples[-1]), file=sys.stderr)
+
+    if warmed_at is None:
+        errors.append(f"only {cycle} cycles ran and the caches never filled: {cache_fill()}")
+    if not samples or samples[-1]["cycle"] != cycle:
+        samples.append(sample(cycle, started, temp_dir, store_dir))
+
+    failures = check_growth(samples, limits, max_figures)
+    report = {
+        "config": {"cycles": cycle, "warmup": warmed_at, "cache_cap": cache_cap,
+                   "cycles_per_session": cycles_per_session, "jds_per_request": jds_per_request,
+                   "limits": limits, "max_figures": max_figures},
+        "cache_fill": cache_fill(),
+        "wall_seconds": round(time.perf_counter() - started, 1),
+        "samples": samples,
+        "failures": failures,
+        "errors": errors,
+    }
+    if failures and baseline is not None:
+        report["top_allocators"] = top_allocators(baseline)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test: repeated analyses with leak tracking")
+    parser.add_argument("--cycles", type=int, default=1000, help="upload -> analyse cycles to run")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds, even before --cycles")
+    parser.add_argument("--warmup", type=int, default=50, help="minimum cycles before the growth baseline is taken")
+    parser.add_argument("--max-warmup", type=int, default=2000, help="take the baseline by then even if caches aren't full")
+    parser.add_argument("--cache-cap", type=int, default=200, help="cap every in-memory cache at this many entries; 0 keeps the app's sizes")
+    parser.add_argument("--cycles-per-session", type=int, default=0, help="start a new session this often; 0 keeps one session")
+    parser.add_argument("--sample-every", type=int, default=25)
+    parser.add_argument("--jds", type=int, default=3, help="JDs pasted per analysis")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds allowed per script run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--temp-dir", default=tempfile.gettempdir(), help="directory whose size is tracked")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=64)
+    parser.add_argument("--max-fd-growth", type=int, default=4)
+    parser.add_argument("--max-temp-growth-mb", type=float, default=8)
+    parser.add_argument("--max-figures", type=int, default=0, help="figures allowed open after a tab renders")
+    parser.add_argument("--trace-frames", type=int, default=3, help="tracemalloc traceback depth")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    limits = {
+        "rss_mb": args.max_rss_growth_mb,
+        "open_fds": args.max_fd_growth,
+        "temp_mb": args.max_temp_growth_mb,
+    }
+    report = run_soak_test(args.cycles, args.duration, args.warmup, args.max_warmup, args.sample_every, args.jds,
+                           args.timeout, args.seed, args.temp_dir, limits, args.max_figures, args.trace_frames,
+                           cache_cap=args.cache_cap, cycles_per_session=args.cycles_per_session)
+
+    print(json.dumps({k: v for k, v in report.items() if k != "samples"}, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if report["failures"] or report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# spacy_pipeline.py
+# Entity-based extraction of titles, organisations, dates and degrees with spaCy. Documents
+# go through nlp.pipe in batches (optionally across processes) with every component except
+# NER excluded. A phrase/token EntityRuler adds the labels the statistical model lacks
+# (DEGREE, TITLE) and year-range dates; if the trained model is not installed the ruler
+# runs on a blank English pipeline on its own.
+import bisect
+import os
+import re
+from functools import lru_cache
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+# Components extraction never reads; excluded at load so they are neither built nor run
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter", "morphologizer", "textcat"]
+
+DEGREES = [
+    "b.tech", "m.tech", "b.e", "m.e", "b.sc", "m.sc", "bca", "mca", "mba", "phd", "ph.d", "diploma",
+    "bachelor", "bachelors", "bachelor's", "master", "masters", "master's", "doctorate", "icse", "isc", "cbse",
+]
+INSTITUTION_WORDS = ["university", "college", "institute", "school", "academy", "polytechnic"]
+
+
+def _ruler_patterns():
+    from nlp_utils import CAREER_KEYWORDS
+
+    patterns = [{"label": "DEGREE", "pattern": degree} for degree in DEGREES]
+    patterns += [{"label": "TITLE", "pattern": title} for title in CAREER_KEYWORDS]
+    patterns += [
+        # "State University", "University of Delhi"
+        {"label": "ORG", "pattern": [{"IS_TITLE": True, "OP": "+"}, {"LOWER": {"IN": INSTITUTION_WORDS}}]},
+        {"label": "ORG", "pattern": [{"LOWER": {"IN": INSTITUTION_WORDS}}, {"LOWER": "of"}, {"IS_TITLE": True, "OP": "+"}]},
+        # "2017-2021", "2019 to 2022", "2020 - present"
+        {"label": "DATE", "pattern": [{"SHAPE": "dddd"}, {"ORTH": {"IN": ["-", "–", "to"]}}, {"SHAPE": "dddd"}]},
+        {"label": "DATE", "pattern": [{"TEXT": {"REGEX": r"^\d{4}[-–]\d{4}$"}}]},
+        {"label": "DATE", "pattern": [{"SHAPE": "dddd"}, {"ORTH": {"IN": ["-", "–", "to"]}}, {"LOWER": {"IN": ["present", "current", "now"]}}]},
+    ]
+    return patterns
+
+
+@lru_cache(maxsize=2)
+def load_pipeline(model_name=SPACY_MODEL):
+    import spacy
+
+    try:
+        nlp = spacy.load(model_name, exclude=UNUSED_COMPONENTS)
+    except OSError:
+        nlp = spacy.blank("en")
+    ruler_options = {"phrase_matcher_attr": "LOWER", "overwrite_ents": False}
+    if "ner" in nlp.pipe_names:
+        ruler = nlp.add_pipe("entity_ruler", before="ner", config=ruler_options)
+    else:
+        ruler = nlp.add_pipe("entity_ruler", config=ruler_options)
+    ruler.add_patterns(_ruler_patterns())
+    return nlp
+
+
+def _line_of(line_starts, offset):
+    return bisect.bisect_right(line_starts, offset) - 1
+
+
+def entities_from_doc(doc):
+    text = doc.text
+    line_starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+    titles, organizations, dates, degrees = [], [], [], []
+    education_lines = set()
+    for ent in doc.ents:
+        value = ent.text.strip()
+        if ent.label_ == "TITLE":
+            titles.append(value.lower())
+        elif ent.label_ == "ORG":
+            organizations.append(value)
+            if any(word in value.lower() for word in INSTITUTION_WORDS):
+                education_lines.add(_line_of(line_starts, ent.start_char))
+        elif ent.label_ == "DATE":
+            dates.append(value)
+        elif ent.label_ == "DEGREE":
+            degrees.append(value)
+            education_lines.add(_line_of(line_starts, ent.start_char))
+
+    lines = text.split("\n")
+    return {
+        "titles": list(dict.fromkeys(titles)),
+        "organizations": list(dict.fromkeys(organizations)),
+        "dates": list(dict.fromkeys(dates)),
+        "degrees": list(dict.fromkeys(degrees)),
+        "education": [lines[i].strip() for i in sorted(education_lines) if lines[i].strip()],
+    }
+
+
+def extract_entities(texts, batch_size=64, n_process=1):
+    """Yields one entity dict per text, in order."""
+    nlp = load_pipeline()
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield entities_from_doc(doc)
+
+
+def extract_basic_info_batch(texts, batch_size=64, n_process=1):
+    """extract_basic_info for many documents, with the entity fields from one nlp.pipe run."""
+    from nlp_utils import extract_basic_info
+
+    texts = list(texts)
+    return [
+        extract_basic_info(text, entities=entities)
+        for text, entities in zip(texts, extract_entities(texts, batch_size, n_process))
+    ]
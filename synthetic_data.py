@@ -0,0 +1,54 @@
+# synthetic_data.py
+# Generated resumes and JDs shared by the benchmarks and load tools.
+ROLES = ["Data Scientist", "Backend Engineer", "Frontend Developer", "DevOps Engineer", "ML Engineer",
+         "QA Engineer", "Data Analyst", "Cloud Architect", "Mobile Developer", "Product Manager"]
+SKILLS = ["python", "java", "sql", "aws", "gcp", "azure", "docker", "kubernetes", "react", "node.js",
+          "pytorch", "tensorflow", "spark", "airflow", "terraform", "graphql", "selenium", "tableau",
+          "communication", "leadership", "machine learning", "nlp", "django", "flask", "kafka"]
+PROJECT_LINES = [
+    "Built a recommendation engine serving 2M users with {skill}",
+    "Migrated legacy services to {skill}, cutting infra cost by 30%",
+    "Led a team of 4 to ship a {skill} analytics dashboard",
+    "Designed CI/CD pipelines and automated testing around {skill}",
+    "Mentored interns and reviewed code for the {skill} platform",
+]
+
+
+def make_jd(rng):
+    skills = rng.sample(SKILLS, 5)
+    return (f"We are hiring for {rng.choice(ROLES)}. Required skills: {', '.join(skills)}. "
+            f"Candidates need {rng.randint(0, 8)} years of experience and a bachelor degree. "
+            f"You will work with {skills[0]} and {skills[1]} in a collaborative team.")
+
+
+def make_resume(rng, project_lines=3):
+    skills = rng.sample(SKILLS, 8)
+    lines = [
+        f"{rng.choice(ROLES)} with {rng.randint(0, 10)} years of experience.",
+        f"Skills: {', '.join(skills)}",
+        "EDUCATION",
+        f"B.Tech in Computer Science, State University {rng.randint(2008, 2020)}-{rng.randint(2012, 2024)}",
+        f"CGPA: {rng.uniform(6, 10):.1f}",
+        "PROJECTS",
+    ]
+    lines += [rng.choice(PROJECT_LINES).format(skill=rng.choice(skills)) for _ in range(project_lines)]
+    lines += ["CERTIFICATIONS", f"{rng.choice(['AWS', 'GCP', 'Azure'])} Certified Developer", "",
+              "Strong communication, teamwork and leadership skills."]
+    return "\n".join(lines)
+
+
+def make_pdf_bytes(text):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 72
+    for line in text.splitlines():
+        if y > 770:
+            page = doc.new_page()
+            y = 72
+        page.insert_text((72, y), line, fontsize=10)
+        y += 14
+    data = doc.tobytes()
+    doc.close()
+    return data
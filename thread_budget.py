@@ -0,0 +1,92 @@
+# thread_budget.py
+# Splits the machine's cores between concurrent workers. Torch (the sentence encoder) and
+# FAISS each default to one thread per core for every call, so N sessions encoding or
+# searching at once would run N x cores threads and mostly fight over the CPU. Here each
+# worker gets cores // concurrency intra-op threads instead. Without a configured
+# concurrency the split assumes DEFAULT_CONCURRENCY calls at once, the stages of one report
+# running side by side; THREAD_CONCURRENCY sets it for the deployment. Torch's thread count
+# is process-wide, but OpenMP (and so FAISS) keeps its limit per thread: every thread that
+# searches calls configure_thread, e.g. as a pool initializer.
+import os
+import threading
+
+import faiss
+import torch
+
+DEFAULT_CONCURRENCY = 4
+
+_settings = {}
+_settings_lock = threading.Lock()
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def default_concurrency():
+    return _env_int("THREAD_CONCURRENCY") or min(DEFAULT_CONCURRENCY, os.cpu_count() or 1)
+
+
+def configure_threads(concurrency=None, encoder_threads=None, faiss_threads=None):
+    """
+    Sets the torch thread count for this process, and the FAISS one for the calling thread,
+    and returns the applied settings.
+    ``concurrency`` is how many encode/search calls are expected to run at the same time,
+    in this process (threads) or across worker processes on the same machine.
+    ENCODER_THREADS and FAISS_THREADS override the computed values.
+    """
+    cpu_count = os.cpu_count() or 1
+    concurrency = max(1, concurrency or default_concurrency())
+    per_worker = max(1, cpu_count // concurrency)
+    encoder_threads = encoder_threads or _env_int("ENCODER_THREADS") or per_worker
+    faiss_threads = faiss_threads or _env_int("FAISS_THREADS") or per_worker
+
+    with _settings_lock:
+        torch.set_num_threads(encoder_threads)
+        faiss.omp_set_num_threads(faiss_threads)
+        # Inter-op threads can only be set before torch starts any parallel work
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+        _settings.update({
+            "cpu_count": cpu_count,
+            "concurrency": concurrency,
+            "encoder_threads": encoder_threads,
+            "faiss_threads": faiss_threads,
+        })
+        return current_settings()
+
+
+def ensure_threads_configured():
+    """Runs configure_threads with the defaults unless this process already configured its threads."""
+    with _settings_lock:
+        if _settings:
+            return current_settings()
+    return configure_threads()
+
+
+def configure_thread():
+    """
+    Applies the process's FAISS thread count to the calling thread, configuring the process
+    first if needed. New threads start from OpenMP's default of one thread per core.
+    """
+    settings = ensure_threads_configured()
+    faiss.omp_set_num_threads(settings["faiss_threads"])
+    return settings
+
+
+def current_concurrency():
+    """The concurrency configure_threads split the cores by, or the default before it ran."""
+    return _settings.get("concurrency") or default_concurrency()
+
+
+def current_settings():
+    """Settings as applied by configure_threads, plus what the libraries report now (FAISS for the calling thread)."""
+    return {
+        **_settings,
+        "torch_intra_op": torch.get_num_threads(),
+        "torch_inter_op": torch.get_num_interop_threads(),
+        "faiss_omp_max": faiss.omp_get_max_threads(),
+    }
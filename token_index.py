@@ -0,0 +1,125 @@
+# token_index.py
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Process-wide vocabulary: token string <-> integer ID. Only JD tokens are added to it;
+# resume and query tokens are looked up and dropped when no JD has them (they could not
+# match anyway), so the vocabulary grows with the JD corpus, not with every resume seen.
+_vocab = {}
+_id_to_token = []
+_vocab_lock = threading.Lock()
+_token_lengths = np.zeros(0, dtype=np.int32)
+
+
+def _lookup_ids(tokens):
+    with _vocab_lock:
+        ids = []
+        for token in tokens:
+            token_id = _vocab.get(token)
+            if token_id is None:
+                token_id = len(_id_to_token)
+                _vocab[token] = token_id
+                _id_to_token.append(token)
+            ids.append(token_id)
+    return ids
+
+
+def _lengths_snapshot():
+    # Token lengths are only materialised when the vocabulary has grown
+    global _token_lengths
+    with _vocab_lock:
+        known = len(_token_lengths)
+        if known < len(_id_to_token):
+            new_lengths = np.fromiter((len(t) for t in _id_to_token[known:]), dtype=np.int32)
+            _token_lengths = np.concatenate([_token_lengths, new_lengths])
+        return _token_lengths
+
+
+@lru_cache(maxsize=16384)
+def token_counts(text):
+    """
+    Tokenizes ``text`` once and returns (sorted unique token IDs, term counts).
+    Results are cached per document, so repeated renders don't re-run the regex.
+    """
+    counts = Counter(_TOKEN_PATTERN.findall(text.lower()))
+    ids = np.asarray(_lookup_ids(counts), dtype=np.int64)
+    tfs = np.fromiter(counts.values(), dtype=np.int32, count=len(counts))
+    order = np.argsort(ids)
+    ids, tfs = ids[order], tfs[order]
+    ids.setflags(write=False)
+    tfs.setflags(write=False)
+    return ids, tfs
+
+
+def token_ids(text):
+    return token_counts(text)[0]
+
+
+@lru_cache(maxsize=1024)
+def _query_tokens(text):
+    return tuple(set(_TOKEN_PATTERN.findall(text.lower())))
+
+
+def query_token_ids(text):
+    """
+    Sorted IDs of the tokens of ``text`` that are already in the vocabulary, for resumes and
+    other queries matched against JDs. IDs are looked up on every call, so tokens interned
+    by JDs added since are found too.
+    """
+    tokens = _query_tokens(text)
+    with _vocab_lock:
+        ids = [token_id for token_id in map(_vocab.get, tokens) if token_id is not None]
+    ids = np.asarray(ids, dtype=np.int64)
+    ids.sort()
+    return ids
+
+
+def tokens_for(ids):
+    return [_id_to_token[i] for i in ids]
+
+
+@lru_cache(maxsize=32)
+def _jd_token_matrix(jd_tuple):
+    # CSR layout: tokens of JD i live in indices[indptr[i]:indptr[i + 1]]
+    arrays = [token_ids(jd) for jd in jd_tuple]
+    sizes = np.fromiter((len(a) for a in arrays), dtype=np.int64, count=len(arrays))
+    indptr = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    indices = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+    return indices, indptr, sizes
+
+
+def keyword_overlap(resume_text, jd_list, min_len=4):
+    """
+    Skill overlap percentage of the resume against every JD in ``jd_list``.
+    Uses a bitset over the shared vocabulary, so one resume against thousands
+    of JDs is a handful of array operations.
+    """
+    if not jd_list:
+        return np.zeros(0)
+
+    indices, indptr, sizes = _jd_token_matrix(tuple(jd_list))
+    resume_ids = query_token_ids(resume_text)
+
+    lengths = _lengths_snapshot()
+    in_resume = np.zeros(len(lengths), dtype=bool)
+    in_resume[resume_ids] = True
+    hits = in_resume & (lengths >= min_len)
+
+    cumulative = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(hits[indices], out=cumulative[1:])
+    common = cumulative[indptr[1:]] - cumulative[indptr[:-1]]
+    return common / np.maximum(sizes, 1) * 100
+
+
+def common_keywords(resume_text, jd_text, min_len=4):
+    # The JD first, so its tokens are in the vocabulary when the resume is looked up
+    jd_ids = token_ids(jd_text)
+    common = np.intersect1d(query_token_ids(resume_text), jd_ids, assume_unique=True)
+    return [token for token in tokens_for(common) if len(token) >= min_len]